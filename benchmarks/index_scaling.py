@@ -0,0 +1,113 @@
+# index_scaling.py
+"""
+Benchmark for the Donation/Volunteer indexes defined in start/tables.py.
+
+It builds throw-away databases with a growing number of donations and times
+the search-menu queries and the linked_donations() delete check, once without
+and once with the secondary indexes. With the indexes the latency should stay
+flat as the Donation table grows, without them it grows linearly.
+
+Usage:
+    python -m benchmarks.index_scaling                      # 10k, 100k and 1M donations
+    python -m benchmarks.index_scaling --sizes 10000 5000000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from start import tables
+from start.values import generate_data
+from start.crud import linked_donations
+from body.search import fetch_all
+
+# The queries used by the search menu in body/search.py
+SEARCH_QUERIES = {
+    "search by donor": """
+        SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
+               Donor.First_Name, Donor.Last_Name, Beneficiary.Name
+        FROM Donation
+        JOIN Donor ON Donation.Donor_ID = Donor.Donor_ID
+        JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
+        WHERE Donation.Donor_ID = ?""",
+    "search by event": """
+        SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
+               Event.Name, Beneficiary.Name
+        FROM Donation
+        JOIN Event ON Donation.Event_ID = Event.Event_ID
+        JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
+        WHERE Donation.Event_ID = ?""",
+    "search by business": """
+        SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
+               Business.Name, Beneficiary.Name
+        FROM Donation
+        JOIN Business ON Donation.Business_ID = Business.Business_ID
+        JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
+        WHERE Donation.Business_ID = ?""",
+    "search by beneficiary": """
+        SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
+               Beneficiary.Name
+        FROM Donation
+        JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
+        WHERE Donation.Beneficiary_ID = ?""",
+}
+
+ENTITIES = 1000  # Donors, events, businesses and beneficiaries each
+
+
+def build_database(path, donations, with_indexes):
+    # Point the pool at a fresh database file and create the schema
+    tables.close_all_connections()
+    tables.DB_FILE = path
+    tables.create_tables()
+    conn = tables.get_connection()
+    if not with_indexes:
+        for name in ("idx_donation_donor", "idx_donation_event", "idx_donation_business",
+                     "idx_donation_beneficiary", "idx_donation_date", "idx_volunteer_event"):
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # Same seed every time, so every run benchmarks identical data
+    generate_data(donations, donors=ENTITIES, businesses=ENTITIES, beneficiaries=ENTITIES, events=ENTITIES, seed=42)
+
+
+def time_call(func, repeat=50):
+    # Run func(i) repeat times and return the median latency in milliseconds
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i % ENTITIES + 1)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(sizes):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for with_indexes in (False, True):
+                path = os.path.join(tmp, f"bench_{size}_{with_indexes}.db")
+                build_database(path, size, with_indexes)
+                timings = {name: time_call(lambda i, q=query: fetch_all(q, i))
+                           for name, query in SEARCH_QUERIES.items()}
+                timings["linked_donations"] = time_call(lambda i: linked_donations("Donor_ID", i))
+                results.append((size, with_indexes, timings))
+                tables.close_all_connections()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time searches and delete checks with and without indexes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="numbers of donations to benchmark")
+    args = parser.parse_args()
+
+    print(f"{'donations':>10} {'indexes':>8}  " + "  ".join(f"{name:>22}" for name in [*SEARCH_QUERIES, "linked_donations"]))
+    for size, with_indexes, timings in run(args.sizes):
+        print(f"{size:>10} {'yes' if with_indexes else 'no':>8}  "
+              + "  ".join(f"{ms:>19.3f} ms" for ms in timings.values()))
+
+
+if __name__ == "__main__":
+    main()
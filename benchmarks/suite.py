@@ -0,0 +1,216 @@
+# suite.py
+"""
+Benchmark suite for the hot paths of the app.
+
+For every scale (number of donations) it builds a throw-away database with the
+seeded generator in start/values.py (identical data on every run) and times:
+- the CRUD helpers in start/crud.py: view_all, add_entry, update_entry,
+  delete_entry, the linked_donations() delete check and ten updates in
+  one Transaction
+- every search-menu query (start/donation_query.py and start/textsearch.py)
+- cold start: a new Python process running main.py up to its first prompt
+  (and straight out again with option 9)
+
+Each operation is reported with its median and 95th percentile latency and its
+throughput, printed as a table and written to a JSON file so runs can be compared:
+
+    python -m benchmarks.suite                                   # 1k, 10k and 100k donations
+    python -m benchmarks.suite --sizes 10000 1000000 --output after.json
+    python -m benchmarks.suite --compare before.json              # show the change against an older run
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from start import tables
+from start.crud import view_all, add_entry, update_entry, delete_entry, linked_donations, Transaction
+from start.donation_query import search_donations, linked_donations_for
+from start.textsearch import search_text
+from start.values import FIRST_NAMES
+from benchmarks.index_scaling import build_database, ENTITIES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPEAT = 200       # Maximum samples per operation
+TIME_BUDGET = 2.0  # Seconds per operation; slow operations take fewer samples (at least MIN_SAMPLES)
+MIN_SAMPLES = 5
+COLD_STARTS = 10   # New processes started to time cold start
+
+
+def percentile(samples, pct):
+    # Nearest-rank percentile of a list of numbers
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarise(samples):
+    """Returns median/p95 latency (ms) and throughput (operations per second) of a list of timings in seconds"""
+    total = sum(samples)
+    return {
+        "samples": len(samples),
+        "median_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "ops_per_sec": round(len(samples) / total, 1) if total else None,
+    }
+
+
+def measure(func, repeat=REPEAT, budget=TIME_BUDGET):
+    """
+    Calls func(i) for i = 0, 1, 2, ... and times every call.
+    Stops after `repeat` calls, or once `budget` seconds are used (but not before MIN_SAMPLES calls).
+    """
+    func(0)  # Warm-up: statement cache, page cache
+    samples = []
+    started = time.perf_counter()
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+        if len(samples) >= MIN_SAMPLES and time.perf_counter() - started > budget:
+            break
+    return samples
+
+
+def entity_id(i):
+    return i % ENTITIES + 1
+
+
+def crud_operations(donations):
+    """(name, function) pairs for the CRUD helpers; the deletes remove the donations added before them"""
+    added = []
+
+    def add(i):
+        add_entry("INSERT INTO Donation (Amount, Date, Notes, Donor_ID, Beneficiary_ID) VALUES (?, ?, ?, ?, ?)",
+                  (25.0, "2025-06-01", "benchmark", entity_id(i), entity_id(i)))
+
+    def collect_added():
+        added.extend(row[0] for row in tables.get_connection().execute(
+            "SELECT Donation_ID FROM Donation WHERE Notes = 'benchmark' ORDER BY Donation_ID"))
+
+    def delete(i):
+        if i == 0 and not added:
+            collect_added()
+        if added:
+            delete_entry("DELETE FROM Donation WHERE Donation_ID=?", added.pop())
+
+    def update_ten(i):
+        with Transaction():  # One commit for all ten, against ten for update_entry on its own
+            for n in range(10):
+                update_entry("UPDATE Donation SET Amount=? WHERE Donation_ID=?", (50.0 + n, (i * 10 + n) % donations + 1))
+
+    return [
+        ("view_all Donor", lambda i: view_all("Donor")),
+        ("view_all Donation", lambda i: view_all("Donation")),
+        ("add_entry donation", add),
+        ("update_entry donation", lambda i: update_entry("UPDATE Donation SET Amount=? WHERE Donation_ID=?",
+                                                         (50.0 + i, i % donations + 1))),
+        ("delete_entry donation", delete),
+        ("10 updates in one txn", update_ten),
+        ("linked_donations", lambda i: linked_donations("Donor_ID", entity_id(i))),
+    ]
+
+
+# The queries behind each search-menu option (results are read completely, as the pager would)
+SEARCH_OPERATIONS = [
+    ("search by donor", lambda i: list(search_donations(donor_id=entity_id(i)))),
+    ("search by event", lambda i: list(search_donations(event_id=entity_id(i)))),
+    ("search by business", lambda i: list(search_donations(business_id=entity_id(i)))),
+    ("search by beneficiary", lambda i: list(search_donations(beneficiary_id=entity_id(i)))),
+    ("search by volunteer", lambda i: list(linked_donations_for("Volunteer", [entity_id(i)]))),
+    ("search by 50 volunteers", lambda i: list(linked_donations_for("Volunteer", range(i % 20 * 50 + 1, i % 20 * 50 + 51)))),
+    ("advanced search", lambda i: list(search_donations(source="Business", min_amount=500, priority="High",
+                                                        date_from="2025-10-01", date_to="2025-12-31", limit=100))),
+    ("full-text search", lambda i: search_text(FIRST_NAMES[i % len(FIRST_NAMES)])),
+]
+
+
+def cold_start(directory, runs=COLD_STARTS):
+    """Times new processes that start the menu app and exit at the first prompt"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, "main.py")], cwd=directory, input="9\n",
+                       capture_output=True, text=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(sizes, repeat=REPEAT, budget=TIME_BUDGET):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            directory = os.path.join(tmp, str(size))
+            os.mkdir(directory)
+            print(f"Building database with {size} donations...", file=sys.stderr)
+            build_database(os.path.join(directory, tables.DB_FILE), size, with_indexes=True)
+
+            for name, func in crud_operations(size) + SEARCH_OPERATIONS:
+                results.append({"donations": size, "operation": name, **summarise(measure(func, repeat, budget))})
+            tables.close_all_connections()
+            results.append({"donations": size, "operation": "cold start", **summarise(cold_start(directory))})
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, previous=None):
+    # previous: results of an older run, to show how much each median changed
+    before = {(r["donations"], r["operation"]): r for r in previous or []}
+    print(f"{'donations':>10}  {'operation':<24} {'median ms':>10} {'p95 ms':>10} {'ops/s':>10}" + ("  change" if previous else ""))
+    for r in results:
+        line = (f"{r['donations']:>10}  {r['operation']:<24} {r['median_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+                f"{r['ops_per_sec'] or 0:>10.1f}")
+        old = before.get((r["donations"], r["operation"]))
+        if old and old["median_ms"]:
+            line += f"  {(r['median_ms'] / old['median_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time CRUD, search and start-up at several database sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of donations to benchmark")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="maximum samples per operation")
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET, help="seconds spent on each operation")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.budget)
+    data = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "profile": tables.ACTIVE_PROFILE,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(data, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+    report(results, previous)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
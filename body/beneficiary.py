@@ -1,9 +1,4 @@
-# beneficiary.py  
-
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
+# beneficiary.py
 """
 This module handles all beneficiary-related operations in the donation system.
 It provides a menu interface for managing beneficiary records including:
@@ -13,46 +8,51 @@ It provides a menu interface for managing beneficiary records including:
 - Deleting beneficiaries (with donation checks)
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry, linked_donations
+from start.crud import add_entry, update_entry, bulk_delete
+from body.pager import browse
+from body.render import render_records, print_delete_result, paint, column, GREEN, YELLOW, RED
+from start.validation import is_letters, parse_ids
+
+# Fields shown for each beneficiary: (label, function that returns the value)
+BENEFICIARY_FIELDS = [
+    ("ID", column(0)),
+    ("Name", column(1)),
+    ("Type", column(2)),
+    ("Address", column(3)),
+    ("Support Duration", column(4)),
+    ("Funding Priority", column(5)),
+]
 
 def display_beneficiaries(beneficiaries):# Display all beneficiary records in a consistent format
     if not beneficiaries:
-        print("\033[93mNo beneficiaries found in database.\033[0m")
+        print(paint("No beneficiaries found in database.", YELLOW))
         return False
-    for i in beneficiaries:
-        print(
-            f"\033[92mID:\033[0m {i[0]} "
-            f"\033[92mName:\033[0m {i[1]} "
-            f"\033[92mType:\033[0m {i[2]} "
-            f"\033[92mAddress:\033[0m {i[3]} "
-            f"\033[92mSupport Duration:\033[0m {i[4]} "
-            f"\033[92mFunding Priority:\033[0m {i[5]}"
-        )
+    render_records(beneficiaries, BENEFICIARY_FIELDS)
     return True
 
 def beneficiary_input(action):# Collect and validate beneficiary information from user
-    print(f"\n\033[93mTip: Name and Type should contain only letters.\033[0m")
+    print("\n" + paint("Tip: Name and Type should contain only letters.", YELLOW))
     name = input(f"{action} Name (letters only): ").strip()
-    if not name.replace(" ", "").isalpha():# Check if name contains only letters and spaces
-        print("\033[91m🚫 Name must contain only letters.\033[0m")
+    if not is_letters(name):# Check if name contains only letters and spaces
+        print(paint("🚫 Name must contain only letters.", RED))
         return None# Return None if invalid input is detected
     name = name.capitalize() # Capitalize the first letter of the name
 
-    print("\033[93mTip: Type should also include only letters (e.g., Charity, Non-Profit).\033[0m")
+    print(paint("Tip: Type should also include only letters (e.g., Charity, Non-Profit).", YELLOW))
     btype = input(f"{action} Type (e.g., Charity, Non-Profit): ").strip()
-    if not btype.replace(" ", "").isalpha():
-        print("\033[91m🚫 Type must contain only letters.\033[0m")
+    if not is_letters(btype):
+        print(paint("🚫 Type must contain only letters.", RED))
         return None
 
-    print("\033[93mTip: Enter the full address of the organisation.\033[0m")
+    print(paint("Tip: Enter the full address of the organisation.", YELLOW))
     address = input(f"{action} Address (e.g., 123 Main St, Springfield): ").strip()
 
     duration = input(f"{action} Support Duration (e.g., 5 years): ").strip()
 
-    print("\033[93mTip: Enter High, Medium, or Low as priority.\033[0m")
+    print(paint("Tip: Enter High, Medium, or Low as priority.", YELLOW))
     priority = input(f"{action} Priority (High, Medium, Low): ").strip().capitalize()
     if not priority.isalpha():
-        print("\033[91m🚫 Priority must contain only letters.\033[0m")
+        print(paint("🚫 Priority must contain only letters.", RED))
         return None
 
     return (name, btype, address, duration, priority)
@@ -77,17 +77,16 @@ def beneficiary_menu():
         choice = input("\n Choose an option (1-5): ").strip()
 
         if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]: 
-            print("\033[91m🚫 Invalid entry. Please choose an option between (1-5).\033[0m")
+            print(paint("🚫 Invalid entry. Please choose an option between (1-5).", RED))
             continue
 
         # Option 1: View all beneficiaries
         if choice == "1":
             try:
-                print("\n\033[92mAll Beneficiaries:\033[0m")
-                beneficiaries = view_all("Beneficiary")
-                display_beneficiaries(beneficiaries)
+                print("\n" + paint("All Beneficiaries:", GREEN))
+                browse("Beneficiary", display_beneficiaries)
             except Exception as e:
-                print(f"\033[91m🚫 An error occurred while viewing beneficiaries: {e}\033[0m")
+                print(paint(f"🚫 An error occurred while viewing beneficiaries: {e}", RED))
 
         # Option 2: Add new beneficiary
         elif choice == "2":
@@ -99,21 +98,20 @@ def beneficiary_menu():
                         "INSERT INTO Beneficiary VALUES (NULL,?,?,?,?,?)",
                         data
                     )
-                    print("\033[92m🎉 Beneficiary added successfully.\033[0m")
+                    print(paint("🎉 Beneficiary added successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 An error occurred while adding the beneficiary: {e}\033[0m")
+                print(paint(f"🚫 An error occurred while adding the beneficiary: {e}", RED))
 
         # Option 3: Update existing beneficiary
         elif choice == "3":
             try:
-                print("\n\033[92mAll Beneficiaries:\033[0m")
-                beneficiaries = view_all("Beneficiary")# Display all beneficiaries
-                if not display_beneficiaries(beneficiaries):# If no beneficiaries are found, exit the loop
+                print("\n" + paint("All Beneficiaries:", GREEN))
+                if not browse("Beneficiary", display_beneficiaries):# Display all beneficiaries, if none are found go back to the menu
                     continue
 
                 bid = input("\nEnter Beneficiary ID to update: ").strip()
                 if not bid.isdigit():
-                    print("\033[91m🚫 Beneficiary ID must be a number.\033[0m")
+                    print(paint("🚫 Beneficiary ID must be a number.", RED))
                     continue
 
                 data = beneficiary_input("New")
@@ -122,31 +120,27 @@ def beneficiary_menu():
                         "UPDATE Beneficiary SET Name=?, Type=?, Address=?, Support_Duration=?, Funding_priority=? WHERE Beneficiary_ID=?",
                         (*data, bid)
                     )
-                    print("\033[92m🎉 Beneficiary updated successfully.\033[0m")
+                    print(paint("🎉 Beneficiary updated successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 An error occurred while updating the beneficiary: {e}\033[0m")
+                print(paint(f"🚫 An error occurred while updating the beneficiary: {e}", RED))
 
         # Option 4: Delete a beneficiary
         elif choice == "4":
             try:
-                print("\n\033[92mAll Beneficiaries:\033[0m")
-                beneficiaries = view_all("Beneficiary")
-                if not display_beneficiaries(beneficiaries):# If no beneficiaries are found, exit the loop
+                print("\n" + paint("All Beneficiaries:", GREEN))
+                if not browse("Beneficiary", display_beneficiaries):# If no beneficiaries are found, exit the loop
                     continue 
 
-                bid = input("\nEnter Beneficiary ID to delete: ").strip()# Check if the ID is numeric
-                if not bid.isdigit():
-                    print("\033[91m🚫 Beneficiary ID must be numeric.\033[0m")
+                try:
+                    bids = parse_ids(input("\nEnter Beneficiary ID(s) to delete, separated by commas: "))# Check the IDs are numeric
+                except ValueError:
+                    print(paint("🚫 Beneficiary ID must be numeric.", RED))
                     continue
 
-                if linked_donations("Beneficiary_ID", bid): # Check if the beneficiary is linked to any donations
-                    print("\033[91m🚫 Cannot delete Beneficiary linked to existing Donations.\033[0m")
-                    continue # If linked, skip deletion 
-
-                delete_entry("DELETE FROM Beneficiary WHERE Beneficiary_ID=?", bid)# Delete the beneficiary from the database
-                print("\033[92m🎉 Beneficiary deleted successfully.\033[0m")
+                # Delete every beneficiary without donations in one transaction; linked ones are reported
+                print_delete_result("Beneficiary", *bulk_delete("Beneficiary", bids))
             except Exception as e:
-                print(f"\033[91m🚫 An error occurred while deleting the beneficiary: {e}\033[0m")
+                print(paint(f"🚫 An error occurred while deleting the beneficiary: {e}", RED))
 
         # Option 5: Return to main menu
         elif choice == "5":
@@ -1,9 +1,4 @@
-# business.py  
-import sys
-import os
-import re
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
+# business.py
 """
 This module handles all business-related operations in the donation system.
 It provides a menu interface for managing business records including:
@@ -13,52 +8,57 @@ It provides a menu interface for managing business records including:
 - Deleting businesses (with donation checks)
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry, linked_donations
+from start.crud import add_entry, update_entry, bulk_delete
+from body.pager import browse
+from body.render import render_records, print_delete_result, paint, column, GREEN, YELLOW, RED
+from start.validation import is_valid_date, is_letters, is_valid_email, parse_ids
+
+# Fields shown for each business: (label, function that returns the value)
+BUSINESS_FIELDS = [
+    ("ID", column(0)),
+    ("Name", column(1)),
+    ("Email", column(2)),
+    ("Phone", column(3)),
+    ("Address", column(4)),
+    ("Registration Date", column(5)),
+]
 
 def display_businesses(businesses):
     """Display all business records in a consistent format"""
     if not businesses:
-        print("\033[93mNo businesses found in database.\033[0m")
+        print(paint("No businesses found in database.", YELLOW))
         return False
-    for i in businesses:
-        print(
-            f"\033[92mID:\033[0m {i[0]} "
-            f"\033[92mName:\033[0m {i[1]} "
-            f"\033[92mEmail:\033[0m {i[2]} "
-            f"\033[92mPhone:\033[0m {i[3]} "
-            f"\033[92mAddress:\033[0m {i[4]} "
-            f"\033[92mRegistration Date:\033[0m {i[5]}"
-        )
+    render_records(businesses, BUSINESS_FIELDS)
     return True
 
 def business_input(action):
     """Collect and validate business information from user"""
-    print("\n\033[93mTip: Business Name should only contain letters.\033[0m")
+    print("\n" + paint("Tip: Business Name should only contain letters.", YELLOW))
     name = input(f"{action} Business Name: ").strip()
-    if not name.replace(" ", "").isalpha():
-        print("\033[91m🚫 Business name must contain only letters.\033[0m")
+    if not is_letters(name):
+        print(paint("🚫 Business name must contain only letters.", RED))
         return None
     name = name.capitalize()
 
-    print("\033[93mTip: Use a valid email address (e.g., name@business.com).\033[0m")
+    print(paint("Tip: Use a valid email address (e.g., name@business.com).", YELLOW))
     email = input(f"{action} Email: ").strip()
-    if "@" not in email or "." not in email:# Check for basic email format This is a simple check; consider using regex for more complex validation
-        print("\033[91m🚫 Please enter a valid email address.\033[0m")
+    if not is_valid_email(email):# Check for basic email format This is a simple check; consider using regex for more complex validation
+        print(paint("🚫 Please enter a valid email address.", RED))
         return None
 
-    print("\033[93mTip: Phone number must be digits only.\033[0m")
+    print(paint("Tip: Phone number must be digits only.", YELLOW))
     phone = input(f"{action} Phone Number (digits only): ").strip()
     if not phone.isdigit():
-        print("\033[91m🚫 Phone number must contain only digits.\033[0m")
+        print(paint("🚫 Phone number must contain only digits.", RED))
         return None
 
-    print("\033[93mTip: Address cannot be empty.\033[0m")
+    print(paint("Tip: Address cannot be empty.", YELLOW))
     address = input(f"{action} Address: ").strip()
 
-    print("\033[93mTip: Use format YYYY-MM-DD for Date of Registration.\033[0m") 
+    print(paint("Tip: Use format YYYY-MM-DD for Date of Registration.", YELLOW)) 
     reg_date = input(f"{action} Date of Registration (YYYY-MM-DD): ").strip()# Check for date format YYYY-MM-DD
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", reg_date): # Regex to check date format 
-        print("\033[91m🚫 Date must be in format YYYY-MM-DD.\033[0m")
+    if not is_valid_date(reg_date): # Regex to check date format 
+        print(paint("🚫 Date must be in format YYYY-MM-DD.", RED))
         return None
 
     return (name, email, phone, address, reg_date)
@@ -82,17 +82,16 @@ def business_menu():
         choice = input("\n Choose an option (1-5): ").strip()
 
         if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]:
-            print("\033[91m🚫 Invalid choice. Please choose a number between 1 and 5.\033[0m")
+            print(paint("🚫 Invalid choice. Please choose a number between 1 and 5.", RED))
             continue
 
         # View all businesses
         if choice == "1":
             try:
-                print("\n\033[92mAll Businesses:\033[0m")
-                businesses = view_all("Business")
-                display_businesses(businesses)
+                print("\n" + paint("All Businesses:", GREEN))
+                browse("Business", display_businesses)
             except Exception as e:
-                print(f"\033[91m🚫 Error viewing businesses: {str(e)}\033[0m")
+                print(paint(f"🚫 Error viewing businesses: {str(e)}", RED))
 
         # Add new business
         elif choice == "2":
@@ -103,21 +102,20 @@ def business_menu():
                         "INSERT INTO Business VALUES (NULL,?,?,?,?,?)",
                         data
                     )
-                    print("\033[92m🎉 Business added successfully.\033[0m")
+                    print(paint("🎉 Business added successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error adding business: {str(e)}\033[0m")
+                print(paint(f"🚫 Error adding business: {str(e)}", RED))
 
         # Update existing business
         elif choice == "3":
             try:
-                print("\n\033[92mList of All Businesses:\033[0m")
-                businesses = view_all("Business")
-                if not display_businesses(businesses):
+                print("\n" + paint("List of All Businesses:", GREEN))
+                if not browse("Business", display_businesses):
                     continue
 
                 business_id = input("\nEnter Business ID to update: ").strip()
                 if not business_id.isdigit():
-                    print("\033[91m🚫 Business ID must be numeric.\033[0m")
+                    print(paint("🚫 Business ID must be numeric.", RED))
                     continue
 
                 data = business_input("New")
@@ -126,31 +124,27 @@ def business_menu():
                         "UPDATE Business SET Name=?, Email=?, Phone_Number=?, Address=?, Registration_Date=? WHERE Business_ID=?",
                         (*data, business_id)
                     )
-                    print("\033[92m🎉 Business updated successfully.\033[0m")
+                    print(paint("🎉 Business updated successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error updating business: {str(e)}\033[0m")
+                print(paint(f"🚫 Error updating business: {str(e)}", RED))
 
         # Delete business
         elif choice == "4":
             try:
-                print("\n\033[92mList of All Businesses:\033[0m")
-                businesses = view_all("Business")
-                if not display_businesses(businesses):
-                    continue
-
-                business_id = input("\nEnter Business ID to delete: ").strip()
-                if not business_id.isdigit():
-                    print("\033[91m🚫 Business ID must be numeric.\033[0m")
+                print("\n" + paint("List of All Businesses:", GREEN))
+                if not browse("Business", display_businesses):
                     continue
 
-                if linked_donations("Business_ID", business_id):
-                    print("\033[91m🚫 Cannot delete Business linked to existing Donations.\033[0m")
+                try:
+                    business_ids = parse_ids(input("\nEnter Business ID(s) to delete, separated by commas: "))
+                except ValueError:
+                    print(paint("🚫 Business ID must be numeric.", RED))
                     continue
 
-                delete_entry("DELETE FROM Business WHERE Business_ID=?", business_id)
-                print("\033[92m🎉 Business deleted successfully.\033[0m")
+                # One transaction: businesses with donations are kept, all others are deleted together
+                print_delete_result("Business", *bulk_delete("Business", business_ids))
             except Exception as e:
-                print(f"\033[91m🚫 Error deleting business: {str(e)}\033[0m")
+                print(paint(f"🚫 Error deleting business: {str(e)}", RED))
 
         # Return to main menu
         elif choice == "5":
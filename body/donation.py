@@ -1,9 +1,4 @@
-# donation.py 
-import sys
-import os
-import re
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
+# donation.py
 """
 This module handles all donation-related operations in the system.
 It provides a menu interface for managing donation records including:
@@ -11,30 +6,51 @@ It provides a menu interface for managing donation records including:
 - Adding new donations
 - Updating existing donations
 - Deleting donations
+- Batch entry: many donations typed one line each, saved together
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry
+import datetime
+
+from start.crud import add_entry, update_entry, delete_entry, missing_records
+from start.cache import name_map
+from start.batch import DonationBatch
+from body.pager import browse
+from body.event import show_milestone_notifications
+from body.render import render_records, paint, column, money, GREEN, YELLOW, RED
+from start.validation import is_valid_date, parse_positive_amount, validate_donation
+
+# Fields shown for each donation: (label, function that returns the value)
+DONATION_FIELDS = [
+    ("ID", column(0)),
+    ("Amount", money(1)),
+    ("Date", column(2)),
+    ("Notes", column(3)),
+    ("Donor ID", column(4, empty="None")),
+    ("Event ID", column(5, empty="None")),
+    ("Business ID", column(6, empty="None")),
+    ("Beneficiary ID", column(7)),
+]
 
 def display_donations(donations): # Display all donation records in a consistent format
-    if not donations: # Check if the donations list is empty. If empty, print a message and return False
-        print("\033[93mNo donations found in database.\033[0m")
+    if not donations:
+        print(paint("No donations found in database.", YELLOW))
         return False
-    for d in donations: # Iterate through each donation record in the donations list Print the details of each donation record in a formatted manner
-        print(
-            f"\033[92mID:\033[0m {d[0]} "
-            f"\033[92mAmount:\033[0m £{d[1]:,.2f} "
-            f"\033[92mDate:\033[0m {d[2]} "
-            f"\033[92mNotes:\033[0m {d[3]} "
-            f"\033[92mDonor ID:\033[0m {d[4] if d[4] else 'None'} "
-            f"\033[92mEvent ID:\033[0m {d[5] if d[5] else 'None'} "
-            f"\033[92mBusiness ID:\033[0m {d[6] if d[6] else 'None'} "
-            f"\033[92mBeneficiary ID:\033[0m {d[7]}"
-        )
+    render_records(donations, DONATION_FIELDS)
     return True
 
+# ID/name fields for the pick lists shown before entering a donation
+NAME_FIELDS = [("ID", column(0)), ("Name", column(1))]
+
+# The pick lists come from the ID -> name cache (start/cache.py), so entering donation after
+# donation does not read these tables again unless one of them has changed
+def show_pick_lists(): # Print the Donors, Events, Businesses and Beneficiaries a donation can refer to
+    for title, table in [("Donors", "Donor"), ("Events", "Event"), ("Businesses", "Business"), ("Beneficiaries", "Beneficiary")]:
+        print(paint(f"\nAvailable {title}:", GREEN))
+        render_records(name_map(table).items(), NAME_FIELDS, pager=True)  # Long lists open in a pager
+
 def donation_input(action, display_entities=True):# Collect and validate donation information from user 
     if display_entities:# Display available entities if the flag is set to True
-        print("\n\033[93mTip: Choose one sender ID (Donor, Event, or Business) and one Beneficiary ID.\033[0m")
+        print("\n" + paint("Tip: Choose one sender ID (Donor, Event, or Business) and one Beneficiary ID.", YELLOW))
 
     donor_id = input(f"{action} Donor ID (leave blank if not applicable): ").strip() # Check if the user wants to input a donor ID
     event_id = input(f"{action} Event ID (leave blank if not applicable): ").strip() # Check if the user wants to input an event ID
@@ -42,33 +58,42 @@ def donation_input(action, display_entities=True):# Collect and validate donatio
     beneficiary_id = input(f"{action} Beneficiary ID: ").strip() # Check if the user wants to input a beneficiary ID
 
     if not beneficiary_id.isdigit(): # Check if the beneficiary ID is a number # If not, print an error message and return None
-        print("\033[91m🚫 Beneficiary ID must be a number.\033[0m")
+        print(paint("🚫 Beneficiary ID must be a number.", RED))
         return None
 
     if donor_id and not donor_id.isdigit():
-        print("\033[91m🚫 Donor ID must be numeric if provided.\033[0m")
+        print(paint("🚫 Donor ID must be numeric if provided.", RED))
         return None
     if event_id and not event_id.isdigit():
-        print("\033[91m🚫 Event ID must be numeric if provided.\033[0m")
+        print(paint("🚫 Event ID must be numeric if provided.", RED))
         return None
     if business_id and not business_id.isdigit():
-        print("\033[91m🚫 Business ID must be numeric if provided.\033[0m")
+        print(paint("🚫 Business ID must be numeric if provided.", RED))
+        return None
+    if [donor_id, event_id, business_id].count("") != 2:
+        print(paint("🚫 Choose exactly one sender ID (Donor, Event, or Business).", RED))
         return None
 
-    print("\033[93mTip: Enter a valid positive amount (e.g., 100.50)\033[0m")
+    # All the IDs are looked up at once, before the rest of the donation is typed in
+    missing = missing_records({"Donor": donor_id, "Event": event_id, "Business": business_id,
+                               "Beneficiary": beneficiary_id})
+    if missing:
+        for table, record_id in missing:
+            print(paint(f"🚫 There is no {table} with ID {record_id}.", RED))
+        return None
+
+    print(paint("Tip: Enter a valid positive amount (e.g., 100.50)", YELLOW))
     amount_input = input(f"{action} Donation Amount: ").strip()
     try:
-        amount = float(amount_input) # Convert the input to a float. Check if the amount is a valid positive number
-        if amount <= 0: # If the amount is not positive, raise a ValueError
-            raise ValueError("Amount must be positive")
+        amount = parse_positive_amount(amount_input) # Convert the input to a float. Raises ValueError if it is not a valid positive number
     except ValueError: # If the conversion fails or the amount is not positive, print an error message and return Non
-        print("\033[91m🚫 Invalid amount. Must be a positive number.\033[0m")
+        print(paint("🚫 Invalid amount. Must be a positive number.", RED))
         return None
 
-    print("\033[93mTip: Use the format YYYY-MM-DD for the donation date.\033[0m")
+    print(paint("Tip: Use the format YYYY-MM-DD for the donation date.", YELLOW))
     date = input(f"{action} Date (YYYY-MM-DD): ").strip() # Check if the date is in the correct format YYYY-MM-DD
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", date): # Regex to check date format If the date is not in the correct format, print an error message and return None
-        print("\033[91m🚫 Date must be in format YYYY-MM-DD.\033[0m")
+    if not is_valid_date(date): # Regex to check date format If the date is not in the correct format, print an error message and return None
+        print(paint("🚫 Date must be in format YYYY-MM-DD.", RED))
         return None
 
     notes = input(f"{action} Notes (optional): ").strip()
@@ -81,6 +106,88 @@ def donation_input(action, display_entities=True):# Collect and validate donatio
         beneficiary_id
     )
 
+# Batch entry line prefix -> (Donation column, record type) of the sender
+SENDER_CODES = {"d": ("Donor_ID", "Donor"), "e": ("Event_ID", "Event"), "b": ("Business_ID", "Business")}
+
+def parse_gift_line(line, date, names):
+    """
+    Turns one batch entry line into donation values, e.g. "d12 3 25.50 cash at the door":
+    sender (d = Donor, e = Event, b = Business, followed by its ID), Beneficiary ID, amount, optional notes.
+    names holds the ID -> name maps of the pick lists, so unknown IDs are caught without asking the database.
+    Returns:
+        tuple: Values for the Donation INSERT (see start.validation.validate_donation)
+    Raises:
+        ValueError: With a message for the user if the line is not valid
+    """
+    parts = line.split(maxsplit=3)
+    if len(parts) < 3:
+        raise ValueError("Type: sender beneficiary amount [notes], e.g. d12 3 25.50")
+    sender, beneficiary, amount = parts[:3]
+    code = sender[:1].lower()
+    if code not in SENDER_CODES:
+        raise ValueError("The sender must start with d (Donor), e (Event) or b (Business), e.g. d12")
+    column_name, entity = SENDER_CODES[code]
+    record = {column_name: sender[1:], "Beneficiary_ID": beneficiary, "Amount": amount,
+              "Date": date, "Notes": parts[3] if len(parts) > 3 else ""}
+    values = validate_donation(record)
+    if int(sender[1:]) not in names[entity]:
+        raise ValueError(f"No {entity} with ID {sender[1:]}")
+    if int(beneficiary) not in names["Beneficiary"]:
+        raise ValueError(f"No Beneficiary with ID {beneficiary}")
+    return values
+
+def _sender(values, names):
+    # Name of the Donor, Event or Business a donation comes from
+    for (column_name, entity), value in zip(SENDER_CODES.values(), values[3:6]):
+        if value is not None:
+            return names[entity][int(value)]
+
+def batch_entry():
+    """
+    Rapid entry of many donations: the pick lists are shown once, every line is checked
+    as soon as it is typed, and the whole batch is saved with one commit.
+    """
+    show_pick_lists()
+    names = {entity: name_map(entity) for entity in ("Donor", "Event", "Business", "Beneficiary")}
+
+    date = input(f"\nDate of these donations (Enter for today, {datetime.date.today().isoformat()}): ").strip() or datetime.date.today().isoformat()
+    if not is_valid_date(date):
+        print(paint("🚫 Date must be in format YYYY-MM-DD.", RED))
+        return
+
+    print("\n" + paint("Tip: One donation per line: sender beneficiary amount [notes]", YELLOW))
+    print(paint("     sender = d<Donor ID>, e<Event ID> or b<Business ID>, e.g. d12 3 25.50 cash at the door", YELLOW))
+    print(paint("     'undo' removes the last line, 'cancel' drops the batch, an empty line saves it.", YELLOW))
+
+    batch = DonationBatch()
+    while True:
+        line = input(f"[{len(batch.added) + 1}] ").strip()
+        if not line:
+            break
+        if line.lower() == "cancel":
+            batch.rollback()
+            print(paint("Batch cancelled, nothing was saved.", YELLOW))
+            return
+        if line.lower() == "undo":
+            removed = batch.undo()
+            print(paint(f"Removed donation of £{removed[0]:,.2f}." if removed else "Nothing to undo.", YELLOW))
+            continue
+        try:
+            values = parse_gift_line(line, date, names)
+        except ValueError as e:
+            print(paint(f"🚫 {e} (line skipped)", RED))
+            continue
+        batch.add(values)
+        print(paint(f"  ✔ £{values[0]:,.2f} from {_sender(values, names)} to {names['Beneficiary'][int(values[6])]}", GREEN))
+
+    total = batch.total()
+    saved, rejected = batch.commit()
+    for values, reason in rejected:
+        total -= values[0]
+        print(paint(f"🚫 Not saved: £{values[0]:,.2f} from {_sender(values, names)} ({reason})", RED))
+    print(paint(f"🎉 {len(saved)} donation{'s' if len(saved) != 1 else ''} saved, £{total:,.2f} in total.", GREEN))
+    show_milestone_notifications()
+
 def donation_menu():
     """
     Main donation management interface
@@ -94,47 +201,28 @@ def donation_menu():
         print("2️⃣  Add Donation")
         print("3️⃣  Update Donation")
         print("4️⃣  Delete Donation")
-        print("5️⃣  🔙 Back to Main Menu")
+        print("5️⃣  ⚡ Batch Entry (many donations, saved together)")
+        print("6️⃣  🔙 Back to Main Menu")
         print("-" * 60)
 
-        choice = input("\n Choose an option (1-5): ").strip()
+        choice = input("\n Choose an option (1-6): ").strip()
 
-        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]:
-            print("\033[91m🚫 Invalid choice. Please choose a number between 1 and 5.\033[0m")
+        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6"]:
+            print(paint("🚫 Invalid choice. Please choose a number between 1 and 6.", RED))
             continue
 
         # View all donations
         if choice == "1":
             try:
-                print("\n\033[92mAll Donations:\033[0m")
-                donations = view_all("Donation")
-                display_donations(donations)
+                print("\n" + paint("All Donations:", GREEN))
+                browse("Donation", display_donations)
             except Exception as e:
-                print(f"\033[91m🚫 Error viewing donations: {str(e)}\033[0m")
+                print(paint(f"🚫 Error viewing donations: {str(e)}", RED))
 
         # Add new donation
         elif choice == "2":
             try:
-                # Display available entities directly in the menu
-                print("\n\033[92mAvailable Donors:\033[0m")
-                donors = view_all("Donor")
-                for donor in donors:
-                    print(f"\033[92mID:\033[0m {donor[0]} \033[92mName:\033[0m {donor[1]} {donor[2]}")
-
-                print("\n\033[92mAvailable Events:\033[0m")
-                events = view_all("Event")
-                for event in events:
-                    print(f"\033[92mID:\033[0m {event[0]} \033[92mName:\033[0m {event[1]}")
-
-                print("\n\033[92mAvailable Businesses:\033[0m")
-                businesses = view_all("Business")
-                for business in businesses:
-                    print(f"\033[92mID:\033[0m {business[0]} \033[92mName:\033[0m {business[1]}")
-
-                print("\n\033[92mAvailable Beneficiaries:\033[0m")
-                beneficiaries = view_all("Beneficiary")
-                for beneficiary in beneficiaries:
-                    print(f"\033[92mID:\033[0m {beneficiary[0]} \033[92mName:\033[0m {beneficiary[1]}")
+                show_pick_lists()  # Display available entities directly in the menu
 
                 data = donation_input("Add", display_entities=False)
                 if data:
@@ -144,43 +232,24 @@ def donation_menu():
                         VALUES (?,?,?,?,?,?,?)""",
                         data
                     )
-                    print("\033[92m🎉 Donation recorded successfully.\033[0m")
+                    print(paint("🎉 Donation recorded successfully.", GREEN))
+                    show_milestone_notifications()
             except Exception as e:
-                print(f"\033[91m🚫 Error adding donation: {str(e)}\033[0m")
+                print(paint(f"🚫 Error adding donation: {str(e)}", RED))
 
         # Update existing donation
         elif choice == "3":
             try:
-                print("\n\033[92mAll Donations:\033[0m")
-                donations = view_all("Donation")
-                if not display_donations(donations):
+                print("\n" + paint("All Donations:", GREEN))
+                if not browse("Donation", display_donations):
                     continue
 
                 donation_id = input("\nEnter Donation ID to update: ").strip()
                 if not donation_id.isdigit():
-                    print("\033[91m🚫 Donation ID must be a number.\033[0m")
+                    print(paint("🚫 Donation ID must be a number.", RED))
                     continue
 
-                # Display available entities directly in the menu
-                print("\n\033[92mAvailable Donors:\033[0m")
-                donors = view_all("Donor")
-                for donor in donors:
-                    print(f"\033[92mID:\033[0m {donor[0]} \033[92mName:\033[0m {donor[1]} {donor[2]}")
-
-                print("\n\033[92mAvailable Events:\033[0m")
-                events = view_all("Event")
-                for event in events:
-                    print(f"\033[92mID:\033[0m {event[0]} \033[92mName:\033[0m {event[1]}")
-
-                print("\n\033[92mAvailable Businesses:\033[0m")
-                businesses = view_all("Business")
-                for business in businesses:
-                    print(f"\033[92mID:\033[0m {business[0]} \033[92mName:\033[0m {business[1]}")
-
-                print("\n\033[92mAvailable Beneficiaries:\033[0m")
-                beneficiaries = view_all("Beneficiary")
-                for beneficiary in beneficiaries:
-                    print(f"\033[92mID:\033[0m {beneficiary[0]} \033[92mName:\033[0m {beneficiary[1]}")
+                show_pick_lists()  # Display available entities directly in the menu
 
                 data = donation_input("New", display_entities=False)
                 if data:
@@ -190,30 +259,37 @@ def donation_menu():
                         WHERE Donation_ID=?""",
                         (*data, donation_id)
                     )
-                    print("\033[92m🎉 Donation updated successfully.\033[0m")
+                    print(paint("🎉 Donation updated successfully.", GREEN))
+                    show_milestone_notifications()
             except Exception as e:
-                print(f"\033[91m🚫 Error updating donation: {str(e)}\033[0m")
+                print(paint(f"🚫 Error updating donation: {str(e)}", RED))
 
         # Delete donation
         elif choice == "4":
             try:
-                print("\n\033[92mAll Donations:\033[0m")
-                donations = view_all("Donation")
-                if not display_donations(donations):
+                print("\n" + paint("All Donations:", GREEN))
+                if not browse("Donation", display_donations):
                     continue
 
                 donation_id = input("\nEnter Donation ID to delete: ").strip()
                 if not donation_id.isdigit():
-                    print("\033[91m🚫 Donation ID must be numeric.\033[0m")
+                    print(paint("🚫 Donation ID must be numeric.", RED))
                     continue
 
                 delete_entry("DELETE FROM Donation WHERE Donation_ID=?", donation_id)
-                print("\033[92m🎉 Donation deleted successfully.\033[0m")
+                print(paint("🎉 Donation deleted successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error deleting donation: {str(e)}\033[0m")
+                print(paint(f"🚫 Error deleting donation: {str(e)}", RED))
 
-        # Return to main menu
+        # Rapid entry of many donations in one transaction
         elif choice == "5":
+            try:
+                batch_entry()
+            except Exception as e:
+                print(paint(f"🚫 Error in batch entry: {str(e)}", RED))
+
+        # Return to main menu
+        elif choice == "6":
             break
 
 if __name__ == "__main__":
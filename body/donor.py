@@ -1,9 +1,4 @@
 # donor.py
-import sys
-import os
-import re
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 """
 This module handles all donor-related operations in the donation system.
 It provides a menu interface for managing donor records including:
@@ -13,58 +8,63 @@ It provides a menu interface for managing donor records including:
 - Deleting donors (with donation checks)
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry, linked_donations
+from start.crud import add_entry, update_entry, bulk_delete
+from body.pager import browse
+from body.render import render_records, print_delete_result, paint, column, GREEN, YELLOW, RED
+from start.validation import is_valid_date, is_letters, is_valid_email, parse_ids
+
+# Fields shown for each donor: (label, function that returns the value)
+DONOR_FIELDS = [
+    ("ID", column(0)),
+    ("Name", lambda i: f"{i[1]} {i[2]}"),
+    ("Email", column(3)),
+    ("Phone", column(4)),
+    ("Address", column(5)),
+    ("DOB", column(6)),
+]
 
 def display_donors(donors):
     """Display all donor records in a consistent format"""
     if not donors:
-        print("\033[93mNo donors found in database.\033[0m")
+        print(paint("No donors found in database.", YELLOW))
         return False
-    for i in donors:
-        print(
-            f"\033[92mID:\033[0m {i[0]} "
-            f"\033[92mName:\033[0m {i[1]} {i[2]} "
-            f"\033[92mEmail:\033[0m {i[3]} "
-            f"\033[92mPhone:\033[0m {i[4]} "
-            f"\033[92mAddress:\033[0m {i[5]} "
-            f"\033[92mDOB:\033[0m {i[6]}"
-        )
+    render_records(donors, DONOR_FIELDS)
     return True
 
 def donor_input(action):
     """Collect and validate donor information from user"""
-    print("\n\033[93mTip: Names should contain only letters.\033[0m")
+    print("\n" + paint("Tip: Names should contain only letters.", YELLOW))
     
     first_name = input(f"{action} First Name: ").strip()
-    if not first_name.replace(" ", "").isalpha():
-        print("\033[91m🚫 First name must contain only letters.\033[0m")
+    if not is_letters(first_name):
+        print(paint("🚫 First name must contain only letters.", RED))
         return None
     first_name = first_name.capitalize()
 
     last_name = input(f"{action} Last Name: ").strip()
-    if not last_name.replace(" ", "").isalpha():
-        print("\033[91m🚫 Last name must contain only letters.\033[0m")
+    if not is_letters(last_name):
+        print(paint("🚫 Last name must contain only letters.", RED))
         return None
     last_name = last_name.capitalize()
 
-    print("\033[93mTip: Use a valid email format (e.g., name@example.com).\033[0m")
+    print(paint("Tip: Use a valid email format (e.g., name@example.com).", YELLOW))
     email = input(f"{action} Email: ").strip()
-    if "@" not in email or "." not in email:
-        print("\033[91m🚫 Please enter a valid email address.\033[0m")
+    if not is_valid_email(email):
+        print(paint("🚫 Please enter a valid email address.", RED))
         return None
 
-    print("\033[93mTip: Phone number must be digits only.\033[0m")
+    print(paint("Tip: Phone number must be digits only.", YELLOW))
     phone = input(f"{action} Phone Number: ").strip()
     if not phone.isdigit():
-        print("\033[91m🚫 Phone number must contain only digits.\033[0m")
+        print(paint("🚫 Phone number must contain only digits.", RED))
         return None
 
     address = input(f"{action} Address: ").strip()
 
-    print("\033[93mTip: Use format YYYY-MM-DD for date of birth.\033[0m")
+    print(paint("Tip: Use format YYYY-MM-DD for date of birth.", YELLOW))
     dob = input(f"{action} Date of Birth (YYYY-MM-DD): ").strip()
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob):
-        print("\033[91m🚫 Date must be in format YYYY-MM-DD.\033[0m")
+    if not is_valid_date(dob):
+        print(paint("🚫 Date must be in format YYYY-MM-DD.", RED))
         return None
 
     return (first_name, last_name, email, phone, address, dob)
@@ -88,17 +88,16 @@ def donor_menu():
         choice = input("\n Choose an option (1-5): ").strip()
 
         if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]:
-            print("\033[91m🚫 Invalid choice. Please choose a number between 1 and 5.\033[0m")
+            print(paint("🚫 Invalid choice. Please choose a number between 1 and 5.", RED))
             continue
 
         # View all donors
         if choice == "1":
             try:
-                print("\n\033[92mAll Donors:\033[0m")
-                donors = view_all("Donor")
-                display_donors(donors)
+                print("\n" + paint("All Donors:", GREEN))
+                browse("Donor", display_donors)
             except Exception as e:
-                print(f"\033[91m🚫 Error viewing donors: {str(e)}\033[0m")
+                print(paint(f"🚫 Error viewing donors: {str(e)}", RED))
 
         # Add new donor
         elif choice == "2":
@@ -109,21 +108,20 @@ def donor_menu():
                         "INSERT INTO Donor VALUES (NULL,?,?,?,?,?,?)",
                         data
                     )
-                    print("\033[92m🎉 Donor added successfully.\033[0m")
+                    print(paint("🎉 Donor added successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error adding donor: {str(e)}\033[0m")
+                print(paint(f"🚫 Error adding donor: {str(e)}", RED))
 
         # Update existing donor
         elif choice == "3":
             try:
-                print("\n\033[92mList of All Donors:\033[0m")
-                donors = view_all("Donor")
-                if not display_donors(donors):
+                print("\n" + paint("List of All Donors:", GREEN))
+                if not browse("Donor", display_donors):
                     continue
 
                 donor_id = input("\nEnter Donor ID to update: ").strip()
                 if not donor_id.isdigit():
-                    print("\033[91m🚫 Donor ID must be numeric.\033[0m")
+                    print(paint("🚫 Donor ID must be numeric.", RED))
                     continue
 
                 data = donor_input("New")
@@ -132,31 +130,27 @@ def donor_menu():
                         "UPDATE Donor SET First_Name=?, Last_Name=?, Email=?, Phone_Number=?, Address=?, Date_of_Birth=? WHERE Donor_ID=?",
                         (*data, donor_id)
                     )
-                    print("\033[92m🎉 Donor updated successfully.\033[0m")
+                    print(paint("🎉 Donor updated successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error updating donor: {str(e)}\033[0m")
+                print(paint(f"🚫 Error updating donor: {str(e)}", RED))
 
         # Delete donor
         elif choice == "4":
             try:
-                print("\n\033[92mList of All Donors:\033[0m")
-                donors = view_all("Donor")
-                if not display_donors(donors):
-                    continue
-
-                donor_id = input("\nEnter Donor ID to delete: ").strip()
-                if not donor_id.isdigit():
-                    print("\033[91m🚫 Donor ID must be numeric.\033[0m")
+                print("\n" + paint("List of All Donors:", GREEN))
+                if not browse("Donor", display_donors):
                     continue
 
-                if linked_donations("Donor_ID", donor_id):
-                    print("\033[91m🚫 Cannot delete Donor linked to existing Donations.\033[0m")
+                try:
+                    donor_ids = parse_ids(input("\nEnter Donor ID(s) to delete, separated by commas: "))
+                except ValueError:
+                    print(paint("🚫 Donor ID must be numeric.", RED))
                     continue
 
-                delete_entry("DELETE FROM Donor WHERE Donor_ID=?", donor_id)
-                print("\033[92m🎉 Donor deleted successfully.\033[0m")
+                # One transaction: donors with donations are kept, all others are deleted together
+                print_delete_result("Donor", *bulk_delete("Donor", donor_ids))
             except Exception as e:
-                print(f"\033[91m🚫 Error deleting donor: {str(e)}\033[0m")
+                print(paint(f"🚫 Error deleting donor: {str(e)}", RED))
 
         # Return to main menu
         elif choice == "5":
@@ -1,9 +1,4 @@
 # event.py
-import sys
-import os
-import re
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 """
 This module handles all event-related operations in the donation system.
 It provides a menu interface for managing fundraising events including:
@@ -11,53 +6,103 @@ It provides a menu interface for managing fundraising events including:
 - Adding new events
 - Updating existing events
 - Deleting events (with donation checks)
+- Showing fundraising progress against each event's goal
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry, linked_donations
+from start.crud import add_entry, update_entry, bulk_delete, iter_query
+from start.summaries import pending_milestones
+from body.pager import browse, browse_rows
+from body.render import render_records, print_delete_result, render_table, paint, column, money, GREEN, YELLOW, RED
+from start.validation import is_valid_date, parse_positive_amount, parse_ids
+
+# Fields shown for each event: (label, function that returns the value)
+EVENT_FIELDS = [
+    ("ID", column(0)),
+    ("Name", column(1)),
+    ("Date", column(2)),
+    ("Location", column(3)),
+    ("Goal", money(4)),
+    ("Description", column(5)),
+]
 
 def display_events(events):
     """Display all event records in a consistent format"""
     if not events:
-        print("\033[93mNo events found in database.\033[0m")
+        print(paint("No events found in database.", YELLOW))
         return False
-    for i in events:
-        print(
-            f"\033[92mID:\033[0m {i[0]} "
-            f"\033[92mName:\033[0m {i[1]} "
-            f"\033[92mDate:\033[0m {i[2]} "
-            f"\033[92mLocation:\033[0m {i[3]} "
-            f"\033[92mGoal:\033[0m £{i[4]:,.2f} "
-            f"\033[92mDescription:\033[0m {i[5]}"
-        )
+    render_records(events, EVENT_FIELDS)
     return True
 
+# Columns of the fundraising progress table
+PROGRESS_FIELDS = [
+    ("ID", column(0)),
+    ("Name", column(1)),
+    ("Goal", money(2)),
+    ("Raised", money(3)),
+    ("Progress", lambda i: f"{i[4]:.1f}%"),
+    ("Remaining", money(5)),
+]
+
+def display_progress(events):
+    """Display one page of the fundraising progress table"""
+    if not events:
+        print(paint("No events found in database.", YELLOW))
+        return False
+    render_table(events, PROGRESS_FIELDS)
+    return True
+
+def show_event_progress():
+    """
+    Show raised vs goal for every event.
+    The raised amount is the running total kept in Event_Summary by the Donation triggers,
+    so this is one lookup per event instead of adding up its donations.
+    """
+    events = iter_query("""
+        SELECT Event.Event_ID, Event.Name, COALESCE(Event.Fundraising_Goal, 0),
+               COALESCE(Event_Summary.Total_Amount, 0),
+               CASE WHEN Event.Fundraising_Goal > 0
+                    THEN COALESCE(Event_Summary.Total_Amount, 0) * 100.0 / Event.Fundraising_Goal
+                    ELSE 0 END,
+               MAX(COALESCE(Event.Fundraising_Goal, 0) - COALESCE(Event_Summary.Total_Amount, 0), 0)
+        FROM Event
+        LEFT JOIN Event_Summary ON Event_Summary.Event_ID = Event.Event_ID
+        ORDER BY Event.Event_ID
+    """)
+    browse_rows(events, display_progress)
+
+def show_milestone_notifications():
+    """Announce events that crossed 50%, 75% or 100% of their goal since the last check"""
+    for event_id, name, threshold, reached_at in pending_milestones():
+        if threshold >= 100:
+            print(paint(f"🎉 {name} (Event ID {event_id}) has reached its fundraising goal!", GREEN))
+        else:
+            print(paint(f"🎉 {name} (Event ID {event_id}) has raised {threshold}% of its fundraising goal.", GREEN))
+
 def event_input(action):
     """Collect and validate event information from user"""
-    print("\n\033[93mTip: Event name cannot be empty and should be clear.\033[0m")
+    print("\n" + paint("Tip: Event name cannot be empty and should be clear.", YELLOW))
     name = input(f"{action} Event Name: ").strip()
     if not name:
-        print("\033[91m🚫 Event name cannot be empty.\033[0m")
+        print(paint("🚫 Event name cannot be empty.", RED))
         return None
 
-    print("\033[93mTip: Use the format YYYY-MM-DD for date.\033[0m") 
+    print(paint("Tip: Use the format YYYY-MM-DD for date.", YELLOW)) 
     date = input(f"{action} Date (YYYY-MM-DD): ").strip()
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", date):
-        print("\033[91m🚫 Date must be in YYYY-MM-DD format.\033[0m")
+    if not is_valid_date(date):
+        print(paint("🚫 Date must be in YYYY-MM-DD format.", RED))
         return None
 
-    print("\033[93mTip: Location cannot be left blank.\033[0m")
+    print(paint("Tip: Location cannot be left blank.", YELLOW))
     location = input(f"{action} Location: ").strip()
     if not location:
-        print("\033[91m🚫 Location cannot be empty.\033[0m")
+        print(paint("🚫 Location cannot be empty.", RED))
         return None
 
-    print("\033[93mTip: Goal must be a positive number (e.g., 5000.00).\033[0m") 
+    print(paint("Tip: Goal must be a positive number (e.g., 5000.00).", YELLOW)) 
     try:
-        goal = float(input(f"{action} Fundraising Goal: £"))
-        if goal <= 0: 
-            raise ValueError("Goal must be positive")
+        goal = parse_positive_amount(input(f"{action} Fundraising Goal: £"))
     except ValueError:
-        print("\033[91m🚫 Invalid amount. Please enter a positive number.\033[0m")
+        print(paint("🚫 Invalid amount. Please enter a positive number.", RED))
         return None
 
     desc = input(f"{action} Description (optional): ").strip()
@@ -77,23 +122,23 @@ def event_menu():
         print("2️⃣  Add Event")
         print("3️⃣  Update Event")
         print("4️⃣  Delete Event")
-        print("5️⃣  🔙 Back to Main Menu")
+        print("5️⃣  📈 Fundraising Progress")
+        print("6️⃣  🔙 Back to Main Menu")
         print("-" * 60)
 
-        choice = input("\n Choose an option (1-5): ").strip()
+        choice = input("\n Choose an option (1-6): ").strip()
 
-        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]:
-            print("\033[91m🚫 Invalid choice. Please choose a number between 1 and 5.\033[0m")
+        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6"]:
+            print(paint("🚫 Invalid choice. Please choose a number between 1 and 6.", RED))
             continue
 
         # View all events
         if choice == "1":
             try:
-                print("\n\033[92mAll Events:\033[0m")
-                events = view_all("Event")
-                display_events(events)
+                print("\n" + paint("All Events:", GREEN))
+                browse("Event", display_events)
             except Exception as e:
-                print(f"\033[91m🚫 Error viewing events: {str(e)}\033[0m")
+                print(paint(f"🚫 Error viewing events: {str(e)}", RED))
 
         # Add new event
         elif choice == "2":
@@ -104,21 +149,20 @@ def event_menu():
                         "INSERT INTO Event VALUES (NULL,?,?,?,?,?)",
                         data
                     )
-                    print("\033[92m🎉 Event added successfully.\033[0m")
+                    print(paint("🎉 Event added successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error adding event: {str(e)}\033[0m")
+                print(paint(f"🚫 Error adding event: {str(e)}", RED))
 
         # Update existing event
         elif choice == "3":
             try:
-                print("\n\033[92mList of All Events:\033[0m")
-                events = view_all("Event")
-                if not display_events(events):
+                print("\n" + paint("List of All Events:", GREEN))
+                if not browse("Event", display_events):
                     continue
 
                 event_id = input("\nEnter Event ID to update: ").strip()
                 if not event_id.isdigit():
-                    print("\033[91m🚫 Event ID must be a number.\033[0m")
+                    print(paint("🚫 Event ID must be a number.", RED))
                     continue
 
                 data = event_input("New")
@@ -127,34 +171,41 @@ def event_menu():
                         "UPDATE Event SET Name=?, Date=?, Location=?, Fundraising_Goal=?, Description=? WHERE Event_ID=?",
                         (*data, event_id)
                     )
-                    print("\033[92m🎉 Event updated successfully.\033[0m")
+                    print(paint("🎉 Event updated successfully.", GREEN))
+                    show_milestone_notifications()  # A lower goal may already be reached
             except Exception as e:
-                print(f"\033[91m🚫 Error updating event: {str(e)}\033[0m")
+                print(paint(f"🚫 Error updating event: {str(e)}", RED))
 
         # Delete event
         elif choice == "4":
             try:
-                print("\n\033[92mList of All Events:\033[0m")
-                events = view_all("Event")
-                if not display_events(events):
+                print("\n" + paint("List of All Events:", GREEN))
+                if not browse("Event", display_events):
                     continue
 
-                event_id = input("\nEnter Event ID to delete: ").strip()
-                if not event_id.isdigit():
-                    print("\033[91m🚫 Event ID must be a number.\033[0m")
+                try:
+                    event_ids = parse_ids(input("\nEnter Event ID(s) to delete, separated by commas: "))
+                except ValueError:
+                    print(paint("🚫 Event ID must be a number.", RED))
                     continue
 
-                if linked_donations("Event_ID", event_id):
-                    print("\033[91m🚫 Cannot delete Event linked to existing Donations.\033[0m")
-                    continue
+                # One transaction: events with donations are kept, all others are deleted together
+                print_delete_result("Event", *bulk_delete("Event", event_ids),
+                                    note=" (Volunteers linked to these events were also automatically deleted)")
+            except Exception as e:
+                print(paint(f"🚫 Error deleting event: {str(e)}", RED))
 
-                delete_entry("DELETE FROM Event WHERE Event_ID=?", event_id)
-                print("\033[92m🎉 Event deleted successfully! (Volunteers linked to this event were also automatically deleted)\033[0m")
+        # Fundraising progress for every event
+        elif choice == "5":
+            try:
+                print("\n" + paint("Fundraising Progress:", GREEN))
+                show_event_progress()
+                show_milestone_notifications()
             except Exception as e:
-                print(f"\033[91m🚫 Error deleting event: {str(e)}\033[0m")
+                print(paint(f"🚫 Error showing fundraising progress: {str(e)}", RED))
 
         # Return to main menu
-        elif choice == "5":
+        elif choice == "6":
             break
 
 if __name__ == "__main__":
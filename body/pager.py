@@ -0,0 +1,61 @@
+# pager.py
+"""
+This module shows long listings one page at a time.
+The entity menus use it instead of loading and printing a whole table,
+so a listing screen uses the same memory and shows its first rows just as
+fast whether the table has ten rows or ten million.
+"""
+
+from itertools import islice
+
+from start.crud import fetch_page
+from body.render import paint, YELLOW
+
+PAGE_SIZE = 20  # Rows shown per page
+
+def _next_page_wanted():
+    answer = input(paint("Press Enter for the next page, or q to stop: ", YELLOW)).strip().lower()
+    return answer != "q"
+
+def browse(table, display, columns=None, order_by=None, page_size=PAGE_SIZE):
+    """
+    Shows a table page by page using keyset pagination (start.crud.fetch_page).
+    Parameters:
+        table (str): Table to list
+        display (function): Prints a list of rows and returns False when the list is empty
+        columns (list/None): Columns to fetch, all columns if None
+        order_by (str/None): Column to sort by, primary key if None
+        page_size (int): Rows per page
+    Returns:
+        bool: False if the table is empty, True otherwise
+    """
+    rows, after = fetch_page(table, columns, order_by, limit=page_size)
+    if not display(rows):
+        return False
+    while after is not None and _next_page_wanted():
+        rows, after = fetch_page(table, columns, order_by, after=after, limit=page_size)
+        if rows:
+            display(rows)
+    return True
+
+def browse_rows(rows, display, page_size=PAGE_SIZE):
+    """
+    Shows rows from an iterator page by page (e.g. start.crud.iter_query for a join).
+    Only one page is taken from the iterator at a time.
+    Returns:
+        bool: False if there were no rows, True otherwise
+    """
+    rows = iter(rows)
+    try:
+        page = list(islice(rows, page_size))
+        if not display(page):
+            return False
+        while len(page) == page_size:
+            page = list(islice(rows, page_size))
+            if not page or not _next_page_wanted():
+                break
+            display(page)
+        return True
+    finally:
+        if hasattr(rows, "close"):
+            rows.close()  # Stop the query early if the user quit before the last page
@@ -0,0 +1,141 @@
+# render.py
+"""
+This module is the shared rendering layer for all listing screens.
+
+- Rows are formatted in batches and written with one sys.stdout.write() per batch
+  instead of one print() per row.
+- ANSI colours are only used when stdout is a terminal (and NO_COLOR is not set),
+  so output that is piped or redirected to a file stays clean.
+- Records can be shown as "Label: value" lines (the classic look of the menus)
+  or as an aligned table, optionally through a pager for long output.
+
+A listing is described by a list of fields: (label, function that takes a row and returns the value).
+"""
+
+import os
+import shutil
+import sys
+from operator import itemgetter
+
+GREEN = "92"
+YELLOW = "93"
+RED = "91"
+
+BATCH_SIZE = 1000  # Lines formatted before each write
+
+
+def use_colour(stream=None):
+    """True if ANSI colours should be written to the stream (stdout by default)"""
+    stream = stream or sys.stdout
+    return "NO_COLOR" not in os.environ and hasattr(stream, "isatty") and stream.isatty()
+
+
+def paint(text, colour):
+    """Wraps text in an ANSI colour code when colours are enabled"""
+    return f"\033[{colour}m{text}\033[0m" if use_colour() else text
+
+
+def column(index, empty=None):
+    """Field function returning row[index] (or the text `empty` when the value is missing)"""
+    if empty is None:
+        return itemgetter(index)
+    return lambda row: row[index] if row[index] else empty
+
+
+def money(index):
+    """Field function formatting row[index] as pounds, e.g. £1,250.00"""
+    return lambda row: f"£{row[index]:,.2f}"
+
+
+def write_lines(lines, stream=None):
+    """Writes lines in batches, one write() call per BATCH_SIZE lines"""
+    stream = stream or sys.stdout
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= BATCH_SIZE:
+            stream.write("\n".join(batch) + "\n")
+            batch.clear()
+    if batch:
+        stream.write("\n".join(batch) + "\n")
+    stream.flush()
+
+
+def record_formatter(fields, separator=" "):
+    """Returns a function that formats one row as 'Label: value' pairs"""
+    labels = [paint(f"{label}:", GREEN) + " " for label, _ in fields]
+    getters = [get for _, get in fields]
+    pairs = list(zip(labels, getters))
+
+    def format_row(row):
+        return separator.join(label + str(get(row)) for label, get in pairs)
+    return format_row
+
+
+def render_records(rows, fields, separator=" ", pager=False):
+    """
+    Prints rows as 'Label: value' lines.
+    Parameters:
+        rows (iterable): Rows to print
+        fields (list): (label, function(row) -> value) pairs
+        separator (str): Text between two fields
+        pager (bool): Show the output through a pager when it is longer than the terminal
+    """
+    lines = map(record_formatter(fields, separator), rows)
+    _output(lines, pager)
+
+
+def render_table(rows, fields, pager=False):
+    """
+    Prints rows as an aligned table with a header line.
+    All rows are formatted first because the column widths depend on every row.
+    """
+    header = [label for label, _ in fields]
+    body = [[str(get(row)) for _, get in fields] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in body]) for i, h in enumerate(header)]
+
+    def line(cells):
+        return "  ".join(cell.ljust(width) for cell, width in zip(cells, widths)).rstrip()
+
+    lines = [paint(line(header), GREEN), "  ".join("-" * w for w in widths)]
+    lines += [line(cells) for cells in body]
+    _output(lines, pager)
+
+
+def display_function(fields, empty_message, separator=" "):
+    """
+    Builds a display function for body.pager.browse()/browse_rows():
+    it prints a page of rows, or empty_message when there are none, and returns whether rows were shown.
+    """
+    format_row = None
+
+    def display(rows):
+        nonlocal format_row
+        if not rows:
+            print(paint(empty_message, YELLOW))
+            return False
+        format_row = format_row or record_formatter(fields, separator)
+        write_lines(map(format_row, rows))
+        return True
+    return display
+
+
+def print_delete_result(entity, deleted, blocked, missing, note=""):
+    """Reports the outcome of start.crud.bulk_delete() in the colours of the menus"""
+    ids = lambda values: ", ".join(map(str, values))
+    if deleted:
+        print(paint(f"🎉 Deleted {len(deleted)} {entity} record(s): {ids(deleted)}{note}", GREEN))
+    if blocked:
+        print(paint(f"🚫 Cannot delete {entity} linked to existing Donations: {ids(blocked)}", RED))
+    if missing:
+        print(paint(f"No {entity} found with ID: {ids(missing)}", YELLOW))
+
+
+def _output(lines, pager):
+    if pager and sys.stdout.isatty():
+        lines = list(lines)
+        if len(lines) > shutil.get_terminal_size().lines - 2:
+            import pydoc  # Imported here: it is slow to import and only needed for long listings
+            pydoc.pager("\n".join(lines))
+            return
+    write_lines(lines)
@@ -0,0 +1,110 @@
+# report.py
+"""
+This module provides the Reports menu.
+It shows donation totals per Beneficiary, Donor, Business and Event, read from the
+summary tables that the Donation triggers keep up to date (start/summaries.py),
+so a report never has to add up the Donation table itself.
+"""
+
+from start.crud import iter_query
+from start.cache import NAME_EXPRESSIONS
+from start.summaries import SUMMARY_SOURCES, summary_table, get_summary, rebuild_summaries
+from body.pager import browse_rows
+from body.render import render_table, paint, column, money, GREEN, YELLOW, RED
+
+REPORT_FIELDS = [
+    ("ID", column(0)),
+    ("Name", column(1)),
+    ("Donations", column(2)),
+    ("Total", money(3)),
+    ("Smallest", money(4)),
+    ("Largest", money(5)),
+    ("Last Gift", column(6)),
+]
+
+def display_report_page(rows):
+    """Print one page of a totals report as a table"""
+    if not rows:
+        print(paint("No donations recorded yet.", YELLOW))
+        return False
+    render_table(rows, REPORT_FIELDS)
+    return True
+
+def show_totals(entity):
+    """List the totals of every record of one entity, largest total first"""
+    key = SUMMARY_SOURCES[entity]
+    rows = iter_query(f"""
+        SELECT s.{key}, {NAME_EXPRESSIONS[entity]}, s.Donation_Count, s.Total_Amount,
+               s.Min_Amount, s.Max_Amount, s.Last_Date
+        FROM {summary_table(entity)} AS s
+        JOIN {entity} ON {entity}.{key} = s.{key}
+        ORDER BY s.Total_Amount DESC
+    """)
+    print("\n" + paint(f"Donation totals by {entity}:", GREEN))
+    browse_rows(rows, display_report_page)
+
+def show_single_total(entity):
+    """Show the totals of one record, looked up by its ID"""
+    record_id = input(f"Enter {entity} ID: ").strip()
+    if not record_id.isdigit():
+        print(paint(f"🚫 {entity} ID must be numeric.", RED))
+        return
+    count, total, smallest, largest, last_date = get_summary(entity, record_id)
+    if not count:
+        print(paint(f"No donations found for this {entity.lower()}.", YELLOW))
+        return
+    # Same columns as the totals listing, without the name
+    render_table([(record_id, None, count, total, smallest, largest, last_date)],
+                 REPORT_FIELDS[:1] + REPORT_FIELDS[2:])
+
+def report_menu():
+    """
+    Reports interface
+    Shows donation totals read from the summary tables
+    """
+    entities = list(SUMMARY_SOURCES)
+    while True:
+        # Display menu options
+        print("\n" + "📊  REPORTS MENU  📊".center(60))
+        print("\n" + "-" * 60)
+        print("1️⃣  Totals by Beneficiary")
+        print("2️⃣  Totals by Donor")
+        print("3️⃣  Totals by Business")
+        print("4️⃣  Totals by Event")
+        print("5️⃣  Totals for one record")
+        print("6️⃣  Rebuild summaries")
+        print("7️⃣  🔙 Back to Main Menu")
+        print("-" * 60)
+
+        choice = input("\n Choose an option (1-7): ").strip()
+
+        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6", "7"]:
+            print(paint("🚫 Invalid choice. Please choose a number between 1 and 7.", RED))
+            continue
+
+        try:
+            if choice == "1":
+                show_totals("Beneficiary")
+            elif choice == "2":
+                show_totals("Donor")
+            elif choice == "3":
+                show_totals("Business")
+            elif choice == "4":
+                show_totals("Event")
+            elif choice == "5":
+                print(paint("Tip: Choose Beneficiary, Donor, Business or Event.", YELLOW))
+                entity = input("Record type: ").strip().capitalize()
+                if entity not in entities:
+                    print(paint("🚫 Record type must be Beneficiary, Donor, Business or Event.", RED))
+                    continue
+                show_single_total(entity)
+            elif choice == "6":
+                rebuild_summaries()
+                print(paint("🎉 Summaries rebuilt from the Donation table.", GREEN))
+            elif choice == "7":
+                break
+        except Exception as e:
+            print(paint(f"🚫 Error running report: {e}", RED))
+
+if __name__ == "__main__":
+    report_menu()
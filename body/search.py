@@ -1,8 +1,4 @@
 # search.py
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 """
 This module provides search functionality across the donation system.
 It allows users to find records based on relationships between entities:
@@ -10,6 +6,12 @@ It allows users to find records based on relationships between entities:
 """
 
 from start.tables import get_connection
+from start.cache import cached_query, cached_rows
+from start.donation_query import search_donations, linked_donations_for, SOURCES
+from start.validation import is_valid_date, parse_positive_amount, parse_ids
+from body.pager import browse_rows
+from start.textsearch import INDEXED_TABLES, search_text
+from body.render import display_function, render_table, paint, column, money, GREEN, YELLOW, RED
 
 # Fetch query results based on parameter
 def fetch_all(query, param):
@@ -17,18 +19,147 @@ def fetch_all(query, param):
     cursor = conn.cursor()
     cursor.execute(query, (param,))
     results = cursor.fetchall()
-    conn.commit()
-    conn.close()
+    conn.release()
     return results
 
-# Helper to get Event ID from Volunteer ID
-def get_event_id_by_volunteer(volunteer_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT Event_ID FROM Volunteer WHERE Volunteer_ID = ?", (volunteer_id,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else None
+# Display functions for the entity lists shown before each search (one page at a time)
+display_donors_list = display_function([
+    ("Donor ID", column(0)), ("Name", lambda i: f"{i[1]} {i[2]}"), ("Email", column(3)),
+    ("Phone", column(4)), ("Address", column(5)), ("DOB", column(6)),
+], "No donors available.")
+
+display_events_list = display_function([
+    ("Event ID", column(0)), ("Name", column(1)), ("Date", column(2)),
+    ("Location", column(3)), ("Goal", money(4)), ("Description", column(5)),
+], "No events available.")
+
+display_businesses_list = display_function([
+    ("Business ID", column(0)), ("Name", column(1)), ("Email", column(2)),
+    ("Phone", column(3)), ("Address", column(4)), ("Registration Date", column(5)),
+], "No businesses available.")
+
+display_beneficiaries_list = display_function([
+    ("Beneficiary ID", column(0)), ("Name", column(1)), ("Type", column(2)),
+    ("Address", column(3)), ("Support Duration", column(4)), ("Funding Priority", column(5)),
+], "No beneficiaries available.")
+
+display_volunteers_list = display_function([
+    ("Volunteer ID", column(0)), ("Name", lambda i: f"{i[1]} {i[2]}"), ("Address", column(3)),
+    ("DOB", column(4)), ("Contact", column(5)), ("Event ID", column(6)), ("Event Name", column(7)),
+], "No volunteers available.")
+
+# Fields of the search results (rows from start.donation_query.search_donations)
+RESULT_FIELDS = [
+    ("ID", column(0)), ("Amount", money(1)), ("Date", column(2)), ("Notes", column(3)),
+    ("From", lambda i: f"{i[5]} ({i[4]})"), ("Beneficiary", column(6)),
+]
+
+# Fields of the full-text search results (Kind, Record_ID, Name, Address, Email, Type, Notes)
+TEXT_RESULT_FIELDS = [("Record", column(0)), ("ID", column(1)), ("Name", column(2)), ("Address", column(3)),
+                      ("Email", column(4)), ("Type", column(5)), ("Notes", column(6))]
+
+def show_donations(title, empty_message, **criteria):
+    """Streams the donations matching the criteria (start.donation_query) page by page"""
+    donations = search_donations(**criteria)  # Streamed, never loaded all at once
+    print("\n" + paint(title, GREEN))
+    browse_rows(donations, display_function(RESULT_FIELDS, empty_message, separator=", "))
+
+def ask_ids(entity, tip):
+    """Asks for one or more comma-separated IDs; returns the list, or None if the input is not valid"""
+    print("\n" + paint(f"Tip: {tip} Separate several IDs with commas.", YELLOW))
+    try:
+        return parse_ids(input(f"Enter {entity} ID(s): "))
+    except ValueError:
+        print(paint(f"🚫 {entity} IDs must be numeric.", RED))
+        return None
+
+def show_linked(entity, ids, title, empty_message):
+    """Streams the donations linked to all the given records (one query for every ID) page by page"""
+    fields = RESULT_FIELDS
+    if len(ids) > 1:
+        # Rows are grouped by record; show which record each row belongs to and its totals
+        fields = [(entity, lambda i: f"{i[8]} ({i[9]} donation{'s' if i[9] != 1 else ''}, £{i[10]:,.2f})")] + RESULT_FIELDS
+    donations = linked_donations_for(entity, ids)  # Streamed, never loaded all at once
+    print("\n" + paint(title, GREEN))
+    browse_rows(donations, display_function(fields, empty_message, separator=", "))
+
+def search_by(entity, display_list):
+    """Lists one entity, asks for IDs and shows the donations linked to them"""
+    plural = "Businesses" if entity == "Business" else "Beneficiaries" if entity == "Beneficiary" else f"{entity}s"
+    print("\n" + paint(f"Here are all {plural}:", GREEN))
+    if not browse_rows(cached_rows(entity), display_list):  # Kept in memory between searches (start/cache.py)
+        return
+
+    article = "an" if entity[0] in "AEIOU" else "a"
+    ids = ask_ids(entity, f"Insert {article} {entity} ID to search donations.")
+    if ids:
+        show_linked(entity, ids, f"Donations linked to this {entity}:" if len(ids) == 1 else f"Donations linked to these {plural}:",
+                    f"No donations found for this {entity.lower()}." if len(ids) == 1 else f"No donations found for these {plural.lower()}.")
+
+def _is_amount(text):
+    try:
+        parse_positive_amount(text)
+        return True
+    except ValueError:
+        return False
+
+def _optional(prompt, check, error):
+    # Asks for an optional value: returns None if left empty, False if the value is not valid
+    value = input(prompt).strip()
+    if not value:
+        return None
+    if not check(value):
+        print(paint(f"🚫 {error}", RED))
+        return False
+    return value
+
+def advanced_search():
+    """
+    Asks for any combination of filters and runs them as one query.
+    Every question can be skipped with Enter.
+    """
+    print("\n" + paint("Tip: Press Enter to skip a filter. Dates use YYYY-MM-DD.", YELLOW))
+    criteria = {}
+    questions = [
+        ("donor_id", "Donor ID: ", str.isdigit, "Donor ID must be numeric."),
+        ("event_id", "Event ID: ", str.isdigit, "Event ID must be numeric."),
+        ("business_id", "Business ID: ", str.isdigit, "Business ID must be numeric."),
+        ("beneficiary_id", "Beneficiary ID: ", str.isdigit, "Beneficiary ID must be numeric."),
+        ("date_from", "From date: ", is_valid_date, "Invalid date format. Use YYYY-MM-DD."),
+        ("date_to", "To date: ", is_valid_date, "Invalid date format. Use YYYY-MM-DD."),
+        ("min_amount", "Minimum amount: ", _is_amount, "Amount must be a positive number."),
+        ("max_amount", "Maximum amount: ", _is_amount, "Amount must be a positive number."),
+        ("source", f"Source ({', '.join(SOURCES)}): ", lambda v: v.capitalize() in SOURCES,
+         f"Source must be one of: {', '.join(SOURCES)}."),
+        ("priority", "Beneficiary priority (High, Medium, Low): ", str.isalpha, "Priority must contain only letters."),
+    ]
+    for name, prompt, check, error in questions:
+        value = _optional(prompt, check, error)
+        if value is False:
+            return
+        criteria[name] = value
+
+    for name in ("donor_id", "event_id", "business_id", "beneficiary_id"):
+        if criteria[name] is not None:
+            criteria[name] = int(criteria[name])
+    for name in ("min_amount", "max_amount"):
+        if criteria[name] is not None:
+            criteria[name] = parse_positive_amount(criteria[name])
+    for name in ("source", "priority"):
+        if criteria[name] is not None:
+            criteria[name] = criteria[name].capitalize()
+
+    order = input("Sort by date, amount or id (Enter for date): ").strip().lower() or "date"
+    if order not in ("date", "amount", "id"):
+        print(paint("🚫 Sort order must be date, amount or id.", RED))
+        return
+    descending = input("Largest/newest first? (y/N): ").strip().lower() == "y"
+    limit = _optional("Maximum number of results (Enter for all): ", str.isdigit, "Limit must be a whole number.")
+    if limit is False:
+        return
+
+    show_donations("Matching donations:", "No donations match these filters.",
+                   order_by=order, descending=descending, limit=int(limit) if limit else None, **criteria)
 
 def search_menu():
     while True:
@@ -40,306 +171,105 @@ def search_menu():
         print("3️⃣  Search Donations by Business")
         print("4️⃣  Search Donations by Beneficiary")
         print("5️⃣  Search Donations by Volunteer")
-        print("6️⃣  🔙 Back to Main Menu")
+        print("6️⃣  Advanced Donation Search (combine filters)")
+        print("7️⃣  Full-text Search (names, addresses, e-mail, notes)")
+        print("8️⃣  🔙 Back to Main Menu")
         print("-" * 60)
 
-        choice = input("\n Choose an option (1-6): ").strip()
+        choice = input("\n Choose an option (1-8): ").strip()
 
-        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6"]:
-            print("\033[91m🚫 Invalid option. Please choose a number between 1 and 6.\033[0m")
+        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6", "7", "8"]:
+            print(paint("🚫 Invalid option. Please choose a number between 1 and 8.", RED))
             continue
 
         if choice == "1":
             # Search Donations by Donor
             try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM Donor")
-                donors = cursor.fetchall()
-                conn.close()
-
-                if not donors:
-                    print("\033[93mNo donors available.\033[0m")
-                    continue
-
-                print("\n\033[92mHere are all Donors:\033[0m")
-                for i in donors:
-                    print(f"\033[92mDonor ID:\033[0m {i[0]} "
-                          f"\033[92mName:\033[0m {i[1]} {i[2]} "
-                          f"\033[92mEmail:\033[0m {i[3]} "
-                          f"\033[92mPhone:\033[0m {i[4]} "
-                          f"\033[92mAddress:\033[0m {i[5]} "
-                          f"\033[92mDOB:\033[0m {i[6]}")
-
-                print("\n\033[93mTip: Insert a Donor ID to search donations.\033[0m")
-                donor_id = input("Enter Donor ID: ").strip()
-                if not donor_id.isdigit():
-                    print("\033[91m🚫 Donor ID must be numeric.\033[0m")
-                    continue
-
-                query = """
-                SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
-                       Donor.First_Name, Donor.Last_Name, Beneficiary.Name
-                FROM Donation
-                JOIN Donor ON Donation.Donor_ID = Donor.Donor_ID
-                JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
-                WHERE Donation.Donor_ID = ?
-                """
-
-                donations = fetch_all(query, donor_id)
-
-                print("\n\033[92mDonations linked to this Donor:\033[0m")
-                if donations:
-                    for i in donations:
-                        print(
-                            f"\033[92mID:\033[0m {i[0]}, "
-                            f"\033[92mAmount:\033[0m £{i[1]:,.2f}, "
-                            f"\033[92mDate:\033[0m {i[2]}, "
-                            f"\033[92mNotes:\033[0m {i[3]}, "
-                            f"\033[92mDonor:\033[0m {i[4]} {i[5]}, "
-                            f"\033[92mBeneficiary:\033[0m {i[6]}"
-                        )
-                else:
-                    print("\033[93mNo donations found for this donor.\033[0m")
-
+                search_by("Donor", display_donors_list)
             except Exception as e:
-                print(f"\033[91m🚫 Error searching donations by donor: {e}\033[0m")
+                print(paint(f"🚫 Error searching donations by donor: {e}", RED))
 
         elif choice == "2":
             # Search Donations by Event
             try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM Event")
-                events = cursor.fetchall()
-                conn.close()
-
-                if not events:
-                    print("\033[93mNo events available.\033[0m")
-                    continue
-
-                print("\n\033[92mHere are all Events:\033[0m")
-                for i in events:
-                    print(f"\033[92mEvent ID:\033[0m {i[0]} "
-                          f"\033[92mName:\033[0m {i[1]} "
-                          f"\033[92mDate:\033[0m {i[2]} "
-                          f"\033[92mLocation:\033[0m {i[3]} "
-                          f"\033[92mGoal:\033[0m £{i[4]:,.2f} "
-                          f"\033[92mDescription:\033[0m {i[5]}")
-
-                print("\n\033[93mTip: Insert an Event ID to search donations.\033[0m")
-                event_id = input("Enter Event ID: ").strip()
-                if not event_id.isdigit():
-                    print("\033[91m🚫 Event ID must be numeric.\033[0m")
-                    continue
-
-                query = """
-                SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
-                       Event.Name, Beneficiary.Name
-                FROM Donation
-                JOIN Event ON Donation.Event_ID = Event.Event_ID
-                JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
-                WHERE Donation.Event_ID = ?
-                """
-
-                donations = fetch_all(query, event_id)
-
-                print("\n\033[92mDonations linked to this Event:\033[0m")
-                if donations:
-                    for i in donations:
-                        print(
-                            f"\033[92mID:\033[0m {i[0]}, "
-                            f"\033[92mAmount:\033[0m £{i[1]:,.2f}, "
-                            f"\033[92mDate:\033[0m {i[2]}, "
-                            f"\033[92mNotes:\033[0m {i[3]}, "
-                            f"\033[92mEvent:\033[0m {i[4]}, "
-                            f"\033[92mBeneficiary:\033[0m {i[5]}"
-                        )
-                else:
-                    print("\033[93mNo donations found for this event.\033[0m")
-
+                search_by("Event", display_events_list)
             except Exception as e:
-                print(f"\033[91m🚫 Error searching donations by event: {e}\033[0m")
+                print(paint(f"🚫 Error searching donations by event: {e}", RED))
 
         elif choice == "3":
             # Search Donations by Business
             try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM Business")
-                businesses = cursor.fetchall()
-                conn.close()
-
-                if not businesses:
-                    print("\033[93mNo businesses available.\033[0m")
-                    continue
-
-                print("\n\033[92mHere are all Businesses:\033[0m")
-                for i in businesses:
-                    print(f"\033[92mBusiness ID:\033[0m {i[0]} "
-                          f"\033[92mName:\033[0m {i[1]} "
-                          f"\033[92mEmail:\033[0m {i[2]} "
-                          f"\033[92mPhone:\033[0m {i[3]} "
-                          f"\033[92mAddress:\033[0m {i[4]} "
-                          f"\033[92mRegistration Date:\033[0m {i[5]}")
-
-                print("\n\033[93mTip: Insert a Business ID to search donations.\033[0m")
-                business_id = input("Enter Business ID: ").strip()
-                if not business_id.isdigit():
-                    print("\033[91m🚫 Business ID must be numeric.\033[0m")
-                    continue
-
-                query = """
-                SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
-                       Business.Name, Beneficiary.Name
-                FROM Donation
-                JOIN Business ON Donation.Business_ID = Business.Business_ID
-                JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
-                WHERE Donation.Business_ID = ?
-                """
-
-                donations = fetch_all(query, business_id)
-
-                print("\n\033[92mDonations linked to this Business:\033[0m")
-                if donations:
-                    for i in donations:
-                        print(
-                            f"\033[92mID:\033[0m {i[0]}, "
-                            f"\033[92mAmount:\033[0m £{i[1]:,.2f}, "
-                            f"\033[92mDate:\033[0m {i[2]}, "
-                            f"\033[92mNotes:\033[0m {i[3]}, "
-                            f"\033[92mBusiness:\033[0m {i[4]}, "
-                            f"\033[92mBeneficiary:\033[0m {i[5]}"
-                        )
-                else:
-                    print("\033[93mNo donations found for this business.\033[0m")
-
+                search_by("Business", display_businesses_list)
             except Exception as e:
-                print(f"\033[91m🚫 Error searching donations by business: {e}\033[0m")
+                print(paint(f"🚫 Error searching donations by business: {e}", RED))
 
         elif choice == "4":
             # Search Donations by Beneficiary
             try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM Beneficiary")
-                beneficiaries = cursor.fetchall()
-                conn.close()
-
-                if not beneficiaries:
-                    print("\033[93mNo beneficiaries available.\033[0m")
-                    continue
-
-                print("\n\033[92mHere are all Beneficiaries:\033[0m")
-                for i in beneficiaries:
-                    print(f"\033[92mBeneficiary ID:\033[0m {i[0]} "
-                          f"\033[92mName:\033[0m {i[1]} "
-                          f"\033[92mType:\033[0m {i[2]} "
-                          f"\033[92mAddress:\033[0m {i[3]} "
-                          f"\033[92mSupport Duration:\033[0m {i[4]} "
-                          f"\033[92mFunding Priority:\033[0m {i[5]}")
-
-                print("\n\033[93mTip: Insert a Beneficiary ID to search donations.\033[0m")
-                beneficiary_id = input("Enter Beneficiary ID: ").strip()
-                if not beneficiary_id.isdigit():
-                    print("\033[91m🚫 Beneficiary ID must be numeric.\033[0m")
-                    continue
-
-                query = """
-                SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
-                       Beneficiary.Name
-                FROM Donation
-                JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
-                WHERE Donation.Beneficiary_ID = ?
-                """
-
-                donations = fetch_all(query, beneficiary_id)
-
-                print("\n\033[92mDonations linked to this Beneficiary:\033[0m")
-                if donations:
-                    for i in donations:
-                        print(
-                            f"\033[92mID:\033[0m {i[0]}, "
-                            f"\033[92mAmount:\033[0m £{i[1]:,.2f}, "
-                            f"\033[92mDate:\033[0m {i[2]}, "
-                            f"\033[92mNotes:\033[0m {i[3]}, "
-                            f"\033[92mBeneficiary:\033[0m {i[4]}"
-                        )
-                else:
-                    print("\033[93mNo donations found for this beneficiary.\033[0m")
-
+                search_by("Beneficiary", display_beneficiaries_list)
             except Exception as e:
-                print(f"\033[91m🚫 Error searching donations by beneficiary: {e}\033[0m")
+                print(paint(f"🚫 Error searching donations by beneficiary: {e}", RED))
 
         elif choice == "5":
             # Search Donations by Volunteer
             try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute("""
+                volunteers = cached_query(("Volunteer", "Event"), """
                     SELECT Volunteer.Volunteer_ID, Volunteer.First_Name, Volunteer.Last_Name,
                            Volunteer.Address, Volunteer.Date_of_Birth, Volunteer.Contact_Number,
                            Event.Event_ID, Event.Name
                     FROM Volunteer
                     JOIN Event ON Volunteer.Event_ID = Event.Event_ID
+                    ORDER BY Volunteer.Volunteer_ID
                 """)
-                volunteers = cursor.fetchall()
-                conn.close()
 
-                if not volunteers:
-                    print("\033[93mNo volunteers available.\033[0m")
+                print("\n" + paint("Here are all Volunteers:", GREEN))
+                if not browse_rows(volunteers, display_volunteers_list):
                     continue
 
-                print("\n\033[92mHere are all Volunteers:\033[0m")
-                for i in volunteers:
-                    print(f"\033[92mVolunteer ID:\033[0m {i[0]} "
-                          f"\033[92mName:\033[0m {i[1]} {i[2]} "
-                          f"\033[92mAddress:\033[0m {i[3]} "
-                          f"\033[92mDOB:\033[0m {i[4]} "
-                          f"\033[92mContact:\033[0m {i[5]} "
-                          f"\033[92mEvent ID:\033[0m {i[6]} "
-                          f"\033[92mEvent Name:\033[0m {i[7]}")
-
-                print("\n\033[93mTip: Insert a Volunteer ID to search donations based on their event.\033[0m")
-                volunteer_id = input("Enter Volunteer ID: ").strip()
-                if not volunteer_id.isdigit():
-                    print("\033[91m🚫 Volunteer ID must be numeric.\033[0m")
+                ids = ask_ids("Volunteer", "Insert a Volunteer ID to search donations based on their event.")
+                if not ids:
                     continue
 
-                event_id = get_event_id_by_volunteer(volunteer_id)
-                if not event_id:
-                    print("\033[93mNo event found linked to this Volunteer.\033[0m")
-                    continue
-
-                query = """
-                SELECT Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
-                       Event.Name, Beneficiary.Name
-                FROM Donation
-                JOIN Event ON Donation.Event_ID = Event.Event_ID
-                JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID
-                WHERE Donation.Event_ID = ?
-                """
-
-                donations = fetch_all(query, event_id)
-
-                print("\n\033[92mDonations linked to the Event where this Volunteer worked:\033[0m")
-                if donations:
-                    for i in donations:
-                        print(
-                            f"\033[92mID:\033[0m {i[0]}, "
-                            f"\033[92mAmount:\033[0m £{i[1]:,.2f}, "
-                            f"\033[92mDate:\033[0m {i[2]}, "
-                            f"\033[92mNotes:\033[0m {i[3]}, "
-                            f"\033[92mEvent:\033[0m {i[4]}, "
-                            f"\033[92mBeneficiary:\033[0m {i[5]}"
-                        )
-                else:
-                    print("\033[93mNo donations found linked to this volunteer's event.\033[0m")
+                show_linked("Volunteer", ids, "Donations linked to the Event where this Volunteer worked:" if len(ids) == 1
+                            else "Donations linked to the Events where these Volunteers worked:",
+                            "No donations found linked to the volunteers' events.")
 
             except Exception as e:
-                print(f"\033[91m🚫 Error searching donations by volunteer: {e}\033[0m")
+                print(paint(f"🚫 Error searching donations by volunteer: {e}", RED))
                 
         elif choice == "6":
+            # Advanced Search: any combination of filters in one query
+            try:
+                advanced_search()
+            except Exception as e:
+                print(paint(f"🚫 Error searching donations: {e}", RED))
+
+        elif choice == "7":
+            # Full-text search over the Search_Index (ranked, prefix matching)
+            try:
+                print("\n" + paint("Tip: Words may be the start of a word, e.g. 'memo' finds 'memorial'.", YELLOW))
+                text = input("Search for: ").strip()
+                if not text:
+                    print(paint("🚫 Please enter at least one word.", RED))
+                    continue
+
+                kinds = ", ".join(INDEXED_TABLES)
+                kind = input(f"Only one record type ({kinds}) or Enter for all: ").strip().capitalize()
+                if kind and kind not in INDEXED_TABLES:
+                    print(paint(f"🚫 Record type must be one of: {kinds}.", RED))
+                    continue
+
+                results = search_text(text, kinds=[kind] if kind else None)
+                if not results:
+                    print(paint("No matching records found.", YELLOW))
+                    continue
+                print("\n" + paint("Best matches first:", GREEN))
+                render_table(results, TEXT_RESULT_FIELDS, pager=True)  # Through a pager if longer than the terminal
+
+            except Exception as e:
+                print(paint(f"🚫 Error running full-text search: {e}", RED))
+
+        elif choice == "8":
             break
 
 if __name__ == "__main__":
@@ -1,9 +1,4 @@
 # volunteer.py
-import sys
-import os
-import re
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 """
 This module handles all volunteer-related operations in the donation system.
 It provides a menu interface for managing volunteer records linked to events, including:
@@ -13,57 +8,62 @@ It provides a menu interface for managing volunteer records linked to events, in
 - Deleting volunteers
 """
 
-from start.crud import view_all, add_entry, update_entry, delete_entry
+from start.crud import add_entry, update_entry, delete_entry
+from body.pager import browse
+from body.render import render_records, paint, column, GREEN, YELLOW, RED
+from start.validation import is_valid_date, is_letters
+
+# Fields shown for each volunteer: (label, function that returns the value)
+VOLUNTEER_FIELDS = [
+    ("ID", column(0)),
+    ("Event ID", column(1)),
+    ("Name", lambda v: f"{v[2]} {v[3]}"),
+    ("Address", column(4)),
+    ("DOB", column(5)),
+    ("Contact", column(6)),
+]
 
 def display_volunteers(volunteers):
     """Display all volunteer records in a consistent format"""
     if not volunteers:
-        print("\033[93mNo volunteers found in database.\033[0m")
+        print(paint("No volunteers found in database.", YELLOW))
         return False
-    for v in volunteers:
-        print(
-            f"\033[92mID:\033[0m {v[0]} "
-            f"\033[92mEvent ID:\033[0m {v[1]} "
-            f"\033[92mName:\033[0m {v[2]} {v[3]} "
-            f"\033[92mAddress:\033[0m {v[4]} "
-            f"\033[92mDOB:\033[0m {v[5]} "
-            f"\033[92mContact:\033[0m {v[6]}"
-        )
+    render_records(volunteers, VOLUNTEER_FIELDS)
     return True
 
 def volunteer_input(action):
     """Collect and validate volunteer information from user"""
-    print("\n\033[93mTip: Make sure Event ID exists before adding volunteer.\033[0m")
+    print("\n" + paint("Tip: Make sure Event ID exists before adding volunteer.", YELLOW))
     event_id = input(f"{action} Event ID: ").strip()
     if not event_id.isdigit():
-        print("\033[91m🚫 Event ID must be numeric.\033[0m")
+        print(paint("🚫 Event ID must be numeric.", RED))
         return None
 
-    print("\033[93mTip: Names should contain only letters.\033[0m")
+    print(paint("Tip: Names should contain only letters.", YELLOW))
     first_name = input(f"{action} First Name: ").strip()
-    if not first_name.replace(" ", "").isalpha():
-        print("\033[91m🚫 First name must contain only letters.\033[0m")
+    if not is_letters(first_name):
+        print(paint("🚫 First name must contain only letters.", RED))
         return None
     first_name = first_name.capitalize()
 
     last_name = input(f"{action} Last Name: ").strip()
-    if not last_name.replace(" ", "").isalpha():
-        print("\033[91m🚫 Last name must contain only letters.\033[0m")
+    if not is_letters(last_name):
+        print(paint("🚫 Last name must contain only letters.", RED))
         return None
     last_name = last_name.capitalize()
 
     address = input(f"{action} Address: ").strip()
 
-    print("\033[93mTip: Use format YYYY-MM-DD for date of birth.\033[0m")
+    print(paint("Tip: Use format YYYY-MM-DD for date of birth.", YELLOW))
     dob = input(f"{action} Date of Birth (YYYY-MM-DD): ").strip()
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob):
-        print("\033[91m🚫 Date must be in format YYYY-MM-DD.\033[0m")
+    if not is_valid_date(dob):
+        print(paint("🚫 Date must be in format YYYY-MM-DD.", RED))
         return None
 
-    print("\033[93mTip: Contact number must be digits only.\033[0m")
+    print(paint("Tip: Contact number must be digits only.", YELLOW))
     contact = input(f"{action} Contact Number: ").strip()
     if not contact.isdigit():
-        print("\033[91m🚫 Contact number must contain only digits.\033[0m")
+        print(paint("🚫 Contact number must contain only digits.", RED))
         return None
 
     return (event_id, first_name, last_name, address, dob, contact)
@@ -87,16 +87,15 @@ def volunteer_menu():
         choice = input("\n Choose an option (1-5): ").strip()
 
         if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5"]:
-            print("\033[91m🚫 Invalid choice. Please choose between 1-5.\033[0m")
+            print(paint("🚫 Invalid choice. Please choose between 1-5.", RED))
             continue
 
         if choice == "1":
             try:
-                print("\n\033[92mAll Volunteers:\033[0m")
-                volunteers = view_all("Volunteer")
-                display_volunteers(volunteers)
+                print("\n" + paint("All Volunteers:", GREEN))
+                browse("Volunteer", display_volunteers)
             except Exception as e:
-                print(f"\033[91m🚫 Error viewing volunteers: {str(e)}\033[0m")
+                print(paint(f"🚫 Error viewing volunteers: {str(e)}", RED))
 
         elif choice == "2":
             try:
@@ -106,20 +105,19 @@ def volunteer_menu():
                         "INSERT INTO Volunteer (Event_ID, First_Name, Last_Name, Address, Date_of_Birth, Contact_Number) VALUES (?,?,?,?,?,?)",
                         data
                     )
-                    print("\033[92m🎉 Volunteer added successfully.\033[0m")
+                    print(paint("🎉 Volunteer added successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error adding volunteer: {str(e)}\033[0m")
+                print(paint(f"🚫 Error adding volunteer: {str(e)}", RED))
 
         elif choice == "3":
             try:
-                print("\n\033[92mList of All Volunteers:\033[0m")
-                volunteers = view_all("Volunteer")
-                if not display_volunteers(volunteers):
+                print("\n" + paint("List of All Volunteers:", GREEN))
+                if not browse("Volunteer", display_volunteers):
                     continue
 
                 volunteer_id = input("\nEnter Volunteer ID to update: ").strip()
                 if not volunteer_id.isdigit():
-                    print("\033[91m🚫 Volunteer ID must be numeric.\033[0m")
+                    print(paint("🚫 Volunteer ID must be numeric.", RED))
                     continue
 
                 data = volunteer_input("New")
@@ -128,26 +126,25 @@ def volunteer_menu():
                         "UPDATE Volunteer SET Event_ID=?, First_Name=?, Last_Name=?, Address=?, Date_of_Birth=?, Contact_Number=? WHERE Volunteer_ID=?",
                         (*data, volunteer_id)
                     )
-                    print("\033[92m🎉 Volunteer updated successfully.\033[0m")
+                    print(paint("🎉 Volunteer updated successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error updating volunteer: {str(e)}\033[0m")
+                print(paint(f"🚫 Error updating volunteer: {str(e)}", RED))
 
         elif choice == "4":
             try:
-                print("\n\033[92mList of All Volunteers:\033[0m")
-                volunteers = view_all("Volunteer")
-                if not display_volunteers(volunteers):
+                print("\n" + paint("List of All Volunteers:", GREEN))
+                if not browse("Volunteer", display_volunteers):
                     continue
 
                 volunteer_id = input("\nEnter Volunteer ID to delete: ").strip()
                 if not volunteer_id.isdigit():
-                    print("\033[91m🚫 Volunteer ID must be numeric.\033[0m")
+                    print(paint("🚫 Volunteer ID must be numeric.", RED))
                     continue
 
                 delete_entry("DELETE FROM Volunteer WHERE Volunteer_ID=?", volunteer_id)
-                print("\033[92m🎉 Volunteer deleted successfully.\033[0m")
+                print(paint("🎉 Volunteer deleted successfully.", GREEN))
             except Exception as e:
-                print(f"\033[91m🚫 Error deleting volunteer: {str(e)}\033[0m")
+                print(paint(f"🚫 Error deleting volunteer: {str(e)}", RED))
 
         elif choice == "5":
             break
@@ -0,0 +1,268 @@
+# cli.py
+"""
+Non-interactive command line for scripts and scheduled jobs.
+
+Every command calls the same validation rules (start/validation.py) and database
+functions (start/crud.py, start/donation_query.py ...) as the menus, writes its
+results as CSV or JSON to stdout and reports problems on stderr.
+
+Usage (also available as "python -m initialize.cli ..."):
+    python main.py donors list --format csv
+    python main.py donations list --limit 100 --format json
+    python main.py donations add < new_gifts.jsonl             # one JSON object per line
+    python main.py donors add --input-format csv < donors.csv
+    python main.py donations search --source Business --min-amount 500 --from 2025-10-01 --to 2025-12-31
+    python main.py donors delete 4 9 12                       # or IDs on stdin, one per line
+    python main.py search text "memorial" --kind Donation
+    python main.py report totals Event --format csv
+    python main.py import Donation gifts.csv
+    python main.py serve --port 8080                           # HTTP/JSON service (initialize/server.py)
+
+Exit codes:
+    0  everything succeeded
+    1  some records were rejected, blocked or not found (the others were processed)
+    2  the command line was not valid
+    3  a database error stopped the command
+"""
+
+import argparse
+import csv
+import json
+import sqlite3 as db
+import sys
+
+from start.tables import close_all_connections, POOL_SIZE
+from start.migrations import migrate
+from start.crud import table_columns, iter_rows, iter_query, bulk_delete
+from start.validation import parse_ids
+from start.donation_query import search_donations, RESULT_COLUMNS, SOURCES, ORDER_COLUMNS
+from start.importer import import_records, parse_records, write_rejects_csv, DEFAULT_CHUNK_SIZE
+from start.summaries import SUMMARY_SOURCES, SUMMARY_COLUMNS, summary_table
+from start.textsearch import INDEXED_TABLES, search_text, RESULT_COLUMNS as TEXT_RESULT_COLUMNS
+from start import importer
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_DB_ERROR = 3
+
+# Command name -> table
+ENTITIES = {
+    "donors": "Donor",
+    "businesses": "Business",
+    "beneficiaries": "Beneficiary",
+    "events": "Event",
+    "volunteers": "Volunteer",
+    "donations": "Donation",
+}
+
+FORMATS = ("csv", "json", "jsonl")
+
+
+def write_rows(rows, columns, fmt, stream=None):
+    """
+    Writes rows to a stream (stdout by default) as they come, without loading them all.
+    csv has a header line, json is one array of objects, jsonl is one object per line.
+    Returns the number of rows written.
+    """
+    stream = stream or sys.stdout
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(dict(zip(columns, row))) + "\n")
+            count += 1
+    else:
+        stream.write("[")
+        for row in rows:
+            stream.write(("," if count else "") + "\n  " + json.dumps(dict(zip(columns, row))))
+            count += 1
+        stream.write("\n]\n" if count else "]\n")
+    stream.flush()
+    return count
+
+
+def _limited(rows, limit):
+    for count, row in enumerate(rows):
+        if limit is not None and count >= limit:
+            break
+        yield row
+
+
+def cmd_list(args):
+    table = ENTITIES[args.entity]
+    columns = table_columns(table)
+    write_rows(_limited(iter_rows(table, order_by=args.order_by), args.limit), columns, args.format)
+    return EXIT_OK
+
+
+def cmd_add(args):
+    table = ENTITIES[args.entity]
+    inserted, rejected = import_records(table, parse_records(sys.stdin, args.input_format), args.chunk_size)
+    write_rows([(table, inserted, len(rejected))], ["Table", "Inserted", "Rejected"], args.format)
+    if rejected:
+        write_rejects_csv(sys.stderr, rejected)
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def cmd_delete(args):
+    table = ENTITIES[args.entity]
+    # IDs from the arguments, or from stdin (one per line or comma-separated); parse_ids raises ValueError
+    text = ",".join(args.ids) if args.ids else ",".join(sys.stdin.read().split())
+    deleted, blocked, missing = bulk_delete(table, parse_ids(text))
+    rows = [(i, "deleted") for i in deleted] + [(i, "linked to donations") for i in blocked] + \
+           [(i, "not found") for i in missing]
+    write_rows(sorted(rows), ["ID", "Result"], args.format)
+    return EXIT_PARTIAL if blocked or missing else EXIT_OK
+
+
+def cmd_search_donations(args):
+    criteria = {
+        "donor_id": args.donor_id, "event_id": args.event_id, "business_id": args.business_id,
+        "beneficiary_id": args.beneficiary_id, "volunteer_id": args.volunteer_id,
+        "date_from": args.date_from, "date_to": args.date_to,
+        "min_amount": args.min_amount, "max_amount": args.max_amount, "priority": args.priority,
+    }
+    rows = search_donations(source=args.source, order_by=args.order_by, descending=args.descending,
+                            limit=args.limit, **criteria)
+    write_rows(rows, RESULT_COLUMNS, args.format)
+    return EXIT_OK
+
+
+def cmd_search_text(args):
+    rows = search_text(" ".join(args.words), kinds=args.kind, limit=args.limit)
+    write_rows(rows, TEXT_RESULT_COLUMNS, args.format)
+    return EXIT_OK
+
+
+def cmd_report_totals(args):
+    key = SUMMARY_SOURCES[args.entity]
+    query = f"SELECT {key}, {SUMMARY_COLUMNS} FROM {summary_table(args.entity)}"
+    params = ()
+    if args.id is not None:
+        query += f" WHERE {key} = ?"
+        params = (args.id,)
+    query += " ORDER BY Total_Amount DESC"
+    write_rows(iter_query(query, params), [key] + SUMMARY_COLUMNS.split(", "), args.format)
+    return EXIT_OK
+
+
+def cmd_import(args):
+    return importer.main([args.table, args.path, "--chunk-size", str(args.chunk_size)]
+                         + (["--rejects", args.rejects] if args.rejects else []))
+
+
+def cmd_serve(args):
+    from initialize.server import serve  # Imported here because the server builds on this module
+    serve(args.host, args.port, args.workers, args.verbose)
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Donation Management System - scripted commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def output(p):
+        p.add_argument("--format", choices=FORMATS, default="json", help="output format (default json)")
+
+    for name, table in ENTITIES.items():
+        entity = commands.add_parser(name, help=f"{table} records")
+        actions = entity.add_subparsers(dest="action", required=True)
+
+        p = actions.add_parser("list", help=f"write every {table} record")
+        p.add_argument("--limit", type=int, help="stop after this many records")
+        p.add_argument("--order-by", help="column to sort by (default: ID)")
+        output(p)
+        p.set_defaults(func=cmd_list, entity=name)
+
+        p = actions.add_parser("add", help=f"add {table} records read from stdin, validated like the menus")
+        p.add_argument("--input-format", choices=("jsonl", "csv"), default="jsonl",
+                       help="stdin format: one JSON object per line (default) or CSV with a header")
+        p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per transaction")
+        output(p)
+        p.set_defaults(func=cmd_add, entity=name)
+
+        p = actions.add_parser("delete", help=f"delete {table} records (IDs as arguments or on stdin)")
+        p.add_argument("ids", nargs="*", help="IDs to delete")
+        output(p)
+        p.set_defaults(func=cmd_delete, entity=name)
+
+        if name == "donations":
+            p = actions.add_parser("search", help="search donations with any combination of filters")
+            for option in ("donor", "event", "business", "beneficiary", "volunteer"):
+                p.add_argument(f"--{option}-id", type=int)
+            p.add_argument("--from", dest="date_from", help="first date (YYYY-MM-DD)")
+            p.add_argument("--to", dest="date_to", help="last date (YYYY-MM-DD)")
+            p.add_argument("--min-amount", type=float)
+            p.add_argument("--max-amount", type=float)
+            p.add_argument("--source", choices=list(SOURCES))
+            p.add_argument("--priority", help="beneficiary funding priority, e.g. High")
+            p.add_argument("--order-by", choices=list(ORDER_COLUMNS), default="date")
+            p.add_argument("--descending", action="store_true")
+            p.add_argument("--limit", type=int)
+            output(p)
+            p.set_defaults(func=cmd_search_donations)
+
+    search = commands.add_parser("search", help="full-text search")
+    actions = search.add_subparsers(dest="action", required=True)
+    p = actions.add_parser("text", help="search notes, names and addresses")
+    p.add_argument("words", nargs="+")
+    p.add_argument("--kind", action="append", choices=list(INDEXED_TABLES), help="only this record type (can be repeated)")
+    p.add_argument("--limit", type=int, default=20)
+    output(p)
+    p.set_defaults(func=cmd_search_text)
+
+    report = commands.add_parser("report", help="donation totals")
+    actions = report.add_subparsers(dest="action", required=True)
+    p = actions.add_parser("totals", help="totals per record, largest first")
+    p.add_argument("entity", choices=list(SUMMARY_SOURCES))
+    p.add_argument("--id", type=int, help="only this record")
+    output(p)
+    p.set_defaults(func=cmd_report_totals)
+
+    p = commands.add_parser("import", help="bulk import a CSV or JSON Lines file (see start/importer.py)")
+    p.add_argument("table", choices=[t for t in ENTITIES.values()])
+    p.add_argument("path")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    p.add_argument("--rejects")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("serve", help="run the HTTP/JSON service (see initialize/server.py)")
+    p.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1, this computer only)")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--workers", type=int, default=POOL_SIZE - 2, help="request threads, one database connection each")
+    p.add_argument("--verbose", action="store_true", help="log every request to stderr")
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    """Runs one command and returns its exit code"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    try:
+        migrate()  # Only does work the first time or after an upgrade
+        return args.func(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except db.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return EXIT_DB_ERROR
+    except BrokenPipeError:
+        return EXIT_OK  # Output piped into e.g. head, which stopped reading
+    finally:
+        close_all_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
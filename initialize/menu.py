@@ -6,27 +6,88 @@ It provides the top-level menu that connects all system components.
 The menu coordinates between different management modules and handles
 the initial database setup.
 
+Start-up does not rebuild the database: only pending schema migrations are
+applied, so existing data is kept and a warm start is almost instant.
+Sample data is only loaded when asked for (python main.py --sample-data).
+
+The management modules (body/*) are only imported when their menu is first
+chosen, so the main menu appears without loading code that may never be used.
+
 """
 
-from start.tables import create_tables
-from start.values import insert_sample_data
-from body.donor import donor_menu
-from body.event import event_menu
-from body.business import business_menu
-from body.beneficiary import beneficiary_menu
-from body.donation import donation_menu
-from body.search import search_menu
-from body.volunteer import volunteer_menu  
-
-def main_menu():
-    # Initialize database with tables and sample data
-    create_tables()        # Creates all required database tables with ON DELETE CASCADE enabled
-    insert_sample_data()   # Populates with initial sample records
+import sys
+import time
+from importlib import import_module
+
+from start.tables import create_tables, close_all_connections
+from start.migrations import migrate
+from body.render import paint, GREEN
+
+# Menu choice -> (module, function) of the sub-menu, imported on first use
+MENUS = {
+    "1": ("body.donor", "donor_menu"),
+    "2": ("body.event", "event_menu"),
+    "3": ("body.business", "business_menu"),
+    "4": ("body.beneficiary", "beneficiary_menu"),
+    "5": ("body.donation", "donation_menu"),
+    "6": ("body.volunteer", "volunteer_menu"),
+    "7": ("body.search", "search_menu"),
+    "8": ("body.report", "report_menu"),
+}
+
 
+def open_menu(choice):
+    """Imports the module of a sub-menu (only the first time) and runs it"""
+    module, function = MENUS[choice]
+    getattr(import_module(module), function)()
+
+def initialize_database(sample_data=False, reset=False):
+    """
+    Prepares the database before the menu is shown.
+    Parameters:
+        sample_data (bool): Replace all records with the demonstration data
+        reset (bool): Drop every table and build an empty database from scratch
+    """
+    if reset:
+        create_tables()        # Destructive: drops all tables, then applies every migration
+    else:
+        migrate()              # Creates the schema on first launch, later launches only apply pending migrations
+    if sample_data:
+        from start.values import insert_sample_data
+        insert_sample_data()   # Populates with initial sample records
+
+def main_menu(sample_data=False, reset=False, started=None):
+    """
+    Prepares the database and runs the menu until the user exits.
+    Parameters:
+        sample_data (bool): Replace all records with the demonstration data
+        reset (bool): Drop every table and build an empty database from scratch
+        started (float/None): time.perf_counter() when the program started; if given,
+                              the start-up times are printed before the first prompt
+    """
+    try:
+        initialized = time.perf_counter()
+        initialize_database(sample_data, reset)
+        timings = None
+        if started is not None:
+            timings = (initialized - started, time.perf_counter() - initialized, started)
+        _run_main_menu(timings)
+    except EOFError:
+        print()  # Input ended (e.g. piped input or Ctrl-D): leave like option 9
+    finally:
+        close_all_connections()  # Cleanly close the pooled database connections on exit
+
+def print_startup_time(imports, database, started):
+    # Printed to stderr so it does not mix with the menu output
+    first_prompt = time.perf_counter() - started
+    print(f"Start-up: imports {imports * 1000:.1f} ms, database {database * 1000:.1f} ms, "
+          f"first prompt after {first_prompt * 1000:.1f} ms", file=sys.stderr)
+
+def _run_main_menu(timings=None):
     while True:
         # Display main application header and options
         
-        print("\n\033[92m/ WELCOME TO ARSLAN'S DONATION MANAGEMENT SYSTEM  /\033[0m")
+        print("\n" + paint("/ WELCOME TO ARSLAN'S DONATION MANAGEMENT SYSTEM  /", GREEN))
         print("\n" + "-" * 60)
         print("🏠  Main Menu:")
         print("-" * 60)
@@ -37,36 +98,27 @@ def main_menu():
         print("5️⃣  Donation Management")
         print("6️⃣  Volunteer Management") 
         print("7️⃣  🔍 Search Records")
-        print("8️⃣  🚪 Exit")
+        print("8️⃣  📊 Reports")
+        print("9️⃣  🚪 Exit")
         print("-" * 60)
 
+        if timings:
+            print_startup_time(*timings)
+            timings = None
+
         # Get user's menu choice
-        choice = input("\n Enter your choice (1-8): ").strip()
+        choice = input("\n Enter your choice (1-9): ").strip()
 
-        # Validate input is a number between 1-8
-        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6", "7", "8"]:
-            print("\n🚫 Invalid choice. Please enter a number between 1 and 8.\n")
+        # Validate input is a number between 1-9
+        if not choice.isdigit() or choice not in ["1", "2", "3", "4", "5", "6", "7", "8", "9"]:
+            print("\n🚫 Invalid choice. Please enter a number between 1 and 9.\n")
             continue
 
         # Route to the appropriate module based on user choice
-        match choice:
-            case "1":
-                donor_menu()
-            case "2":
-                event_menu()
-            case "3":
-                business_menu()
-            case "4":
-                beneficiary_menu()
-            case "5":
-                donation_menu()
-            case "6":
-                volunteer_menu()  
-            case "7":
-                search_menu()
-            case "8":
-                print("\033[92m🎉 THANK YOU for using Arslan's Donation App! Goodbye! 🎉\033[0m")
-                break
+        if choice == "9":
+            print(paint("🎉 THANK YOU for using Arslan's Donation App! Goodbye! 🎉", GREEN))
+            break
+        open_menu(choice)
 
 # Allow running this module directly
 if __name__ == "__main__":
@@ -0,0 +1,453 @@
+# server.py
+"""
+HTTP/JSON service, so several front-desk stations can share one database
+through one process instead of each opening the database file themselves.
+
+    python main.py serve [--host 127.0.0.1] [--port 8080] [--workers 6]
+
+Endpoints (entities: donors, businesses, beneficiaries, events, volunteers, donations):
+    GET    /api/<entity>?limit=50&after=<cursor>&order_by=<column>&desc=1
+                                        one page of records, "next" is the cursor of the next page
+    GET    /api/<entity>/<id>           one record
+    GET    /api/<entity>/<id>/donations donations linked to the record (the search menu queries)
+    POST   /api/<entity>                add one record (JSON object) or a batch (JSON array)
+    PUT    /api/<entity>/<id>           replace a record
+    DELETE /api/<entity>/<id>           delete a record (409 if donations are linked to it)
+    DELETE /api/<entity>?ids=1,2,3      delete several records
+    GET    /api/donations/search?donor_id=3&min_amount=500&source=Business&order_by=amount&desc=1&limit=100&offset=0
+    GET    /api/search?q=memorial&kind=Donation
+    GET    /api/reports/<Donor|Event|Business|Beneficiary>?limit=50&offset=0
+    GET    /metrics                     request counts and latency per endpoint
+
+Records are validated with the same rules as the menus (start/validation.py).
+Every GET answer has an ETag; a request with a matching If-None-Match gets
+304 Not Modified without a body.
+
+Requests are handled by a fixed pool of worker threads, each with its own
+pooled connection (start/tables.py), so connections are reused instead of
+opened per request. Reads run in parallel (WAL); writes go through one lock
+so the service never competes with itself for SQLite's write lock, and
+busy_timeout covers other programs using the file. If the database still
+stays locked, the client gets 503 with Retry-After instead of an SQLite error.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import signal
+import sqlite3 as db
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs
+
+from start.tables import POOL_SIZE, close_all_connections
+from start.migrations import migrate
+from start.crud import (table_columns, fetch_page, get_entry, add_entry, update_entry, bulk_delete, Transaction,
+                        iter_query, PRIMARY_KEYS)
+from start.validation import VALIDATORS, parse_ids
+from start.importer import import_records
+from start.donation_query import search_donations, linked_donations_for, FILTERS, RESULT_COLUMNS, RELATIONSHIPS
+from start.textsearch import INDEXED_TABLES, search_text, RESULT_COLUMNS as TEXT_RESULT_COLUMNS
+from start.summaries import SUMMARY_SOURCES, SUMMARY_COLUMNS, summary_table
+from initialize.cli import ENTITIES
+
+DEFAULT_PAGE = 50
+MAX_PAGE = 1000
+MAX_BODY = 10 * 1024 * 1024   # Largest request body accepted (bytes)
+LATENCY_SAMPLES = 1000        # Latest requests per endpoint kept for the percentiles
+
+# Filters of /api/donations/search that are numbers
+NUMBER_FILTERS = {"donor_id": int, "event_id": int, "business_id": int, "beneficiary_id": int,
+                  "volunteer_id": int, "min_amount": float, "max_amount": float}
+
+_write_lock = threading.Lock()  # One write at a time from this process
+
+
+class HTTPError(Exception):
+    """Ends a request with an error status and a JSON {"error": message} body"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Metrics:
+    """Request counts, status codes and latency per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}  # endpoint -> {"count", "statuses", "latencies"}
+
+    def record(self, endpoint, status, seconds):
+        with self.lock:
+            entry = self.endpoints.setdefault(endpoint, {"count": 0, "statuses": {}, "latencies": deque(maxlen=LATENCY_SAMPLES)})
+            entry["count"] += 1
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["latencies"].append(seconds * 1000)
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = {name: (e["count"], dict(e["statuses"]), sorted(e["latencies"])) for name, e in self.endpoints.items()}
+        result = {}
+        for name, (count, statuses, latencies) in sorted(endpoints.items()):
+            pick = lambda pct: round(latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))], 3)
+            result[name] = {"requests": count, "statuses": statuses,
+                            "p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99), "max_ms": round(latencies[-1], 3)}
+        return {"uptime_s": round(time.time() - self.started, 1), "endpoints": result}
+
+
+def _table(entity):
+    if entity not in ENTITIES:
+        raise HTTPError(404, f"Unknown collection '{entity}'. Use one of: {', '.join(ENTITIES)}")
+    return ENTITIES[entity]
+
+
+def _records(table, rows, columns=None):
+    columns = columns or table_columns(table)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(text):
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))))
+    except (ValueError, TypeError):
+        raise HTTPError(400, "Invalid 'after' cursor")
+
+
+def _number(query, name, default, kind=int, minimum=0, maximum=None):
+    value = query.get(name, default)
+    try:
+        value = kind(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"'{name}' must be a number")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise HTTPError(400, f"'{name}' must be between {minimum} and {maximum}" if maximum is not None
+                        else f"'{name}' must be at least {minimum}")
+    return value
+
+
+def _limit(query, default=DEFAULT_PAGE):
+    return _number(query, "limit", default, minimum=1, maximum=MAX_PAGE)
+
+
+def _page(query):
+    return _limit(query), _number(query, "offset", 0)
+
+
+def _flag(query, name):
+    return query.get(name, "").lower() in ("1", "true", "yes")
+
+
+# Handlers: (path parameters, query parameters, JSON body) -> (status, response object)
+
+def list_records(params, query, body):
+    table = _table(params["entity"])
+    order_by = query.get("order_by")
+    after = _decode_cursor(query["after"]) if "after" in query else None
+    # The cursor holds the sort column (if any) and the primary key of the last row
+    if after is not None and len(after) != (1 if order_by in (None, PRIMARY_KEYS[table]) else 2):
+        raise HTTPError(400, "Invalid 'after' cursor")
+    try:
+        rows, next_key = fetch_page(table, order_by=order_by, after=after,
+                                    limit=_limit(query), descending=_flag(query, "desc"))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return 200, {"items": _records(table, rows), "next": _encode_cursor(next_key) if next_key else None}
+
+
+def get_record(params, query, body):
+    table = _table(params["entity"])
+    row = get_entry(table, int(params["id"]))
+    if row is None:
+        raise HTTPError(404, f"No {table} with ID {params['id']}")
+    return 200, _records(table, [row])[0]
+
+
+def linked_records(params, query, body):
+    table = _table(params["entity"])
+    if table not in RELATIONSHIPS:
+        raise HTTPError(404, f"{table} records have no linked donations")
+    limit, offset = _page(query)
+    rows = linked_donations_for(table, [int(params["id"])])
+    items = [dict(zip(RESULT_COLUMNS, row)) for row in islice(rows, offset, offset + limit + 1)]
+    rows.close()  # Stop the query if it has more rows
+    return 200, {"items": items[:limit], "more": len(items) > limit}
+
+
+def _validated(table, record):
+    if not isinstance(record, dict):
+        raise HTTPError(400, "Expected a JSON object")
+    columns, validate = VALIDATORS[table]
+    try:
+        return columns, validate(record)
+    except ValueError as e:
+        raise HTTPError(422, str(e))
+
+
+def create_records(params, query, body):
+    table = _table(params["entity"])
+    if isinstance(body, list):
+        # A batch: valid records are inserted, the others are returned with the reason
+        records = ((index, record if isinstance(record, dict) else {"_error": "Expected a JSON object"})
+                   for index, record in enumerate(body, start=1))
+        with _write_lock:
+            inserted, rejected = import_records(table, records)
+        rejects = [{"index": index, "reason": reason} for index, reason, _ in rejected]
+        return (201 if not rejected else 422), {"inserted": inserted, "rejected": rejects}
+    columns, values = _validated(table, body)
+    query_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    with _write_lock, Transaction():  # The record is read back before anyone else can change it
+        new_id = add_entry(query_sql, values)
+        record = get_entry(table, new_id)
+    return 201, _records(table, [record])[0]
+
+
+def update_record(params, query, body):
+    table = _table(params["entity"])
+    columns, values = _validated(table, body)
+    pk = PRIMARY_KEYS[table]
+    with _write_lock, Transaction():  # Check, update and read back as one unit of work
+        if get_entry(table, int(params["id"])) is None:
+            raise HTTPError(404, f"No {table} with ID {params['id']}")
+        update_entry(f"UPDATE {table} SET {', '.join(f'{c}=?' for c in columns)} WHERE {pk}=?",
+                     tuple(values) + (int(params["id"]),))
+        record = get_entry(table, int(params["id"]))
+    return 200, _records(table, [record])[0]
+
+
+def _delete(table, ids):
+    with _write_lock:
+        deleted, blocked, missing = bulk_delete(table, ids)
+    result = {"deleted": deleted, "blocked": blocked, "missing": missing}
+    if blocked:
+        return 409, dict(result, error=f"Linked to existing donations: {', '.join(map(str, blocked))}")
+    if missing and not deleted:
+        return 404, dict(result, error=f"Not found: {', '.join(map(str, missing))}")
+    return 200, result
+
+
+def delete_record(params, query, body):
+    return _delete(_table(params["entity"]), [int(params["id"])])
+
+
+def delete_records(params, query, body):
+    try:
+        ids = parse_ids(query.get("ids", ""))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return _delete(_table(params["entity"]), ids)
+
+
+def donation_search(params, query, body):
+    limit, offset = _page(query)
+    criteria = {}
+    for name in FILTERS:
+        if name in query:
+            kind = NUMBER_FILTERS.get(name, str)
+            try:
+                criteria[name] = kind(query[name])
+            except ValueError:
+                raise HTTPError(400, f"'{name}' must be a number")
+    try:
+        rows = search_donations(source=query.get("source"), order_by=query.get("order_by", "date"),
+                                descending=_flag(query, "desc"), limit=offset + limit + 1, **criteria)
+        items = [dict(zip(RESULT_COLUMNS, row)) for row in islice(rows, offset, None)]
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return 200, {"items": items[:limit], "more": len(items) > limit}
+
+
+def text_search(params, query, body):
+    kind = query.get("kind")
+    if kind and kind not in INDEXED_TABLES:
+        raise HTTPError(400, f"'kind' must be one of: {', '.join(INDEXED_TABLES)}")
+    rows = search_text(query.get("q", ""), kinds=[kind] if kind else None,
+                       limit=_limit(query, 20))
+    return 200, {"items": [dict(zip(TEXT_RESULT_COLUMNS, row)) for row in rows]}
+
+
+def report(params, query, body):
+    entity = params["entity"]
+    if entity not in SUMMARY_SOURCES:
+        raise HTTPError(404, f"No report for '{entity}'. Use one of: {', '.join(SUMMARY_SOURCES)}")
+    limit, offset = _page(query)
+    key = SUMMARY_SOURCES[entity]
+    rows = list(iter_query(f"SELECT {key}, {SUMMARY_COLUMNS} FROM {summary_table(entity)} "
+                           f"ORDER BY Total_Amount DESC, {key} LIMIT ? OFFSET ?", (limit + 1, offset)))
+    columns = [key] + SUMMARY_COLUMNS.split(", ")
+    return 200, {"items": [dict(zip(columns, row)) for row in rows[:limit]], "more": len(rows) > limit}
+
+
+# (method, path, handler); <entity> and <id> match one path segment, the first match wins
+ROUTES = [
+    ("GET", "/api/donations/search", donation_search),
+    ("GET", "/api/search", text_search),
+    ("GET", "/api/reports/<entity>", report),
+    ("GET", "/api/<entity>", list_records),
+    ("POST", "/api/<entity>", create_records),
+    ("DELETE", "/api/<entity>", delete_records),
+    ("GET", "/api/<entity>/<id>", get_record),
+    ("PUT", "/api/<entity>/<id>", update_record),
+    ("DELETE", "/api/<entity>/<id>", delete_record),
+    ("GET", "/api/<entity>/<id>/donations", linked_records),
+]
+ROUTES = [(method, re.compile(path.replace("<entity>", r"(?P<entity>\w+)").replace("<id>", r"(?P<id>\d+)") + "/?$"),
+           path, handler) for method, path, handler in ROUTES]
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = "DonationService/1.0"
+    # HTTP/1.0: one request per connection, so a client never holds on to a worker thread
+    protocol_version = "HTTP/1.0"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        endpoint = f"{method} (unknown)"
+        headers = {}
+        try:
+            if url.path == "/metrics" and method == "GET":
+                endpoint = "GET /metrics"
+                status, result = 200, self.server.metrics.snapshot()
+            else:
+                allowed = False
+                for route_method, pattern, name, handler in ROUTES:
+                    match = pattern.match(url.path)
+                    if match:
+                        allowed = True
+                        if route_method == method:
+                            endpoint = f"{method} {name}"
+                            status, result = handler(match.groupdict(), query, self._read_body(method))
+                            break
+                else:
+                    raise HTTPError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+        except HTTPError as e:
+            status, result, headers = e.status, {"error": str(e)}, e.headers
+        except db.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                status, result, headers = 503, {"error": "The database is busy, please retry"}, {"Retry-After": "1"}
+            else:
+                status, result = self._internal_error(e)
+        except db.IntegrityError as e:
+            status, result = 409, {"error": f"Rejected by the database: {e}"}
+        except Exception as e:
+            status, result = self._internal_error(e)
+
+        body = json.dumps(result, default=str).encode()
+        if method == "GET" and status == 200:
+            headers["ETag"] = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            headers["Cache-Control"] = "no-cache"  # Clients must revalidate, which the ETag makes cheap
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                status, body = 304, b""
+        self._send(status, body, headers)
+        self.server.metrics.record(endpoint, status, time.perf_counter() - started)
+
+    def _read_body(self, method):
+        if method not in ("POST", "PUT"):
+            return None
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:  # A negative length would make rfile.read() wait for the client to hang up
+            raise HTTPError(400, "Invalid Content-Length header")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"Request body larger than {MAX_BODY} bytes")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+
+    def _internal_error(self, error):
+        self.log_error("%s: %s", type(error).__name__, error)  # Details go to the server log only
+        return 500, {"error": "Internal server error"}
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that handles requests on a fixed pool of worker threads
+    (ThreadingHTTPServer would start a new thread, and so open a new database connection, per request).
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # Connections waiting to be accepted
+
+    def __init__(self, address, handler, workers, verbose=False):
+        # Set up before super().__init__(), which calls server_close() when it cannot bind the address
+        self.workers = ThreadPoolExecutor(workers, thread_name_prefix="http-worker")
+        self.metrics = Metrics()
+        self.verbose = verbose
+        super().__init__(address, handler)
+
+    def process_request(self, request, client_address):
+        self.workers.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.workers.shutdown(wait=True)
+
+
+def serve(host="127.0.0.1", port=8080, workers=POOL_SIZE - 2, verbose=False):
+    """Runs the service until Ctrl-C or SIGTERM"""
+    if not 1 <= workers <= POOL_SIZE - 2:
+        raise ValueError(f"workers must be between 1 and {POOL_SIZE - 2} (the pool has {POOL_SIZE} connections)")
+    migrate()
+    server = PooledHTTPServer((host, port), RequestHandler, workers, verbose)
+    print(f"Serving the donation database on http://{host}:{server.server_port}/api/ with {workers} workers "
+          f"(Ctrl-C to stop)", file=sys.stderr)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # e.g. a service manager stopping it
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close_all_connections()
@@ -3,8 +3,33 @@
 This is the entry point of the Donation Management System application.
 It serves as the launchpad that starts the entire program by calling the main menu.
 The file is kept minimal intentionally - all application logic resides in other modules.
+
+Run it from the project folder (python main.py), which puts the start, body and
+initialize packages on the import path; single modules run as python -m body.donor.
 """
-from initialize.menu import main_menu
+import time
+
+STARTED = time.perf_counter()  # Before the other imports, so --startup-time includes them
+
+import argparse
+import sys
 
 if __name__ == "__main__":
-    main_menu()
+    # "python main.py donors list ..." runs one scripted command instead of the menu (see initialize/cli.py)
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from initialize import cli
+        sys.exit(cli.main(sys.argv[1:]))
+
+    from initialize.menu import main_menu
+
+    parser = argparse.ArgumentParser(description="Donation Management System",
+                                     epilog="Scripted commands: python main.py donors list, donations add ... "
+                                            "(python -m initialize.cli --help lists them)")
+    parser.add_argument("--sample-data", action="store_true",
+                        help="replace all records with the demonstration data before starting")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop all tables and start with an empty database")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print how long the imports and database set-up took before the first prompt")
+    args = parser.parse_args()
+    main_menu(sample_data=args.sample_data, reset=args.reset, started=STARTED if args.startup_time else None)
@@ -0,0 +1,177 @@
+# aio.py
+"""
+This module lets asyncio programs (e.g. an async intake service) use the
+donation database without blocking their event loop.
+
+AsyncDonationStore mirrors the functions of start/crud.py and the search
+queries as coroutines. Each call runs in a worker thread with that thread's
+pooled connection (start/tables.py):
+- reads run on a pool of READ_WORKERS threads, so concurrent reads run in
+  parallel (SQLite releases the GIL while it works, and WAL lets readers
+  run next to the writer)
+- writes run on one writer thread, one after the other, so they never
+  compete for SQLite's write lock
+
+At most max_pending calls are queued or running at a time; further callers
+wait for a free slot (backpressure) instead of piling up work. Cancelling a
+call (task.cancel(), asyncio.wait_for timeout) removes it from the queue if
+it has not started, or interrupts its running statement with
+sqlite3.Connection.interrupt(); an interrupted write is rolled back.
+
+    async with AsyncDonationStore() as store:
+        await store.add_entry("INSERT INTO Donor VALUES (NULL,?,?,?,?,?,?)", values)
+        rows = await store.search_donations(source="Business", min_amount=500)
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from start import crud
+from start.tables import get_connection, discard_finished_threads, POOL_SIZE
+from start.donation_query import search_donations, linked_donations_for
+from start.textsearch import search_text
+
+# Read threads; together with the writer thread and the caller's own thread they must fit in the pool
+READ_WORKERS = min(4, POOL_SIZE - 2)
+
+# Calls queued or running at the same time before new callers have to wait
+MAX_PENDING = 64
+
+
+class _Job:
+    """One call running in a worker thread, which can be interrupted from the event loop"""
+
+    def __init__(self, call):
+        self.call = call
+        self.conn = None        # Connection of the worker thread while the call runs
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def run(self):
+        with self.lock:
+            if self.cancelled:
+                raise asyncio.CancelledError()
+            self.conn = get_connection()  # The same pooled connection the crud functions will use
+        try:
+            return self.call()
+        finally:
+            with self.lock:
+                self.conn = None  # Finished: a late cancel must not interrupt the thread's next call
+
+    def interrupt(self):
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()  # The running statement fails with "interrupted"
+
+
+def _call_soon(loop, callback):
+    # Runs callback on the event loop from a worker thread (nothing to do once the loop is closed)
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+class AsyncDonationStore:
+    """
+    Async versions of the database functions. Results that are streamed by the
+    synchronous functions (searches, listings) are returned as complete lists,
+    so use the limit arguments for large results.
+    """
+
+    def __init__(self, readers=READ_WORKERS, max_pending=MAX_PENDING):
+        if readers < 1 or readers > POOL_SIZE - 2:
+            raise ValueError(f"readers must be between 1 and {POOL_SIZE - 2} (the pool has {POOL_SIZE} connections)")
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="donation-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="donation-write")
+        self._slots = asyncio.Semaphore(max_pending)  # Bound to the event loop that first waits on it
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self, executor, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("The store is closed")
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        job = _Job(functools.partial(func, *args, **kwargs))
+        try:
+            future = executor.submit(job.run)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is only free again once the thread has really finished with the call
+        future.add_done_callback(lambda _: _call_soon(loop, self._slots.release))
+        try:
+            return await asyncio.wrap_future(future)  # Cancelling this also cancels a call that has not started
+        except asyncio.CancelledError:
+            job.interrupt()
+            raise
+
+    def _read(self, func, *args, **kwargs):
+        return self._run(self._readers, func, *args, **kwargs)
+
+    def _write(self, func, *args, **kwargs):
+        return self._run(self._writer, func, *args, **kwargs)
+
+    # Reads (run in parallel)
+
+    async def view_all(self, table):
+        return await self._read(crud.view_all, table)
+
+    async def linked_donations(self, column, id):
+        return await self._read(crud.linked_donations, column, id)
+
+    async def fetch_page(self, table, columns=None, order_by=None, after=None, limit=50, descending=False):
+        return await self._read(crud.fetch_page, table, columns, order_by, after, limit, descending)
+
+    async def search_donations(self, **criteria):
+        return await self._read(lambda: list(search_donations(**criteria)))
+
+    async def linked_donations_for(self, entity, ids):
+        ids = list(ids)
+        return await self._read(lambda: list(linked_donations_for(entity, ids)))
+
+    async def search_text(self, text, kinds=None, limit=20):
+        return await self._read(search_text, text, kinds, limit)
+
+    # Writes (run one at a time)
+
+    async def add_entry(self, query, values):
+        return await self._write(crud.add_entry, query, values)
+
+    async def update_entry(self, query, values):
+        return await self._write(crud.update_entry, query, values)
+
+    async def delete_entry(self, query, id):
+        return await self._write(crud.delete_entry, query, id)
+
+    async def bulk_delete(self, table, ids=None, where=None, params=()):
+        ids = None if ids is None else list(ids)
+        return await self._write(crud.bulk_delete, table, ids, where, params)
+
+    async def in_transaction(self, func, *args, **kwargs):
+        """Runs func (e.g. a check and the writes that depend on it) as one crud.Transaction on the writer thread"""
+        def unit():
+            with crud.Transaction():
+                return func(*args, **kwargs)
+        return await self._write(unit)
+
+    async def close(self):
+        """Waits for the running calls, stops the worker threads and frees their connections"""
+        if self._closed:
+            return
+        self._closed = True
+        await asyncio.to_thread(self._shutdown)
+
+    def _shutdown(self):
+        self._readers.shutdown(wait=True, cancel_futures=True)
+        self._writer.shutdown(wait=True, cancel_futures=True)
+        discard_finished_threads()
@@ -0,0 +1,63 @@
+# batch.py
+"""
+This module records many donations as one batch, for rapid entry on event nights.
+
+The donations of a batch are kept in memory while they are typed in, so the
+database is not locked while the volunteer is typing. commit() then inserts
+them all in a single transaction and saves them with one commit (one fsync).
+Every donation runs in its own savepoint, so a donation the database rejects
+is rolled back on its own while the rest of the batch is kept.
+"""
+
+import sqlite3 as db
+
+from start.crud import Transaction
+
+INSERT_DONATION_SQL = """INSERT INTO Donation (Amount, Date, Notes, Donor_ID, Event_ID, Business_ID, Beneficiary_ID)
+                         VALUES (?,?,?,?,?,?,?)"""
+
+
+class DonationBatch:
+    """
+    An open batch of donations.
+        batch = DonationBatch()
+        batch.add(values)   # values as returned by start.validation.validate_donation
+        saved, rejected = batch.commit()
+    """
+
+    def __init__(self):
+        self.added = []  # Values of the donations waiting to be saved
+
+    def add(self, values):
+        """Adds one donation to the batch (nothing is written until commit())"""
+        self.added.append(values)
+
+    def undo(self):
+        """Removes the last donation added to the batch; returns its values or None"""
+        return self.added.pop() if self.added else None
+
+    def total(self):
+        return sum(values[0] for values in self.added)
+
+    def commit(self):
+        """
+        Saves every donation of the batch at once.
+        Returns:
+            tuple: (list of new Donation_IDs, list of (values, reason) for the donations the database rejected)
+        Raises:
+            sqlite3.Error: If the batch cannot be saved (nothing is saved)
+        """
+        saved, rejected = [], []
+        with Transaction():  # The write lock is only taken now, for the inserts themselves
+            for values in self.added:
+                try:
+                    with Transaction() as row:  # Nested in the batch: a savepoint
+                        saved.append(row.execute(INSERT_DONATION_SQL, values).lastrowid)
+                except db.IntegrityError as e:
+                    rejected.append((values, str(e)))
+        self.added = []
+        return saved, rejected
+
+    def rollback(self):
+        """Throws the whole batch away"""
+        self.added = []
@@ -0,0 +1,192 @@
+# cache.py
+"""
+This module keeps recently used listings in memory, so screens that show the
+same entity lists again and again (the donation pick lists, the search menu
+listings) do not read the same tables from the database every time.
+
+Cached results are kept per query, least recently used first out, and are
+thrown away when the data they came from may have changed:
+- writes made by this program (start/crud.py, bulk deletes, the importer and
+  the generator) invalidate the entries of the tables they change
+- writes made inside a unit of work (start.crud.Transaction) invalidate their
+  tables once it is committed
+- changes committed by any other connection (another process, e.g. a second
+  terminal or the scripted CLI) are detected with PRAGMA data_version, which
+  only reads a counter, and clear the whole cache
+
+Results larger than MAX_ROWS are streamed and not cached.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from start.tables import get_connection
+
+MAX_ENTRIES = 64     # Cached queries kept before the least recently used one is dropped
+MAX_ROWS = 50000     # Results with more rows than this are not kept in memory
+
+# Entity -> SQL expression for its display name
+NAME_EXPRESSIONS = {
+    "Donor": "Donor.First_Name || ' ' || Donor.Last_Name",
+    "Event": "Event.Name",
+    "Business": "Business.Name",
+    "Beneficiary": "Beneficiary.Name",
+    "Volunteer": "Volunteer.First_Name || ' ' || Volunteer.Last_Name",
+}
+
+# Writing to a table can also change these tables (ON DELETE CASCADE in start/tables.py)
+DEPENDENT_TABLES = {
+    "Event": ("Volunteer",),
+}
+
+# Table written by an INSERT, UPDATE, DELETE or REPLACE statement
+_WRITTEN_TABLE = re.compile(r"^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+                            re.IGNORECASE)
+
+_entries = OrderedDict()  # (query, params, convert) -> (set of tables, rows), least recently used first
+_lock = threading.Lock()
+_generation = 0           # Increased by every invalidation, so a result read during a write is not kept
+_seen = threading.local() # (connection, data_version) last seen by this thread
+_counts = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def invalidate(*tables):
+    """Forgets the cached results that read any of the tables (every result if no table is given)"""
+    global _generation
+    changed = set(tables)
+    for table in tables:
+        changed.update(DEPENDENT_TABLES.get(table, ()))
+    with _lock:
+        _generation += 1
+        _counts["invalidations"] += 1
+        if not changed:
+            _entries.clear()
+            return
+        for key in [key for key, (used, _) in _entries.items() if used & changed]:
+            del _entries[key]
+
+
+def written_table(query):
+    """Returns the table changed by an SQL write statement, or None if it is not recognised"""
+    match = _WRITTEN_TABLE.match(query)
+    return match.group(1) if match else None
+
+
+def invalidate_for(query):
+    """Invalidates the table changed by an SQL write statement (everything if the table is not recognised)"""
+    table = written_table(query)
+    invalidate(*([table] if table else []))
+
+
+def _check_data_version(conn):
+    # data_version only changes when another connection commits, so our own writes
+    # (on this connection) are invalidated explicitly by invalidate()
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    seen = getattr(_seen, "value", None)
+    if seen != (conn, version):
+        # Changed since this thread's last look: another connection wrote to the database.
+        # On a thread's first look there is nothing to compare with (data_version values of
+        # different connections cannot be compared), so the entries cached by other threads
+        # may already be out of date and are dropped too.
+        if seen is not None or _entries:
+            invalidate()
+        _seen.value = (conn, version)
+
+
+def cached_query(tables, query, params=(), convert=None):
+    """
+    Returns the rows of a SELECT, from memory if the same query was run before and
+    none of the tables it reads has changed since.
+    Parameters:
+        tables (tuple): Every table the query reads
+        query (str): SELECT statement
+        params (tuple): Values for its placeholders
+        convert (function/None): Turns the list of rows into what is cached and returned (e.g. dict)
+    Returns:
+        list/iterator: The rows (an iterator if there are more than MAX_ROWS), or convert(rows).
+                       Cached results are shared: do not change them.
+    """
+    key = (query, tuple(params), convert)
+    conn = get_connection()
+    if conn.in_transaction:
+        # Inside a unit of work (start.crud.Transaction) the rows may include uncommitted
+        # changes, which must neither be kept nor hidden behind older cached rows
+        rows = conn.execute(query, params).fetchall()
+        return convert(rows) if convert else rows
+    _check_data_version(conn)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+            _counts["hits"] += 1
+            return entry[1]
+        _counts["misses"] += 1
+        generation = _generation
+
+    cursor = conn.execute(query, params)
+    rows = cursor.fetchmany(MAX_ROWS + 1)
+    if len(rows) > MAX_ROWS:
+        rows = _stream(rows, cursor)  # Too big to keep: stream the rest
+        return convert(rows) if convert else rows
+    cursor.close()
+    if convert:
+        rows = convert(rows)
+    with _lock:
+        if generation == _generation:  # Nothing was written while the rows were read
+            _entries[key] = (set(tables), rows)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return rows
+
+
+def _stream(first_rows, cursor):
+    try:
+        yield from first_rows
+        while True:
+            batch = cursor.fetchmany(500)
+            if not batch:
+                break
+            yield from batch
+    finally:
+        cursor.close()
+
+
+def cached_rows(table, columns=None, order_by=None):
+    """
+    Returns every row of a table (see start.crud.iter_rows), kept in memory between calls.
+    Raises:
+        ValueError: If the table or a column name is not known
+    """
+    from start.crud import table_columns, PRIMARY_KEYS, _check_columns  # Imported here because start.crud builds on this module
+    columns = list(columns or table_columns(table))
+    order_by = order_by or PRIMARY_KEYS.get(table)
+    _check_columns(table, columns + [order_by])
+    return cached_query((table,), f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order_by}")
+
+
+def name_map(table):
+    """
+    Returns {ID: display name} for every record of an entity, in ID order, kept in memory between calls.
+    Raises:
+        ValueError: If the entity has no display name
+    """
+    if table not in NAME_EXPRESSIONS:
+        raise ValueError(f"Record type must be one of: {', '.join(NAME_EXPRESSIONS)}")
+    from start.crud import PRIMARY_KEYS
+    key = PRIMARY_KEYS[table]
+    return cached_query((table,), f"SELECT {key}, {NAME_EXPRESSIONS[table]} FROM {table} ORDER BY {key}", convert=dict)
+
+
+def cache_info():
+    """Returns the number of hits, misses, invalidations and cached queries"""
+    with _lock:
+        return dict(_counts, entries=len(_entries))
+
+
+def clear():
+    """Empties the cache and resets its counters"""
+    invalidate()
+    with _lock:
+        for name in _counts:
+            _counts[name] = 0
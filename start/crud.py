@@ -7,8 +7,134 @@ IMPORTANT: These functions assume all input validation has been done by the call
 They focus solely on database operations and will propagate any database errors.
 """
 
+import json
+import sqlite3 as db
+import threading
+
+from start import cache
 from start.tables import get_connection
 
+_current = threading.local()  # The innermost open Transaction of each thread
+
+
+class Transaction:
+    """
+    A unit of work: several reads and writes on one connection, saved with one commit.
+        with Transaction() as tx:
+            if not linked_donations("Donor_ID", donor_id):
+                delete_entry("DELETE FROM Donor WHERE Donor_ID=?", donor_id)
+    While it is open, every function of this module (and tx.execute) runs inside it on
+    this thread instead of committing on its own, so no other connection can change
+    the data between a check and the write that depends on it, and the whole unit
+    pays for one commit. The outermost transaction starts with BEGIN IMMEDIATE (it
+    takes the write lock at once) unless immediate=False. A Transaction opened inside
+    another one is a savepoint: rolling it back undoes only its own changes.
+    Leaving the with block commits; an exception leaving it rolls back.
+    The Transaction owns the pooled connection while it is open, so helpers in other modules
+    that release() the connection inside the block do not end it. If something else does end
+    it (a commit or rollback on the connection), commit() raises instead of reporting success.
+    Cached listings (start/cache.py) of the written tables are invalidated after the
+    outermost commit.
+    """
+
+    def __init__(self, immediate=True):
+        self.immediate = immediate
+        self.conn = None
+        self.parent = None      # Enclosing Transaction, None for the outermost one
+        self.savepoint = None   # Savepoint name of a nested Transaction
+        self.changed = set()    # Tables written (None: a table that was not recognised), shared with nested ones
+        self.open = False
+
+    def begin(self):
+        """Starts the transaction (or its savepoint); returns the Transaction"""
+        if self.open:
+            raise RuntimeError("The transaction is already open")
+        self.parent = getattr(_current, "transaction", None)
+        if self.parent is None:
+            self.conn = get_connection()  # Pooled connection, the one the functions below use on this thread
+            self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+            self.conn.owner = self  # Helpers that release the connection inside the unit leave it open
+        else:
+            self.conn = self.parent.conn
+            self.changed = self.parent.changed
+            self.savepoint = f"unit_{id(self):x}"
+            self.conn.execute(f"SAVEPOINT {self.savepoint}")
+        self.open = True
+        _current.transaction = self
+        return self
+
+    def execute(self, query, params=(), tables=None):
+        """
+        Runs one statement in the transaction.
+        Parameters:
+            query (str): SQL statement with placeholders
+            params (tuple): Values for the placeholders
+            tables (tuple/None): Tables the statement writes, when it is not a plain
+                                 INSERT/UPDATE/DELETE on one table (e.g. it starts with WITH)
+        Returns:
+            sqlite3.Cursor: The cursor, for fetching rows or lastrowid
+        """
+        self._check_current()
+        before = self.conn.total_changes
+        cursor = self.conn.execute(query, params)
+        if self.conn.total_changes != before:  # Only statements that changed rows make cached listings stale
+            self.changed.update(tables or (cache.written_table(query),))
+        return cursor
+
+    def commit(self):
+        """Saves the work (a nested transaction releases its savepoint into the enclosing one)"""
+        self._check_current()
+        self._finish()
+        if self.parent is not None:
+            self.conn.execute(f"RELEASE {self.savepoint}")
+            return
+        self.conn.owner = None
+        try:
+            if not self.conn.in_transaction:
+                # Something ended the transaction behind our back (e.g. a commit or rollback on the
+                # connection): the changes made after that are not part of it, so do not report success
+                raise db.OperationalError("The transaction was ended before commit(); its changes may not have been saved")
+            self.conn.commit()
+        finally:
+            if self.conn.in_transaction:
+                self.conn.rollback()  # The commit failed: nothing of the unit is saved
+            self.conn.release()  # Hands the connection back to the pool
+        if None in self.changed:
+            cache.invalidate()
+        elif self.changed:
+            cache.invalidate(*self.changed)
+
+    def rollback(self):
+        """Throws the work away (a nested transaction only undoes the changes since it began)"""
+        self._check_current()
+        self._finish()
+        if self.parent is None:
+            self.conn.owner = None
+            self.conn.rollback()
+            self.conn.release()
+        elif self.conn.in_transaction:  # SQLite may already have rolled back everything after an error
+            self.conn.execute(f"ROLLBACK TO {self.savepoint}")
+            self.conn.execute(f"RELEASE {self.savepoint}")
+
+    def _check_current(self):
+        if not self.open or getattr(_current, "transaction", None) is not self:
+            raise RuntimeError("Not the innermost open transaction of this thread")
+
+    def _finish(self):
+        self.open = False
+        _current.transaction = self.parent
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
 def _execute_operation(query, params=None, fetch=False):
     """
     Internal helper function to execute database operations.
@@ -17,19 +143,30 @@ def _execute_operation(query, params=None, fetch=False):
         params (tuple/None): Parameters for the query
         fetch (bool): Whether to fetch results
     Returns:
-        list: Results if fetch=True, None otherwise
+        list/int: Results if fetch=True, otherwise the rowid of the last inserted row
     Raises:
         sqlite3.Error: For any database-related errors
     """
-    conn = get_connection()
+    transaction = getattr(_current, "transaction", None)
+    if transaction is not None:  # Part of a unit of work, which commits when it ends
+        cursor = transaction.execute(query, params or ())
+        return cursor.fetchall() if fetch else cursor.lastrowid
+
+    conn = get_connection()  # Pooled connection, reused by every call on this thread
     cursor = conn.cursor()
     try:
         cursor.execute(query, params or ())
         if fetch:
             return cursor.fetchall()
         conn.commit()
+        cache.invalidate_for(query)  # Cached listings of the changed table are out of date now
+        return cursor.lastrowid
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()  # A failed write leaves nothing behind
+        raise
     finally:
-        conn.close()
+        conn.release()  # Hands the connection back to the pool
 
 """
 Retrieves all records from a specified table.
@@ -48,11 +185,13 @@ Adds a new record to the database.
 Parameters:
     query (str): SQL INSERT statement with placeholders
     values (tuple): Values for the placeholders
+Returns:
+    int: ID (rowid) of the new record
 Raises:
     sqlite3.Error: If insertion fails (constraint violation, etc.)
 """
 def add_entry(query, values):
-    _execute_operation(query, values)
+    return _execute_operation(query, values)
 
 """
 Updates existing records in the database.
@@ -89,10 +228,227 @@ Raises:
     sqlite3.Error: If query fails
 """
 def linked_donations(column, id):
+    # EXISTS stops at the first matching donation (found through the index on the column)
     result = _execute_operation(
-        f"SELECT 1 FROM Donation WHERE {column} = ?", 
-        (id,), 
+        f"SELECT EXISTS (SELECT 1 FROM Donation WHERE {column} = ?)",
+        (id,),
         fetch=True
     )
-    return bool(result)
+    return bool(result[0][0])
+
+
+# Primary key of every table that can be listed. Also used to check table names,
+# because table and column names cannot be passed as SQL parameters.
+PRIMARY_KEYS = {
+    "Donor": "Donor_ID",
+    "Beneficiary": "Beneficiary_ID",
+    "Event": "Event_ID",
+    "Business": "Business_ID",
+    "Volunteer": "Volunteer_ID",
+    "Donation": "Donation_ID",
+}
+
+_table_columns = {}  # table -> list of column names (read once from the schema)
+
+def table_columns(table):
+    """
+    Returns the column names of a table, in table order.
+    Raises:
+        ValueError: If the table is not one of the app's tables
+    """
+    if table not in PRIMARY_KEYS:
+        raise ValueError(f"Unknown table '{table}'")
+    if table not in _table_columns:
+        rows = _execute_operation(f"PRAGMA table_info({table})", fetch=True)
+        _table_columns[table] = [row[1] for row in rows]
+    return _table_columns[table]
+
+"""
+Retrieves one record by its ID.
+Parameters:
+    table (str): Name of the table to query
+    id (int): Primary key value
+Returns:
+    tuple/None: The record, or None if there is no record with this ID
+Raises:
+    ValueError: If the table is not known
+"""
+def get_entry(table, id):
+    pk = PRIMARY_KEYS.get(table)
+    if pk is None:
+        raise ValueError(f"Unknown table '{table}'")
+    rows = _execute_operation(f"SELECT * FROM {table} WHERE {pk} = ?", (id,), fetch=True)
+    return rows[0] if rows else None
+
+def _check_columns(table, columns):
+    known = table_columns(table)
+    for column in columns:
+        if column not in known:
+            raise ValueError(f"Unknown column '{column}' in table {table}")
+
+"""
+Reads one page of a table using keyset pagination.
+Instead of OFFSET (which re-reads every skipped row) the next page starts right after
+the last row of the previous page, so every page costs the same however deep you go.
+Parameters:
+    table (str): Name of the table to query
+    columns (list/None): Columns to return, all columns if None
+    order_by (str/None): Column to sort by (should be NOT NULL and indexed), primary key if None
+    after (tuple/None): Key returned with the previous page, None for the first page
+    limit (int): Maximum number of rows in the page
+    descending (bool): Sort from highest to lowest
+Returns:
+    tuple: (list of rows, key for the next page or None if this was the last page)
+Raises:
+    ValueError: If the table or a column name is not known
+    sqlite3.Error: If the query fails
+"""
+def fetch_page(table, columns=None, order_by=None, after=None, limit=50, descending=False):
+    pk = PRIMARY_KEYS.get(table)
+    columns = list(columns or table_columns(table))
+    _check_columns(table, columns + [order_by or pk])
+
+    # The sort key is (order_by, primary key); the primary key breaks ties between equal values
+    keys = [pk] if not order_by or order_by == pk else [order_by, pk]
+    direction = "DESC" if descending else "ASC"
+    query = f"SELECT {', '.join(columns + keys)} FROM {table}"
+    params = []
+    if after is not None:
+        placeholders = ", ".join("?" * len(keys))
+        query += f" WHERE ({', '.join(keys)}) {'<' if descending else '>'} ({placeholders})"
+        params = list(after)
+    query += f" ORDER BY {', '.join(f'{k} {direction}' for k in keys)} LIMIT ?"
+    params.append(limit)
+
+    rows = _execute_operation(query, tuple(params), fetch=True)
+    next_key = tuple(rows[-1][len(columns):]) if rows and len(rows) == limit else None
+    return [row[:len(columns)] for row in rows], next_key
+
+"""
+Streams the results of a query in batches with fetchmany().
+Only one batch is held in memory at a time, and the first rows are available
+before the query has finished.
+Parameters:
+    query (str): SQL SELECT statement with placeholders
+    params (tuple/None): Values for the placeholders
+    batch_size (int): Rows fetched from SQLite at a time
+Yields:
+    tuple: One row at a time
+Raises:
+    sqlite3.Error: If the query fails
+"""
+def iter_query(query, params=None, batch_size=500):
+    conn = get_connection()
+    cursor = conn.execute(query, params or ())
+    try:
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield from batch
+    finally:
+        cursor.close()
+
+"""
+Streams every row of a table, optionally only some columns and in a chosen order.
+Parameters:
+    table (str): Name of the table to query
+    columns (list/None): Columns to return, all columns if None
+    order_by (str/None): Column to sort by, primary key if None
+    batch_size (int): Rows fetched from SQLite at a time
+Returns:
+    iterator: The rows, one tuple at a time
+Raises:
+    ValueError: If the table or a column name is not known (raised by the call itself,
+                before any row is read or any output has been written)
+"""
+def iter_rows(table, columns=None, order_by=None, batch_size=500):
+    columns = list(columns or table_columns(table))
+    order_by = order_by or PRIMARY_KEYS.get(table)
+    _check_columns(table, columns + [order_by])
+    return iter_query(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order_by}", batch_size=batch_size)
+
+"""
+Finds which of several records do not exist, with one query for all of them.
+Parameters:
+    ids (dict): Table -> ID, e.g. {"Donor": 12, "Beneficiary": 3}; blank or None IDs are skipped
+Returns:
+    list: (table, ID) of every record that does not exist, empty if they all do
+Raises:
+    ValueError: If a table is not known
+"""
+def missing_records(ids):
+    wanted = [(table, int(id)) for table, id in ids.items() if id not in (None, "")]
+    for table, _ in wanted:
+        if table not in PRIMARY_KEYS:
+            raise ValueError(f"Unknown table '{table}'")
+    if not wanted:
+        return []
+    # One EXISTS per record, each a primary key lookup, all answered in a single round trip
+    checks = ", ".join(f"EXISTS (SELECT 1 FROM {table} WHERE {PRIMARY_KEYS[table]} = ?)" for table, _ in wanted)
+    found = _execute_operation(f"SELECT {checks}", tuple(id for _, id in wanted), fetch=True)[0]
+    return [record for record, exists in zip(wanted, found) if not exists]
+
+# Table -> Donation column that references it. Records still referenced by a donation cannot be deleted.
+DONATION_REFERENCES = {
+    "Donor": "Donor_ID",
+    "Event": "Event_ID",
+    "Business": "Business_ID",
+    "Beneficiary": "Beneficiary_ID",
+}
+
+"""
+Deletes many records of one table in a single transaction.
+Records still linked to donations are kept and reported instead of deleted.
+The reference check is one set-based EXISTS query and the delete is one statement,
+both inside the same Transaction, so no donation can be linked in between.
+Called inside an open Transaction it becomes part of it (a savepoint).
+Parameters:
+    table (str): Table to delete from
+    ids (list/None): IDs of the records to delete
+    where (str/None): SQL condition selecting the records instead of a list of IDs,
+                      e.g. "Email LIKE ?" (with its values in params)
+    params (tuple): Values for the placeholders in where
+Returns:
+    tuple: (list of deleted IDs, list of IDs kept because donations are linked,
+            list of requested IDs that do not exist)
+Raises:
+    ValueError: If the table is not known or neither ids nor where is given
+    sqlite3.Error: If the delete fails (nothing is deleted)
+"""
+def bulk_delete(table, ids=None, where=None, params=()):
+    pk = PRIMARY_KEYS.get(table)
+    if pk is None:
+        raise ValueError(f"Unknown table '{table}'")
+    if ids is None and where is None:
+        raise ValueError("Give a list of IDs or a condition")
+
+    # Every statement below works on the same set of candidate IDs
+    if ids is not None:
+        candidates = "WITH ids(value) AS (SELECT DISTINCT value FROM json_each(?))"
+        candidate_params = (json.dumps([int(i) for i in ids]),)
+    else:
+        candidates = f"WITH ids(value) AS (SELECT {pk} FROM {table} WHERE {where})"
+        candidate_params = tuple(params)
+    reference = DONATION_REFERENCES.get(table)
+    linked = f"EXISTS (SELECT 1 FROM Donation WHERE Donation.{reference} = ids.value)" if reference else "0"
+
+    with Transaction() as transaction:  # Takes the write lock before checking references
+        rows = transaction.execute(f"""
+            {candidates}
+            SELECT ids.value,
+                   EXISTS (SELECT 1 FROM {table} WHERE {pk} = ids.value),
+                   {linked}
+            FROM ids ORDER BY ids.value
+        """, candidate_params).fetchall()
+        missing = [row[0] for row in rows if not row[1]]
+        blocked = [row[0] for row in rows if row[1] and row[2]]
+        deleted = [row[0] for row in rows if row[1] and not row[2]]
 
+        if deleted:
+            transaction.execute(f"""
+                {candidates}
+                DELETE FROM {table}
+                WHERE {pk} IN (SELECT value FROM ids WHERE NOT {linked})
+            """, candidate_params, tables=(table,))
+    return deleted, blocked, missing
@@ -0,0 +1,217 @@
+# donation_query.py
+"""
+This module is a query engine for donations.
+
+Any combination of filters (donor, event, business, beneficiary, volunteer,
+date range, amount range, source type and beneficiary priority) is compiled
+into one parameterized SELECT, so a question such as
+"business gifts over £500 to High priority beneficiaries in Q4" is a single
+indexed query:
+
+    search_donations(source="Business", min_amount=500, priority="High",
+                     date_from="2025-10-01", date_to="2025-12-31")
+
+The SQL only depends on which filters are used (the "shape" of the query), not
+on their values. Compiled statements are cached by shape, and because the SQL
+text is identical for every search of the same shape, SQLite's own statement
+cache reuses the prepared statement as well.
+
+Equality filters only compare the indexed Donation columns directly
+(e.g. Donation.Donor_ID = ?), never through functions, so SQLite can use the
+indexes from start/tables.py.
+"""
+
+import json
+from functools import lru_cache
+
+from start.tables import get_connection
+from start.crud import iter_query
+
+# Filter name -> WHERE condition (each ? is filled with the filter value)
+FILTERS = {
+    "donor_id": "Donation.Donor_ID = ?",
+    "event_id": "Donation.Event_ID = ?",
+    "business_id": "Donation.Business_ID = ?",
+    "beneficiary_id": "Donation.Beneficiary_ID = ?",
+    "volunteer_id": "Donation.Event_ID = (SELECT Event_ID FROM Volunteer WHERE Volunteer_ID = ?)",
+    "date_from": "Donation.Date >= ?",
+    "date_to": "Donation.Date <= ?",
+    "min_amount": "Donation.Amount >= ?",
+    "max_amount": "Donation.Amount <= ?",
+    "priority": "Beneficiary.Funding_priority = ?",
+}
+
+# ID filters also accept a list of IDs, sent to SQLite as one JSON array
+# so the SQL stays the same however many IDs there are
+ID_FILTERS = ("donor_id", "event_id", "business_id", "beneficiary_id")
+
+# Source type -> Donation column that is set for that kind of donation
+SOURCES = {
+    "Donor": "Donation.Donor_ID",
+    "Business": "Donation.Business_ID",
+    "Event": "Donation.Event_ID",
+}
+
+ORDER_COLUMNS = {
+    "date": "Donation.Date",
+    "amount": "Donation.Amount",
+    "id": "Donation.Donation_ID",
+}
+
+# Every result row has these columns, in this order
+RESULT_COLUMNS = ("Donation_ID", "Amount", "Date", "Notes", "Source", "Source_Name", "Beneficiary", "Priority")
+
+COLUMNS_SQL = """Donation.Donation_ID, Donation.Amount, Donation.Date, Donation.Notes,
+           CASE WHEN Donation.Donor_ID IS NOT NULL THEN 'Donor'
+                WHEN Donation.Business_ID IS NOT NULL THEN 'Business'
+                ELSE 'Event' END,
+           CASE WHEN Donation.Donor_ID IS NOT NULL THEN Donor.First_Name || ' ' || Donor.Last_Name
+                WHEN Donation.Business_ID IS NOT NULL THEN Business.Name
+                ELSE Event.Name END,
+           Beneficiary.Name, Beneficiary.Funding_priority"""
+
+JOINS_SQL = """
+    JOIN Beneficiary ON Beneficiary.Beneficiary_ID = Donation.Beneficiary_ID
+    LEFT JOIN Donor ON Donor.Donor_ID = Donation.Donor_ID
+    LEFT JOIN Business ON Business.Business_ID = Donation.Business_ID
+    LEFT JOIN Event ON Event.Event_ID = Donation.Event_ID"""
+
+SELECT_SQL = f"""
+    SELECT {COLUMNS_SQL}
+    FROM Donation{JOINS_SQL}"""
+
+
+@lru_cache(maxsize=128)
+def compile_shape(filters, many, source, order_by, descending, limited):
+    """
+    Builds the SQL for one query shape (cached, so every shape is only built once).
+    Parameters:
+        filters (tuple): Names of the filters used, in FILTERS order
+        many (tuple): Names of the ID filters given a list of IDs
+        source (str/None): Source type, or None for all sources
+        order_by (str): Key of ORDER_COLUMNS
+        descending (bool): Sort from highest to lowest
+        limited (bool): True if the query has a LIMIT
+    """
+    conditions = []
+    for name in filters:
+        if name in many:
+            column = FILTERS[name].split(" = ")[0]
+            conditions.append(f"{column} IN (SELECT value FROM json_each(?))")
+        else:
+            conditions.append(FILTERS[name])
+    if source:
+        conditions.append(f"{SOURCES[source]} IS NOT NULL")
+
+    query = SELECT_SQL
+    if conditions:
+        query += "\n    WHERE " + "\n      AND ".join(conditions)
+    direction = "DESC" if descending else "ASC"
+    # Donation_ID breaks ties so the order is always the same
+    keys = [ORDER_COLUMNS[order_by]]
+    if order_by != "id":
+        keys.append(ORDER_COLUMNS["id"])
+    query += "\n    ORDER BY " + ", ".join(f"{k} {direction}" for k in keys)
+    if limited:
+        query += "\n    LIMIT ?"
+    return query
+
+
+def build_donation_query(order_by="date", descending=False, limit=None, source=None, **filters):
+    """
+    Compiles a donation search into SQL and its parameters.
+    Filters with the value None are ignored, so unanswered prompts can be passed straight in.
+    Parameters:
+        order_by (str): "date", "amount" or "id"
+        descending (bool): Sort from highest to lowest
+        limit (int/None): Maximum number of rows, all rows if None
+        source (str/None): Only donations from a "Donor", "Business" or "Event"
+        **filters: Any of the names in FILTERS, e.g. donor_id=3, min_amount=500;
+                   ID filters also take a list of IDs
+    Returns:
+        tuple: (SQL string, list of parameters)
+    Raises:
+        ValueError: If a filter, source type or sort order is not known
+    """
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    if source is not None and source not in SOURCES:
+        raise ValueError(f"Source must be one of: {', '.join(SOURCES)}")
+    if order_by not in ORDER_COLUMNS:
+        raise ValueError(f"Sort order must be one of: {', '.join(ORDER_COLUMNS)}")
+
+    used = tuple(name for name in FILTERS if filters.get(name) is not None)
+    many = tuple(name for name in used if name in ID_FILTERS and isinstance(filters[name], (list, tuple, set)))
+    params = [json.dumps(list(filters[name])) if name in many else filters[name] for name in used]
+    if limit is not None:
+        params.append(limit)
+    query = compile_shape(used, many, source, order_by, bool(descending), limit is not None)
+    return query, params
+
+
+def search_donations(**criteria):
+    """
+    Streams the donations matching the criteria (see build_donation_query).
+    Yields:
+        tuple: One row per donation with the columns in RESULT_COLUMNS
+    Raises:
+        ValueError: If the criteria are not valid
+    """
+    query, params = build_donation_query(**criteria)
+    return iter_query(query, tuple(params))
+
+
+def explain_donation_query(**criteria):
+    """Returns SQLite's query plan for a search, useful to check that an index is used"""
+    query, params = build_donation_query(**criteria)
+    conn = get_connection()
+    try:
+        return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    finally:
+        conn.release()
+
+
+# Record type -> how its IDs reach Donation (ids is the json_each() list of requested IDs)
+RELATIONSHIPS = {
+    "Donor": "JOIN Donation ON Donation.Donor_ID = ids.value",
+    "Business": "JOIN Donation ON Donation.Business_ID = ids.value",
+    "Event": "JOIN Donation ON Donation.Event_ID = ids.value",
+    "Beneficiary": "JOIN Donation ON Donation.Beneficiary_ID = ids.value",
+    # A volunteer is linked to the donations of the event they worked at
+    "Volunteer": """JOIN Volunteer ON Volunteer.Volunteer_ID = ids.value
+    JOIN Donation ON Donation.Event_ID = Volunteer.Event_ID""",
+}
+
+
+@lru_cache(maxsize=None)
+def relationship_sql(entity):
+    """Builds (once per record type) the query behind linked_donations_for()"""
+    return f"""
+    SELECT {COLUMNS_SQL},
+           ids.value,
+           COUNT(*) OVER owner,
+           SUM(Donation.Amount) OVER owner
+    FROM (SELECT DISTINCT value FROM json_each(?)) AS ids
+    {RELATIONSHIPS[entity]}{JOINS_SQL}
+    WINDOW owner AS (PARTITION BY ids.value)
+    ORDER BY ids.value, Donation.Date, Donation.Donation_ID"""
+
+
+def linked_donations_for(entity, ids):
+    """
+    Streams the donations linked to one or many records in a single query,
+    e.g. every donation of the events where 300 volunteers worked.
+    Parameters:
+        entity (str): "Volunteer", "Donor", "Business", "Event" or "Beneficiary"
+        ids (list): IDs of the records
+    Yields:
+        tuple: The columns in RESULT_COLUMNS followed by the requested ID, the number of
+               donations linked to that ID and their total amount.
+               Rows are grouped by requested ID; IDs without donations yield no rows.
+    Raises:
+        ValueError: If the record type is not known
+    """
+    if entity not in RELATIONSHIPS:
+        raise ValueError(f"Record type must be one of: {', '.join(RELATIONSHIPS)}")
+    return iter_query(relationship_sql(entity), (json.dumps([int(i) for i in ids]),))
@@ -0,0 +1,226 @@
+# export.py
+"""
+This module exports the Donation table into a compact columnar format for finance reporting.
+
+Each column is written to its own file in an output directory:
+- Numbers and IDs go to NumPy .npy files (little-endian int64 / float64)
+- Dates go to .npy files of type datetime64[D] (days since 1970-01-01)
+- Text columns (Notes and the optional names) are stored as two files, Arrow style:
+  <column>.offsets.npy (int64, one more entry than rows) and <column>.utf8 (all text, UTF-8).
+  Row i is data[offsets[i]:offsets[i+1]].
+A manifest.json file describes the columns and the row count.
+
+Missing IDs are stored as 0 (real IDs start at 1) and missing or badly formatted dates as NaT.
+
+The .npy files are written with the standard library only, so NumPy is not needed to export.
+Rows are read in fixed-size batches with fetchmany(), so memory use stays constant
+however big the Donation table is.
+Downstream tools can memory-map the result instead of parsing it:
+    amounts = numpy.load("export/Amount.npy", mmap_mode="r")
+
+Usage:
+    python -m start.export export_dir
+    python -m start.export export_dir --with-names --batch-size 100000
+"""
+
+import argparse
+import array
+import json
+import os
+import sys
+from datetime import date
+
+from start.tables import get_connection
+
+DEFAULT_BATCH_SIZE = 50000
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128  # Fixed header size, so the row count can be filled in after streaming
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NAT = -(2 ** 63)  # NumPy's "Not a Time" value for datetime64
+
+# Donation columns: (column name, kind)
+DONATION_COLUMNS = [
+    ("Donation_ID", "int"),
+    ("Amount", "float"),
+    ("Date", "date"),
+    ("Notes", "text"),
+    ("Donor_ID", "int"),
+    ("Event_ID", "int"),
+    ("Business_ID", "int"),
+    ("Beneficiary_ID", "int"),
+]
+
+# Extra columns added by --with-names: (column name, kind, SQL expression)
+NAME_COLUMNS = [
+    ("Donor_Name", "text", "Donor.First_Name || ' ' || Donor.Last_Name"),
+    ("Event_Name", "text", "Event.Name"),
+    ("Business_Name", "text", "Business.Name"),
+    ("Beneficiary_Name", "text", "Beneficiary.Name"),
+]
+
+# kind -> (NumPy dtype description, array module type code)
+NPY_TYPES = {
+    "int": ("<i8", "q"),
+    "float": ("<f8", "d"),
+    "date": ("<M8[D]", "q"),
+}
+
+
+class NpyColumnWriter:
+    """Appends values to a one-dimensional .npy file and fills in its length when closed."""
+
+    def __init__(self, path, descr, typecode):
+        self.file = open(path, "wb")
+        self.descr = descr
+        self.typecode = typecode
+        self.length = 0
+        self.file.write(self._header())  # Placeholder header, rewritten in close()
+
+    def _header(self):
+        header = f"{{'descr': '{self.descr}', 'fortran_order': False, 'shape': ({self.length},), }}"
+        padding = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - len(header) - 1
+        return NPY_MAGIC + (NPY_HEADER_SIZE - len(NPY_MAGIC) - 2).to_bytes(2, "little") + (header + " " * padding + "\n").encode("latin1")
+
+    def write(self, values):
+        data = array.array(self.typecode, values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        data.tofile(self.file)
+        self.length += len(data)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header())
+        self.file.close()
+
+
+class TextColumnWriter:
+    """Writes a text column as an int64 offsets .npy file plus one UTF-8 data file."""
+
+    def __init__(self, directory, name):
+        self.offsets = NpyColumnWriter(os.path.join(directory, f"{name}.offsets.npy"), "<i8", "q")
+        self.data = open(os.path.join(directory, f"{name}.utf8"), "wb")
+        self.position = 0
+        self.offsets.write([0])
+
+    def write(self, values):
+        offsets = []
+        chunks = []
+        for value in values:
+            encoded = (value or "").encode("utf-8")
+            chunks.append(encoded)
+            self.position += len(encoded)
+            offsets.append(self.position)
+        self.data.write(b"".join(chunks))
+        self.offsets.write(offsets)
+
+    def close(self):
+        self.offsets.close()
+        self.data.close()
+
+
+def _to_days(text):
+    # 'YYYY-MM-DD' -> days since 1970-01-01, NaT if missing or invalid
+    try:
+        return date.fromisoformat(text).toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return NAT
+
+
+def _convert(kind, values):
+    if kind == "int":
+        return [v or 0 for v in values]
+    if kind == "float":
+        return [float(v) if v is not None else float("nan") for v in values]
+    if kind == "date":
+        return [_to_days(v) for v in values]
+    return values
+
+
+def _export_query(with_names):
+    select = [f"Donation.{name}" for name, _ in DONATION_COLUMNS]
+    joins = ""
+    if with_names:
+        select += [expression for _, _, expression in NAME_COLUMNS]
+        joins = """
+        LEFT JOIN Donor ON Donation.Donor_ID = Donor.Donor_ID
+        LEFT JOIN Event ON Donation.Event_ID = Event.Event_ID
+        LEFT JOIN Business ON Donation.Business_ID = Business.Business_ID
+        LEFT JOIN Beneficiary ON Donation.Beneficiary_ID = Beneficiary.Beneficiary_ID"""
+    return f"SELECT {', '.join(select)} FROM Donation{joins} ORDER BY Donation.Donation_ID"
+
+
+def export_donations(directory, with_names=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Streams the Donation table into columnar files in a directory.
+    Parameters:
+        directory (str): Output directory (created if needed, existing files are overwritten)
+        with_names (bool): Also export donor/event/business/beneficiary names
+        batch_size (int): Rows fetched and written per batch
+    Returns:
+        int: Number of rows exported
+    Raises:
+        sqlite3.Error: If the query fails
+        OSError: If the files cannot be written
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = [(name, kind) for name, kind in DONATION_COLUMNS]
+    if with_names:
+        columns += [(name, kind) for name, kind, _ in NAME_COLUMNS]
+
+    writers = []
+    for name, kind in columns:
+        if kind == "text":
+            writers.append(TextColumnWriter(directory, name))
+        else:
+            descr, typecode = NPY_TYPES[kind]
+            writers.append(NpyColumnWriter(os.path.join(directory, f"{name}.npy"), descr, typecode))
+
+    conn = get_connection()
+    rows = 0
+    try:
+        cursor = conn.execute(_export_query(with_names))
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for (name, kind), writer, values in zip(columns, writers, zip(*batch)):
+                writer.write(_convert(kind, values))
+            rows += len(batch)
+    finally:
+        for writer in writers:
+            writer.close()
+        conn.release()  # Hand the connection back to the pool
+
+    manifest = {
+        "table": "Donation",
+        "rows": rows,
+        "columns": [
+            {"name": name, "kind": kind,
+             "files": [f"{name}.offsets.npy", f"{name}.utf8"] if kind == "text" else [f"{name}.npy"],
+             "dtype": "utf8" if kind == "text" else NPY_TYPES[kind][0]}
+            for name, kind in columns
+        ],
+        "nulls": "IDs: 0, dates: NaT, amounts: NaN, text: empty string",
+    }
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the Donation table to columnar .npy files")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("--with-names", action="store_true", help="include donor, event, business and beneficiary names")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per batch (default {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+
+    rows = export_donations(args.directory, args.with_names, args.batch_size)
+    print(f"Exported {rows} donations to {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
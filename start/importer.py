@@ -0,0 +1,193 @@
+# importer.py
+"""
+This module loads large files of records into the database in one go.
+
+It streams CSV or JSON Lines files (one JSON object per line) for the Donor,
+Business, Beneficiary, Event, Volunteer and Donation tables. Column names in
+the file must match the table columns (e.g. Amount, Date, Donor_ID ...).
+
+Every row is checked with the same rules as the menus (start/validation.py).
+Valid rows are inserted with executemany() in chunks, one transaction per
+chunk, so only one chunk of rows is held in memory at a time. Rows that fail
+validation or a database constraint are written to a rejected-rows report
+instead of stopping the import.
+
+Usage:
+    python -m start.importer Donation gifts.csv
+    python -m start.importer Donor donors.jsonl --chunk-size 20000 --rejects bad_donors.csv
+"""
+
+import argparse
+import csv
+import json
+import sqlite3 as db
+import sys
+
+from start import cache
+from start.migrations import migrate
+from start.tables import get_connection, set_profile, PROFILES, ACTIVE_PROFILE
+from start.validation import VALIDATORS
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def read_records(path):
+    """
+    Yields (line number, record dict) for every row of a CSV or JSON Lines file.
+    The format is chosen from the file extension (.jsonl / .ndjson / .json are JSON Lines, anything else is CSV).
+    """
+    json_lines = path.lower().endswith((".jsonl", ".ndjson", ".json"))
+    with open(path, newline="", encoding="utf-8" if json_lines else "utf-8-sig") as f:
+        yield from parse_records(f, "jsonl" if json_lines else "csv")
+
+
+def parse_records(stream, fmt):
+    """
+    Yields (line number, record dict) for every row read from an open text stream (e.g. sys.stdin).
+    Parameters:
+        stream: File-like object with the rows
+        fmt (str): "jsonl" (one JSON object per line) or "csv" (with a header line)
+    """
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, {"_error": f"Invalid JSON: {e}", "_raw": line.rstrip("\n")}
+                continue
+            yield line_no, record if isinstance(record, dict) else {"_error": "Line is not a JSON object", "_raw": line.rstrip("\n")}
+    else:
+        # Line 1 is the header, so the first record is on line 2
+        for line_no, record in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, record
+
+
+def _insert_chunk(conn, query, chunk, rejected):
+    """
+    Inserts one chunk of (line number, values, record) in a single transaction.
+    If the fast executemany() hits a constraint error, the chunk is retried row by row
+    (each row in its own savepoint) so only the bad rows are rejected.
+    Returns the number of rows inserted.
+    """
+    # IMMEDIATE takes the write lock up front, waiting (busy_timeout) while another connection
+    # writes; a plain BEGIN would fail with "database is locked" at the first insert instead
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(query, (values for _, values, _ in chunk))
+        conn.commit()
+        return len(chunk)
+    except db.IntegrityError:
+        conn.rollback()
+
+    inserted = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for line_no, values, record in chunk:
+            conn.execute("SAVEPOINT import_row")
+            try:
+                conn.execute(query, values)
+                conn.execute("RELEASE import_row")
+                inserted += 1
+            except db.IntegrityError as e:
+                conn.execute("ROLLBACK TO import_row")
+                conn.execute("RELEASE import_row")
+                rejected.append((line_no, f"Database rejected row: {e}", record))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return inserted
+
+
+def import_records(table, records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validates and inserts records into a table.
+    Parameters:
+        table (str): One of Donor, Business, Beneficiary, Event, Volunteer, Donation
+        records (iterable): (line number, record dict) pairs, e.g. from read_records()
+        chunk_size (int): Number of rows per transaction
+    Returns:
+        tuple: (number of rows inserted, list of (line number, reason, record) for rejected rows)
+    Raises:
+        ValueError: If the table name is not supported
+        sqlite3.Error: For database errors other than constraint violations
+    """
+    if table not in VALIDATORS:
+        raise ValueError(f"Cannot import into '{table}'. Choose from: {', '.join(VALIDATORS)}")
+    columns, validate = VALIDATORS[table]
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    conn = get_connection()
+    inserted = 0
+    rejected = []
+    chunk = []
+    try:
+        for line_no, record in records:
+            if "_error" in record:
+                rejected.append((line_no, record["_error"], record))
+                continue
+            try:
+                chunk.append((line_no, validate(record), record))
+            except ValueError as e:
+                rejected.append((line_no, str(e), record))
+                continue
+            if len(chunk) >= chunk_size:
+                inserted += _insert_chunk(conn, query, chunk, rejected)
+                chunk = []
+        if chunk:
+            inserted += _insert_chunk(conn, query, chunk, rejected)
+    finally:
+        conn.release()  # Hand the connection back to the pool
+        if inserted:
+            cache.invalidate(table)
+    return inserted, rejected
+
+
+def import_file(table, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Imports a CSV or JSON Lines file into a table. Returns the same result as import_records()."""
+    return import_records(table, read_records(path), chunk_size)
+
+
+def write_rejects(path, rejected):
+    """Writes the rejected-rows report as CSV: line number, reason and the original record"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        write_rejects_csv(f, rejected)
+
+
+def write_rejects_csv(stream, rejected):
+    """Writes the rejected-rows report to an open text stream (e.g. sys.stderr)"""
+    writer = csv.writer(stream)
+    writer.writerow(["Line", "Reason", "Record"])
+    for line_no, reason, record in rejected:
+        writer.writerow([line_no, reason, json.dumps(record, default=str)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import records from a CSV or JSON Lines file")
+    parser.add_argument("table", choices=list(VALIDATORS), help="table to import into")
+    parser.add_argument("path", help="CSV or JSON Lines (.jsonl) file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per transaction (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--rejects", help="where to write the rejected-rows report (default: <file>.rejects.csv)")
+    parser.add_argument("--profile", choices=list(PROFILES), default=ACTIVE_PROFILE,
+                        help=f"database performance profile used for the import (default {ACTIVE_PROFILE}); "
+                             "bulk-load is faster but a power loss can corrupt the database, so only use it "
+                             "on a new database or one with a backup")
+    args = parser.parse_args(argv)
+
+    set_profile(args.profile)
+    migrate()  # Creates the tables of a new database, and the triggers an older one is missing
+    inserted, rejected = import_file(args.table, args.path, args.chunk_size)
+    print(f"Imported {inserted} {args.table} rows, rejected {len(rejected)}.")
+    if rejected:
+        rejects_path = args.rejects or args.path + ".rejects.csv"
+        write_rejects(rejects_path, rejected)
+        print(f"Rejected rows written to {rejects_path}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
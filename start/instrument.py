@@ -0,0 +1,318 @@
+# instrument.py
+"""
+This module measures every SQL statement the app runs.
+
+When it is switched on, pooled connections (start/tables.py) are created as
+InstrumentedConnection. Every statement, whether run with conn.execute(),
+conn.executemany() or a cursor, is then recorded with:
+- its latency (from execute() until its rows have been read), as a histogram
+- the number of rows it returned or changed
+- the places in the app that ran it (file, line and function)
+- its EXPLAIN QUERY PLAN, captured once per statement, so table scans show up
+
+Statements slower than a threshold are written to a slow-query log together
+with their plan, and a summary table is printed when the program exits.
+
+Switch it on with environment variables (nothing is measured otherwise):
+    DONATION_DB_TRACE=1                 record statements and print a summary at exit
+    DONATION_DB_SLOW_MS=50              slow-query threshold in milliseconds (default 100)
+    DONATION_DB_SLOW_LOG=slow.log       slow-query log file (default slow_queries.log)
+    DONATION_DB_TRACE_SUMMARY=stats.txt write the summary to a file instead of stderr
+or from code with enable() before the first connection is opened.
+"""
+
+import atexit
+import bisect
+import os
+import re
+import sqlite3 as db
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from datetime import datetime
+
+ENABLED = os.environ.get("DONATION_DB_TRACE", "") not in ("", "0")
+SLOW_MS = float(os.environ.get("DONATION_DB_SLOW_MS", "100"))
+SLOW_LOG = os.environ.get("DONATION_DB_SLOW_LOG", "slow_queries.log")
+SUMMARY_FILE = os.environ.get("DONATION_DB_TRACE_SUMMARY")
+
+# Upper limits (ms) of the latency histogram buckets; the last bucket holds everything slower
+BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+BUCKET_LABELS = [f"<{b}ms" for b in BUCKETS] + [f">={BUCKETS[-1]}ms"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Frames from these files are part of the database layer, the call site is the first frame outside them
+_LAYER_FILES = ("instrument.py", "tables.py", "crud.py", "donation_query.py")
+
+# Only these statements have a query plan (not PRAGMA, BEGIN, CREATE...)
+_PLANNED = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+_stats = {}    # statement -> StatementStats
+_plans = {}    # statement -> list of EXPLAIN QUERY PLAN lines
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+class StatementStats:
+    """Counters for one distinct SQL statement"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.sites = Counter()
+
+    def add(self, ms, rows, site):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+        self.histogram[bisect.bisect_left(BUCKETS, ms)] += 1
+        self.sites[site] += 1
+
+
+def enable(slow_ms=None, slow_log=None, summary_file=None):
+    """
+    Switches instrumentation on for connections opened from now on
+    (call start.tables.close_all_connections() first to re-open existing ones).
+    """
+    global ENABLED, SLOW_MS, SLOW_LOG, SUMMARY_FILE, _atexit_registered
+    ENABLED = True
+    SLOW_MS = SLOW_MS if slow_ms is None else slow_ms
+    SLOW_LOG = slow_log or SLOW_LOG
+    SUMMARY_FILE = summary_file or SUMMARY_FILE
+    if not _atexit_registered:
+        atexit.register(dump_summary)
+        _atexit_registered = True
+
+
+def reset():
+    """Forgets everything recorded so far"""
+    with _lock:
+        _stats.clear()
+        _plans.clear()
+
+
+@lru_cache(maxsize=1024)
+def normalise(sql):
+    # One line, single spaces: the same statement formatted differently is counted once
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.endswith(_LAYER_FILES) and "sqlite3" not in filename:
+            if filename.startswith(ROOT):
+                filename = os.path.relpath(filename, ROOT)
+            return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _query_plan(conn, sql, params):
+    # The base class execute() is used so the plan itself is not recorded
+    words = sql.split(None, 1)
+    if not words or words[0].upper() not in _PLANNED:
+        return []
+    try:
+        return [row[-1] for row in db.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params)]
+    except db.Error:
+        return []
+
+
+def _record(conn, sql, params, ms, rows, site):
+    key = normalise(sql)
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = StatementStats()
+        stats.add(ms, rows, site)
+        plan = _plans.get(key)
+    if plan is None:
+        plan = _query_plan(conn, sql, params if params is not None else ())
+        with _lock:
+            _plans[key] = plan
+    if ms >= SLOW_MS:
+        _log_slow(key, params, ms, rows, site, plan)
+
+
+def _log_slow(sql, params, ms, rows, site, plan):
+    lines = [f"{datetime.now().isoformat(timespec='milliseconds')} {ms:.1f} ms, {rows} rows, {site}",
+             f"    {sql}"]
+    if params:
+        lines.append(f"    params: {params!r}"[:500])
+    lines += [f"    plan: {step}" for step in plan]
+    with _lock:
+        with open(SLOW_LOG, "a", encoding="utf-8") as log:
+            log.write("\n".join(lines) + "\n")
+
+
+class InstrumentedCursor(db.Cursor):
+    """
+    Cursor that times its statements. The time of a SELECT includes reading its rows,
+    so it is recorded once the rows are read (or the cursor is closed or re-used).
+    """
+
+    _pending = None  # (sql, params, ms so far, rows so far, call site) of the statement being read
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        site = _call_site()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = (sql, parameters, (time.perf_counter() - start) * 1000, 0, site)
+        if self.description is None:  # No rows to read (INSERT, UPDATE, DELETE, PRAGMA...)
+            self._finish(max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        site = _call_site()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        if ENABLED:
+            _record(self.connection, sql, None, (time.perf_counter() - start) * 1000, max(self.rowcount, 0), site)
+        return self
+
+    def _read(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._pending is not None:
+            sql, params, ms, rows, site = self._pending
+            self._pending = (sql, params, ms + (time.perf_counter() - start) * 1000, rows, site)
+        return result
+
+    def _count(self, rows, done):
+        if self._pending is not None:
+            sql, params, ms, counted, site = self._pending
+            self._pending = (sql, params, ms, counted + rows, site)
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        row = self._read(super().fetchone)
+        self._count(row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._read(super().fetchmany, self.arraysize if size is None else size)
+        self._count(len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._read(super().fetchall)
+        self._count(len(rows), True)
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass  # Never raise from garbage collection (e.g. at interpreter shutdown)
+
+    def _finish(self, rows=None):
+        if self._pending is None:
+            return
+        sql, params, ms, counted, site = self._pending
+        self._pending = None
+        if ENABLED:
+            _record(self.connection, sql, params, ms, counted if rows is None else rows, site)
+
+
+class InstrumentedConnectionMixin:
+    """
+    Mixed into the pooled connection class. conn.execute() and conn.executemany() do not
+    call cursor(), so they are sent through an InstrumentedCursor here.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def statistics():
+    """
+    Returns what was recorded so far, slowest total first: a list of dicts with the statement,
+    calls, total/mean/max ms, rows, latency histogram, top call sites and query plan.
+    """
+    with _lock:
+        items = list(_stats.items())
+        plans = dict(_plans)
+    result = []
+    for sql, s in sorted(items, key=lambda item: item[1].total_ms, reverse=True):
+        result.append({
+            "sql": sql,
+            "calls": s.calls,
+            "total_ms": round(s.total_ms, 3),
+            "mean_ms": round(s.total_ms / s.calls, 3),
+            "max_ms": round(s.max_ms, 3),
+            "rows": s.rows,
+            "histogram": dict(zip(BUCKET_LABELS, s.histogram)),
+            "sites": s.sites.most_common(3),
+            "plan": plans.get(sql, []),
+        })
+    return result
+
+
+def _scans(plan):
+    # Tables read from start to end (SCAN without an index), e.g. "Donation"
+    return [step.split()[1] for step in plan
+            if step.startswith("SCAN ") and " USING " not in step and "json_each" not in step
+            and not step.startswith("SCAN CONSTANT")]
+
+
+def format_summary(limit=30):
+    """Returns the summary table of the slowest statements as text"""
+    stats = statistics()
+    if not stats:
+        return "No SQL statements recorded."
+    lines = [f"{'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>9}  {'scans':<12} statement / top call site",
+             "-" * 100]
+    for s in stats[:limit]:
+        scans = ",".join(_scans(s["plan"])) or "-"
+        lines.append(f"{s['calls']:>7} {s['total_ms']:>10.2f} {s['mean_ms']:>9.3f} {s['max_ms']:>9.2f} {s['rows']:>9}"
+                     f"  {scans:<12} {s['sql'][:120]}")
+        if s["sites"]:
+            lines.append(f"{'':>61}at {s['sites'][0][0]}")
+        lines.append(f"{'':>61}" + "  ".join(f"{label} {n}" for label, n in s["histogram"].items() if n))
+    if len(stats) > limit:
+        lines.append(f"... {len(stats) - limit} more statements")
+    return "\n".join(lines)
+
+
+def dump_summary():
+    """Writes the summary to DONATION_DB_TRACE_SUMMARY, or to stderr"""
+    if not _stats:
+        return
+    text = "SQL statement summary (slowest total first)\n" + format_summary() + "\n"
+    if SUMMARY_FILE:
+        with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stderr.write(text)
+
+
+if ENABLED:
+    enable()
@@ -0,0 +1,254 @@
+# migrations.py
+"""
+This module keeps the database schema up to date without losing data.
+
+Every change to the schema is a numbered migration in the MIGRATIONS list.
+The Schema_Version table records which migrations have been applied, so on
+start-up migrate() reads one number and only runs the migrations that are
+still pending. On an up-to-date database this is a single indexed lookup,
+no matter how big the database file is.
+
+To change the schema, append a new migration at the end of MIGRATIONS.
+Never edit a migration that has already been released.
+"""
+
+import sqlite3 as db
+from datetime import datetime
+
+from start.tables import get_connection, run_script, TABLES_SQL, INDEXES_SQL, SOURCE_INDEXES_SQL
+from start.textsearch import INDEXED_TABLES, SEARCH_INDEX_SQL, ROWID_FACTOR, fts5_available, trigger_sql, populate_sql, \
+    drop_triggers_sql
+from start.summaries import SUMMARY_SOURCES, summary_sql, rebuild_sql, MILESTONE_SQL, BACKFILL_MILESTONES_SQL, \
+    DROP_MILESTONE_TRIGGERS_SQL
+
+# Table that remembers which migrations were applied and when
+VERSION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS Schema_Version (
+    Version INTEGER PRIMARY KEY,
+    Description TEXT NOT NULL,
+    Applied_At TEXT NOT NULL
+)
+"""
+
+
+def _initial_schema(conn):
+    run_script(conn, TABLES_SQL)
+
+
+def _indexes(conn):
+    run_script(conn, INDEXES_SQL)
+
+
+def _donation_summaries(conn):
+    # Summary tables and triggers, filled from the donations that already exist
+    for entity in SUMMARY_SOURCES:
+        run_script(conn, summary_sql(entity))
+        run_script(conn, rebuild_sql(entity))
+
+
+def _event_milestones(conn):
+    run_script(conn, MILESTONE_SQL)
+    run_script(conn, BACKFILL_MILESTONES_SQL)
+
+
+def _milestone_triggers(conn):
+    # Version 4 triggers used INSERT OR IGNORE, which fails when fired from the Event_Summary UPSERT
+    run_script(conn, DROP_MILESTONE_TRIGGERS_SQL)
+    run_script(conn, MILESTONE_SQL)
+
+
+def _search_index(conn):
+    # Without FTS5 in the SQLite library the app still works, only text search is unavailable
+    if not fts5_available(conn):
+        return
+    run_script(conn, SEARCH_INDEX_SQL)
+    for table in INDEXED_TABLES:
+        run_script(conn, trigger_sql(table))
+        run_script(conn, populate_sql(table))
+
+
+# A donation comes from exactly one source: a Donor, an Event or a Business
+ONE_SOURCE_SQL = "(Donor_ID IS NOT NULL) + (Event_ID IS NOT NULL) + (Business_ID IS NOT NULL) = 1"
+
+DONATION_COLUMNS = "Donation_ID, Amount, Date, Notes, Donor_ID, Event_ID, Business_ID, Beneficiary_ID"
+
+# Donation table of schema version 7: the same columns, plus the one-source rule
+DONATION_V7_SQL = f"""
+CREATE TABLE Donation_New (
+    Donation_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Amount REAL NOT NULL,
+    Date TEXT NOT NULL,
+    Notes TEXT,
+    Donor_ID INTEGER,
+    Event_ID INTEGER,
+    Business_ID INTEGER,
+    Beneficiary_ID INTEGER NOT NULL,
+    FOREIGN KEY(Donor_ID) REFERENCES Donor(Donor_ID),
+    FOREIGN KEY(Event_ID) REFERENCES Event(Event_ID),
+    FOREIGN KEY(Business_ID) REFERENCES Business(Business_ID),
+    FOREIGN KEY(Beneficiary_ID) REFERENCES Beneficiary(Beneficiary_ID),
+    CONSTRAINT one_source CHECK ({ONE_SOURCE_SQL})
+)
+"""
+
+# Donations that broke a rule when it was added to the schema, kept for someone to fix by hand
+QUARANTINE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS Donation_Quarantine (
+    Donation_ID INTEGER PRIMARY KEY,
+    Amount REAL,
+    Date TEXT,
+    Notes TEXT,
+    Donor_ID INTEGER,
+    Event_ID INTEGER,
+    Business_ID INTEGER,
+    Beneficiary_ID INTEGER,
+    Reason TEXT NOT NULL,
+    Quarantined_At TEXT NOT NULL
+)
+"""
+
+# Indexes replaced by the partial ones in SOURCE_INDEXES_SQL
+SOURCE_INDEXES = ("idx_donation_donor", "idx_donation_event", "idx_donation_business")
+
+
+def _donation_source_check(conn):
+    # SQLite cannot add a CHECK constraint to an existing table, so Donation is copied into a new
+    # table that has it and the new table takes its name. Its triggers and indexes are saved from
+    # sqlite_master and created again (the source indexes as partial indexes).
+    # Donations without exactly one source are moved to Donation_Quarantine instead of being lost.
+    saved = conn.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('trigger', 'index') AND tbl_name = 'Donation' AND sql IS NOT NULL
+    """).fetchall()
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Donation'").fetchone()
+
+    run_script(conn, QUARANTINE_TABLE_SQL)
+    quarantined = conn.execute(f"""
+        INSERT INTO Donation_Quarantine ({DONATION_COLUMNS}, Reason, Quarantined_At)
+        SELECT {DONATION_COLUMNS}, 'Needs exactly one of Donor_ID, Event_ID, Business_ID', ?
+        FROM Donation WHERE NOT ({ONE_SOURCE_SQL})
+    """, (datetime.now().isoformat(timespec="seconds"),)).rowcount
+
+    conn.execute(DONATION_V7_SQL)
+    conn.execute(f"INSERT INTO Donation_New ({DONATION_COLUMNS}) SELECT {DONATION_COLUMNS} FROM Donation "
+                 f"WHERE {ONE_SOURCE_SQL}")
+    conn.execute("DROP TABLE Donation")
+    conn.execute("ALTER TABLE Donation_New RENAME TO Donation")
+    if sequence:
+        # Keep counting from the old table, so IDs of deleted (or quarantined) donations are never reused
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'Donation'")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('Donation', ?)", sequence)
+
+    for kind, name, sql in saved:
+        if kind == "trigger" or name not in SOURCE_INDEXES:
+            conn.execute(sql)
+    run_script(conn, SOURCE_INDEXES_SQL)
+    # Row counts per index, so the query planner knows a source index is smaller than the Date index
+    conn.execute("ANALYZE Donation")
+
+    if quarantined:
+        # The quarantined donations no longer count in the totals or show up in text search
+        for entity in SUMMARY_SOURCES:
+            run_script(conn, rebuild_sql(entity))
+        if _table_exists(conn, "Search_Index"):
+            code = INDEXED_TABLES["Donation"][0]
+            conn.execute(f"DELETE FROM Search_Index WHERE rowid IN "
+                         f"(SELECT Donation_ID * {ROWID_FACTOR} + {code} FROM Donation_Quarantine)")
+
+
+def _search_index_columns(conn):
+    # Up to version 7 the e-mail addresses of donors and businesses and the type of beneficiaries
+    # were indexed in the Notes column. An FTS5 table cannot change its columns, so the index and its
+    # triggers are made again (this also creates the index if FTS5 was missing when version 5 ran).
+    if not fts5_available(conn):
+        return
+    for table in INDEXED_TABLES:
+        run_script(conn, drop_triggers_sql(table))
+    conn.execute("DROP TABLE IF EXISTS Search_Index")
+    _search_index(conn)
+
+
+# (version, description, function that applies it) - in order, append only
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "foreign key and date indexes", _indexes),
+    (3, "donation summary tables and triggers", _donation_summaries),
+    (4, "event fundraising milestones", _event_milestones),
+    (5, "full-text search index", _search_index),
+    (6, "fix event milestone triggers", _milestone_triggers),
+    (7, "one source per donation, partial source indexes", _donation_source_check),
+    (8, "separate e-mail and type columns in the search index", _search_index_columns),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def current_version(conn=None):
+    """
+    Returns the schema version of the database (0 for an empty database).
+    Version is the INTEGER PRIMARY KEY, so MAX() is answered from the end of the b-tree.
+    """
+    conn = conn or get_connection()
+    try:
+        return conn.execute("SELECT MAX(Version) FROM Schema_Version").fetchone()[0] or 0
+    except db.OperationalError:
+        return 0  # No Schema_Version table yet
+
+
+def _record_version(conn, version, description):
+    conn.execute(
+        "INSERT OR IGNORE INTO Schema_Version (Version, Description, Applied_At) VALUES (?, ?, ?)",
+        (version, description, datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def migrate(conn=None):
+    """
+    Applies all pending migrations, each one in its own transaction.
+    Returns the list of versions that were applied (empty when already up to date).
+    Raises:
+        sqlite3.Error: If a migration fails (that migration is rolled back)
+    """
+    conn = conn or get_connection()
+    if current_version(conn) >= LATEST_VERSION:
+        return []  # Fast path: nothing to do
+
+    if not _table_exists(conn, "Schema_Version"):
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(VERSION_TABLE_SQL)
+        if _table_exists(conn, "Donation"):
+            # Database made by an older app version: record the schema it already has
+            _record_version(conn, 1, "initial schema (existing database)")
+        conn.commit()
+
+    applied = []
+    # Foreign keys are switched off while the schema changes (this cannot be done inside a transaction),
+    # and PRAGMA foreign_key_check makes sure the data is still consistent before each commit.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, description, apply in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")  # Take the write lock so two launches cannot migrate at once
+            try:
+                start_version = current_version(conn)
+                if version <= start_version:
+                    conn.rollback()
+                    continue
+                apply(conn)
+                problems = conn.execute("PRAGMA foreign_key_check").fetchall()
+                if problems:
+                    raise db.IntegrityError(f"migration {version} broke foreign keys: {problems[:5]}")
+                _record_version(conn, version, description)
+                conn.commit()
+                applied.append(version)
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return applied
@@ -0,0 +1,236 @@
+# summaries.py
+"""
+This module keeps running donation totals for every Donor, Event, Business and Beneficiary.
+
+Each of them has a summary table (e.g. Donor_Summary) with one row per record that has
+donations: number of donations, total, smallest and largest gift and the date of the last gift.
+Triggers on the Donation table update these rows on every INSERT, UPDATE and DELETE,
+so reading a total is a single primary-key lookup instead of a scan of Donation.
+
+Only deleting (or changing) the current smallest/largest/latest gift needs to look at
+other donations, and then only at the donations of that one record (through its index).
+"""
+
+from start.tables import get_connection, run_script
+
+# Entity table -> foreign key column in Donation
+SUMMARY_SOURCES = {
+    "Donor": "Donor_ID",
+    "Event": "Event_ID",
+    "Business": "Business_ID",
+    "Beneficiary": "Beneficiary_ID",
+}
+
+SUMMARY_COLUMNS = "Donation_Count, Total_Amount, Min_Amount, Max_Amount, Last_Date"
+
+
+def summary_table(entity):
+    return f"{entity}_Summary"
+
+
+def summary_sql(entity):
+    """Returns the SQL that creates the summary table and its three triggers for one entity"""
+    table = summary_table(entity)
+    key = SUMMARY_SOURCES[entity]
+    name = entity.lower()
+
+    # Adds NEW to the summary (used by the insert and update triggers)
+    add_new = f"""
+        INSERT INTO {table} ({key}, {SUMMARY_COLUMNS})
+        SELECT NEW.{key}, 1, NEW.Amount, NEW.Amount, NEW.Amount, NEW.Date
+        WHERE NEW.{key} IS NOT NULL
+        ON CONFLICT({key}) DO UPDATE SET
+            Donation_Count = Donation_Count + 1,
+            Total_Amount = Total_Amount + excluded.Total_Amount,
+            Min_Amount = MIN(Min_Amount, excluded.Min_Amount),
+            Max_Amount = MAX(Max_Amount, excluded.Max_Amount),
+            Last_Date = MAX(Last_Date, excluded.Last_Date);"""
+
+    # Removes OLD from the summary (used by the delete and update triggers)
+    remove_old = f"""
+        UPDATE {table} SET
+            Donation_Count = Donation_Count - 1,
+            Total_Amount = Total_Amount - OLD.Amount,
+            Min_Amount = CASE WHEN OLD.Amount <= Min_Amount
+                THEN (SELECT MIN(Amount) FROM Donation WHERE {key} = OLD.{key}) ELSE Min_Amount END,
+            Max_Amount = CASE WHEN OLD.Amount >= Max_Amount
+                THEN (SELECT MAX(Amount) FROM Donation WHERE {key} = OLD.{key}) ELSE Max_Amount END,
+            Last_Date = CASE WHEN OLD.Date >= Last_Date
+                THEN (SELECT MAX(Date) FROM Donation WHERE {key} = OLD.{key}) ELSE Last_Date END
+        WHERE {key} = OLD.{key};
+        DELETE FROM {table} WHERE {key} = OLD.{key} AND Donation_Count <= 0;"""
+
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        {key} INTEGER PRIMARY KEY,
+        Donation_Count INTEGER NOT NULL,
+        Total_Amount REAL NOT NULL,
+        Min_Amount REAL,
+        Max_Amount REAL,
+        Last_Date TEXT
+    );
+
+    CREATE TRIGGER IF NOT EXISTS donation_{name}_summary_insert AFTER INSERT ON Donation
+    WHEN NEW.{key} IS NOT NULL
+    BEGIN{add_new}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS donation_{name}_summary_delete AFTER DELETE ON Donation
+    WHEN OLD.{key} IS NOT NULL
+    BEGIN{remove_old}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS donation_{name}_summary_update AFTER UPDATE OF Amount, Date, {key} ON Donation
+    BEGIN{remove_old}{add_new}
+    END;
+"""
+
+
+# Percentages of an event's fundraising goal that trigger a notification
+MILESTONES = (50, 75, 100)
+
+_milestone_values = " UNION ALL ".join(f"SELECT {m} AS Threshold" for m in MILESTONES)
+
+def _record_milestones(event_id, total):
+    # Statement that records every milestone reached by an event (already recorded ones are skipped).
+    # NOT EXISTS instead of INSERT OR IGNORE: inside a trigger the conflict policy of the outer
+    # statement wins, and the Event_Summary UPSERT that fires this trigger would turn IGNORE into ABORT.
+    return f"""
+        INSERT INTO Event_Milestone (Event_ID, Threshold, Reached_At)
+        SELECT Event.Event_ID, m.Threshold, datetime('now')
+        FROM ({_milestone_values}) AS m, Event
+        WHERE Event.Event_ID = {event_id}
+          AND Event.Fundraising_Goal > 0
+          AND {total} * 100 >= Event.Fundraising_Goal * m.Threshold
+          AND NOT EXISTS (SELECT 1 FROM Event_Milestone AS done
+                          WHERE done.Event_ID = Event.Event_ID AND done.Threshold = m.Threshold);"""
+
+# Milestones are recorded by triggers whenever an event's running total (Event_Summary)
+# or its goal changes, so checking for new notifications never has to add up donations.
+# A milestone stays recorded even if donations are removed later.
+MILESTONE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS Event_Milestone (
+        Event_ID INTEGER NOT NULL,
+        Threshold INTEGER NOT NULL,
+        Reached_At TEXT NOT NULL,
+        Acknowledged INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (Event_ID, Threshold),
+        FOREIGN KEY(Event_ID) REFERENCES Event(Event_ID) ON DELETE CASCADE
+    );
+
+    -- Small index that only holds the notifications nobody has seen yet
+    CREATE INDEX IF NOT EXISTS idx_event_milestone_new ON Event_Milestone(Event_ID) WHERE Acknowledged = 0;
+
+    CREATE TRIGGER IF NOT EXISTS event_summary_milestone_insert AFTER INSERT ON Event_Summary
+    BEGIN{_record_milestones("NEW.Event_ID", "NEW.Total_Amount")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS event_summary_milestone_update AFTER UPDATE OF Total_Amount ON Event_Summary
+    WHEN NEW.Total_Amount > OLD.Total_Amount
+    BEGIN{_record_milestones("NEW.Event_ID", "NEW.Total_Amount")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS event_goal_milestone_update AFTER UPDATE OF Fundraising_Goal ON Event
+    BEGIN{_record_milestones("NEW.Event_ID", "(SELECT Total_Amount FROM Event_Summary WHERE Event_ID = NEW.Event_ID)")}
+    END;
+"""
+
+# Drops the milestone triggers so MILESTONE_SQL can create them again (used when they change)
+DROP_MILESTONE_TRIGGERS_SQL = """
+    DROP TRIGGER IF EXISTS event_summary_milestone_insert;
+    DROP TRIGGER IF EXISTS event_summary_milestone_update;
+    DROP TRIGGER IF EXISTS event_goal_milestone_update;
+"""
+
+# Records the milestones already reached by existing events (used when the feature is installed)
+BACKFILL_MILESTONES_SQL = f"""
+    INSERT OR IGNORE INTO Event_Milestone (Event_ID, Threshold, Reached_At)
+    SELECT Event.Event_ID, m.Threshold, datetime('now')
+    FROM ({_milestone_values}) AS m, Event
+    JOIN Event_Summary ON Event_Summary.Event_ID = Event.Event_ID
+    WHERE Event.Fundraising_Goal > 0
+      AND Event_Summary.Total_Amount * 100 >= Event.Fundraising_Goal * m.Threshold;
+"""
+
+
+def pending_milestones(conn=None):
+    """
+    Returns the milestones nobody has been told about yet and marks them as seen.
+    Each item is (Event_ID, Event name, Threshold, Reached_At).
+    Only the returned milestones are marked, so one reached while this runs is reported next time.
+    With a connection passed in, the marks are left in the caller's transaction for the caller to commit.
+    """
+    own_connection = conn is None
+    conn = conn or get_connection()
+    try:
+        if own_connection:
+            conn.execute("BEGIN IMMEDIATE")  # Two screens must not both report the same milestone
+        rows = conn.execute("""
+            SELECT Event_Milestone.Event_ID, Event.Name, Event_Milestone.Threshold, Event_Milestone.Reached_At
+            FROM Event_Milestone JOIN Event ON Event.Event_ID = Event_Milestone.Event_ID
+            WHERE Event_Milestone.Acknowledged = 0
+            ORDER BY Event_Milestone.Reached_At, Event_Milestone.Event_ID, Event_Milestone.Threshold
+        """).fetchall()
+        conn.executemany("UPDATE Event_Milestone SET Acknowledged = 1 WHERE Event_ID = ? AND Threshold = ?",
+                         [(event_id, threshold) for event_id, _, threshold, _ in rows])
+        if own_connection:
+            conn.commit()
+    except Exception:
+        if own_connection:
+            conn.rollback()
+        raise
+    finally:
+        if own_connection:
+            conn.release()
+    return rows
+
+
+def rebuild_sql(entity):
+    """Returns the SQL that recomputes one summary table from the Donation table"""
+    table = summary_table(entity)
+    key = SUMMARY_SOURCES[entity]
+    return f"""
+    DELETE FROM {table};
+    INSERT INTO {table} ({key}, {SUMMARY_COLUMNS})
+    SELECT {key}, COUNT(*), SUM(Amount), MIN(Amount), MAX(Amount), MAX(Date)
+    FROM Donation WHERE {key} IS NOT NULL GROUP BY {key};
+"""
+
+
+def rebuild_summaries():
+    """
+    Recomputes every summary table from scratch in one transaction.
+    Only needed if the summaries were changed by hand or after a bulk repair;
+    the triggers keep them correct during normal use.
+    Raises:
+        sqlite3.Error: If the rebuild fails (nothing is changed)
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for entity in SUMMARY_SOURCES:
+            run_script(conn, rebuild_sql(entity))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.release()
+
+
+def get_summary(entity, entity_id):
+    """
+    Returns (Donation_Count, Total_Amount, Min_Amount, Max_Amount, Last_Date) for one record.
+    Records without donations get (0, 0.0, None, None, None).
+    """
+    if entity not in SUMMARY_SOURCES:
+        raise ValueError(f"No summary for '{entity}'")
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            f"SELECT {SUMMARY_COLUMNS} FROM {summary_table(entity)} WHERE {SUMMARY_SOURCES[entity]} = ?",
+            (entity_id,),
+        ).fetchone()
+    finally:
+        conn.release()
+    return row or (0, 0.0, None, None, None)
@@ -1,37 +1,279 @@
 # tables.py
 # Import the sqlite3 module and give it a short name 'db', this like an alias
 # It is used to communicate with the database
+import os
 import sqlite3 as db
+import threading
+import time
 
-# A small function to open a connection to the database file. This file holds all our data
+from start import instrument
+
+# The database file that holds all our data
+DB_FILE = "donation_app.db"
+
+# Maximum number of open connections kept by the pool (one per thread)
+POOL_SIZE = 8
+
+# How long a thread waits for a free pool slot before giving up (seconds)
+POOL_TIMEOUT = 30.0
+
+# Seconds between two SELECT 1 health checks of the same pooled connection
+HEALTH_CHECK_INTERVAL = 30.0
+
+# Performance profiles: PRAGMA settings applied to every connection.
+# All profiles use WAL so readers never block the writer (and the other way round).
+# - durable:   fsync on every commit, safest against power loss
+# - balanced:  fsync only at WAL checkpoints, safe against application crashes (default)
+# - bulk-load: no fsync and big caches. An OS crash or power loss while it is in use can corrupt the
+#              whole database file (not just the rows being written), so only use it to fill a new
+#              database file, or one with a backup. Opt-in only, never a default.
+PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,       # negative means KiB, so about 16 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,       # milliseconds to wait for a lock before SQLITE_BUSY
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,     # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,    # 1 GB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+# The active profile can be chosen with the DONATION_DB_PROFILE environment variable
+# or at runtime with set_profile()
+ACTIVE_PROFILE = os.environ.get("DONATION_DB_PROFILE", "balanced")
+
+_pool = {}                          # thread ident -> PooledConnection
+_pool_lock = threading.Condition()  # guards _pool and wakes up waiting threads
+
+
+class PooledConnection(db.Connection):
+    """
+    A sqlite3 connection that belongs to the connection pool.
+    Code that is done with it calls release(), which hands it back to the pool: it stays
+    open for the next call on the same thread. close() really closes it (the pool then
+    opens a new one for the thread); the pool closes them all in close_all_connections().
+    """
+
+    profile = None     # Name of the performance profile applied to this connection
+    checked_at = 0.0   # time.monotonic() of the last health check
+    owner = None       # The start.crud.Transaction running on the connection, if any
+
+    def release(self):
+        """
+        Hands the connection back to the pool. While a start.crud.Transaction owns the
+        connection this does nothing: helpers that release it inside the unit of work
+        must not end it, the Transaction commits or rolls back when it is finished.
+        Raises:
+            sqlite3.ProgrammingError: If a transaction is still open. It is rolled back, so the
+                                      next user of the connection does not inherit it, but the
+                                      caller has to know its changes were not saved.
+        """
+        if self.owner is not None:
+            return
+        if self.in_transaction:
+            self.rollback()
+            raise db.ProgrammingError("Connection released with an unfinished transaction (it was rolled back)")
+
+
+class InstrumentedConnection(instrument.InstrumentedConnectionMixin, PooledConnection):
+    """PooledConnection that records every statement (used when start/instrument.py is enabled)"""
+
+
+def _open_connection():
+    # check_same_thread=False lets close_all_connections() close connections of other threads.
+    # The pool itself makes sure a connection is only ever used by the thread that owns it.
+    factory = InstrumentedConnection if instrument.ENABLED else PooledConnection
+    conn = db.connect(DB_FILE, factory=factory, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+    apply_profile(conn)
+    return conn
+
+
+# Apply the PRAGMA settings of a performance profile to one connection
+def apply_profile(conn, name=None):
+    name = name or ACTIVE_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown performance profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    for pragma, value in PROFILES[name].items():
+        conn.execute(f"PRAGMA {pragma} = {value}").fetchall()
+    conn.profile = name
+
+
+# Switch the performance profile used by all connections.
+# Pooled connections pick up the new settings the next time they are handed out.
+def set_profile(name):
+    global ACTIVE_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown performance profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    ACTIVE_PROFILE = name
+
+
+# Report the settings that are really in effect on a connection (read back from SQLite)
+def database_settings(conn=None):
+    conn = conn or get_connection()
+    settings = {"profile": getattr(conn, "profile", None)}
+    for pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout", "foreign_keys"):
+        settings[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+    return settings
+
+
+def _is_usable(conn):
+    # A closed connection raises on total_changes, which runs no statement. The real health
+    # check (a SELECT 1) runs at most once per HEALTH_CHECK_INTERVAL per connection.
+    try:
+        conn.total_changes
+    except db.ProgrammingError:
+        return False
+    now = time.monotonic()
+    if conn.in_transaction or now - conn.checked_at < HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        conn.execute("SELECT 1").fetchone()
+    except db.Error:
+        return False
+    conn.checked_at = now
+    return True
+
+
+def _discard(ident, conn):
+    # Drop a connection that went bad from the pool and close it
+    with _pool_lock:
+        if _pool.get(ident) is conn:
+            del _pool[ident]
+        _pool_lock.notify_all()
+    try:
+        conn.close()
+    except db.Error:
+        pass
+
+
+def _discard_dead_threads():
+    # Free the slots of threads that have finished (called with _pool_lock held)
+    alive = {t.ident for t in threading.enumerate()}
+    for ident in [i for i in _pool if i not in alive]:
+        try:
+            _pool.pop(ident).close()
+        except db.Error:
+            pass
+
+
+# A small function to open a connection to the database file.
+# Connections are pooled: every thread gets its own connection which is reused
+# across calls, so the connect/PRAGMA cost is paid once per thread, not once per query.
 # IMPORTANT: Enabling foreign key support on every connection
 # This ensures cascading deletions are enforced by SQLite
 def get_connection():
-    conn = db.connect("donation_app.db")  # Connect to the SQLite database file
-    conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
-    return conn
+    ident = threading.get_ident()
+    # Only this thread puts a connection under its own ident, so finding it needs no lock
+    conn = _pool.get(ident)
+    if conn is not None:
+        if _is_usable(conn):
+            if conn.profile != ACTIVE_PROFILE and not conn.in_transaction:
+                apply_profile(conn)
+            return conn
+        _discard(ident, conn)  # The connection went bad, open a fresh one below
+
+    with _pool_lock:
+        deadline = time.monotonic() + POOL_TIMEOUT
+        while len(_pool) >= POOL_SIZE:
+            _discard_dead_threads()
+            if len(_pool) < POOL_SIZE:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise db.OperationalError(f"connection pool exhausted ({POOL_SIZE} connections in use)")
+            _pool_lock.wait(min(remaining, 0.5))
+
+        conn = _open_connection()
+        _pool[ident] = conn
+        return conn
+
+
+# Close the connections of threads that have finished, e.g. after a thread pool was shut down
+def discard_finished_threads():
+    with _pool_lock:
+        _discard_dead_threads()
+        _pool_lock.notify_all()
+
+
+# Give back the calling thread's connection so another thread can use the slot
+# Useful for worker threads that are finished with the database
+def release_connection():
+    with _pool_lock:
+        conn = _pool.pop(threading.get_ident(), None)
+        if conn is not None:
+            conn.close()
+        _pool_lock.notify_all()
 
-# This function creates all the tables we need for the app
-def create_tables():
-    conn = get_connection()  # Start the connection to the database
-    cursor = conn.cursor()   # Get a cursor, used to run SQL commands. Acts as a bridge between Python and DB
 
-    # Run several SQL commands in one go using executescript()
-    cursor.executescript("""
-    -- First, remove all old versions of the tables if they are there
-    DROP TABLE IF EXISTS Donation;
-    DROP TABLE IF EXISTS Volunteer; -- Drop Volunteer first (new subtable linked to Event)
-    DROP TABLE IF EXISTS Business;
-    DROP TABLE IF EXISTS Event;
-    DROP TABLE IF EXISTS Beneficiary;
-    DROP TABLE IF EXISTS Donor;
+# Close every pooled connection, used when the application shuts down
+def close_all_connections():
+    with _pool_lock:
+        while _pool:
+            _, conn = _pool.popitem()
+            try:
+                conn.close()
+            except db.Error:
+                pass
+        _pool_lock.notify_all()
 
+
+# Run several SQL statements inside the current transaction.
+# (conn.executescript() cannot be used for this because it commits first.)
+# Statements are split with sqlite3.complete_statement so triggers with BEGIN ... END stay in one piece.
+def run_script(conn, script):
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if db.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        conn.execute(statement)
+
+
+# SQL that removes every table of the app (and with them their indexes and triggers)
+DROP_TABLES_SQL = """
+DROP TABLE IF EXISTS Donation;
+DROP TABLE IF EXISTS Donation_Quarantine;
+DROP TABLE IF EXISTS Event_Milestone;
+DROP TABLE IF EXISTS Volunteer; -- Drop Volunteer first (new subtable linked to Event)
+DROP TABLE IF EXISTS Business;
+DROP TABLE IF EXISTS Event;
+DROP TABLE IF EXISTS Beneficiary;
+DROP TABLE IF EXISTS Donor;
+DROP TABLE IF EXISTS Schema_Version;
+DROP TABLE IF EXISTS Donor_Summary;
+DROP TABLE IF EXISTS Event_Summary;
+DROP TABLE IF EXISTS Business_Summary;
+DROP TABLE IF EXISTS Beneficiary_Summary;
+DROP TABLE IF EXISTS Search_Index;
+"""
+
+# SQL that creates all the tables we need for the app (version 1 of the schema)
+TABLES_SQL = """
     /*
     Create the Donor table.
     NOT NULL constraints ensure that all fields are filled in.
     Unique constraints ensure that no two donors can have the same email or phone number.
     */
-    CREATE TABLE Donor (
+    CREATE TABLE IF NOT EXISTS Donor (
         Donor_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         First_Name TEXT NOT NULL,
         Last_Name TEXT NOT NULL,
@@ -45,7 +287,7 @@ def create_tables():
     Create the Beneficiary table.
     Stores organisations or individuals who receive support.
     */
-    CREATE TABLE Beneficiary (
+    CREATE TABLE IF NOT EXISTS Beneficiary (
         Beneficiary_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         Name TEXT NOT NULL,
         Type TEXT NOT NULL,
@@ -58,7 +300,7 @@ def create_tables():
     Create the Event table.
     Stores information about fundraising events.
     */
-    CREATE TABLE Event (
+    CREATE TABLE IF NOT EXISTS Event (
         Event_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         Name TEXT NOT NULL,
         Date TEXT NOT NULL,
@@ -71,7 +313,7 @@ def create_tables():
     Create the Business table.
     Stores information about businesses that participate in donations.
     */
-    CREATE TABLE Business (
+    CREATE TABLE IF NOT EXISTS Business (
         Business_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         Name TEXT NOT NULL,
         Email TEXT NOT NULL UNIQUE,
@@ -85,7 +327,7 @@ def create_tables():
     Stores volunteers linked to specific events.
     One event can have many volunteers.
     */
-    CREATE TABLE Volunteer (
+    CREATE TABLE IF NOT EXISTS Volunteer (
         Volunteer_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         Event_ID INTEGER NOT NULL,
         First_Name TEXT NOT NULL,
@@ -102,7 +344,7 @@ def create_tables():
     - Exactly one Beneficiary (mandatory)
     - And exactly one source: Donor OR Event OR Business
     */
-    CREATE TABLE Donation (
+    CREATE TABLE IF NOT EXISTS Donation (
         Donation_ID INTEGER PRIMARY KEY AUTOINCREMENT,
         Amount REAL NOT NULL,
         Date TEXT NOT NULL,
@@ -116,7 +358,54 @@ def create_tables():
         FOREIGN KEY(Business_ID) REFERENCES Business(Business_ID),
         FOREIGN KEY(Beneficiary_ID) REFERENCES Beneficiary(Beneficiary_ID)
     );
-    """)
+"""
+
+# Secondary indexes. Every statement uses IF NOT EXISTS so this can run on any database, any number of times.
+# The foreign key indexes on Donation are "covering": they also hold the columns the search screens show,
+# so a search by Donor/Event/Business/Beneficiary is answered from the index alone, and the
+# linked_donations() delete check only has to look at the first matching index entry.
+INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_donation_donor ON Donation(Donor_ID, Beneficiary_ID, Date, Amount, Notes);
+CREATE INDEX IF NOT EXISTS idx_donation_event ON Donation(Event_ID, Beneficiary_ID, Date, Amount, Notes);
+CREATE INDEX IF NOT EXISTS idx_donation_business ON Donation(Business_ID, Beneficiary_ID, Date, Amount, Notes);
+CREATE INDEX IF NOT EXISTS idx_donation_beneficiary ON Donation(Beneficiary_ID, Date, Amount, Notes);
+CREATE INDEX IF NOT EXISTS idx_donation_date ON Donation(Date);
+-- Used by the ON DELETE CASCADE from Event to Volunteer
+CREATE INDEX IF NOT EXISTS idx_volunteer_event ON Volunteer(Event_ID);
+"""
+
+# Since schema version 7 every donation has exactly one source, so the Donor, Event and Business indexes
+# are partial: each one only holds the donations of its own source instead of an entry for every donation
+# (most of them NULL). A lookup by ID (Donor_ID = ?) or by source type (Donor_ID IS NOT NULL) still uses them.
+SOURCE_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_donation_donor ON Donation(Donor_ID, Beneficiary_ID, Date, Amount, Notes)
+    WHERE Donor_ID IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_donation_event ON Donation(Event_ID, Beneficiary_ID, Date, Amount, Notes)
+    WHERE Event_ID IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_donation_business ON Donation(Business_ID, Beneficiary_ID, Date, Amount, Notes)
+    WHERE Business_ID IS NOT NULL;
+"""
+
+# This function throws away the whole database and creates all the tables again.
+# Normal start-up does NOT use this, it uses start.migrations.migrate() which keeps the data.
+def create_tables():
+    from start.migrations import migrate  # Imported here because start.migrations builds on this module
+
+    conn = get_connection()  # Start the connection to the database
+    cursor = conn.cursor()   # Get a cursor, used to run SQL commands. Acts as a bridge between Python and DB
+
+    # First, remove all old versions of the tables if they are there
+    cursor.executescript(DROP_TABLES_SQL)
+
+    # Then build the schema from scratch by applying every migration
+    migrate(conn)
+    conn.release()   # Hand the connection back to the pool
+    from start import cache
+    cache.invalidate()  # Every cached listing came from the old tables
+
 
-    conn.commit()  # Save the changes to the database
-    conn.close()   # Close the database connection
+# Running this file directly prints the active database settings
+# Usage: python -m start.tables
+if __name__ == "__main__":
+    for key, value in database_settings().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,163 @@
+# textsearch.py
+"""
+This module provides full-text search over donation notes, the names and
+addresses of donors, volunteers, businesses and beneficiaries, the e-mail
+addresses of donors and businesses and the type of beneficiaries.
+
+It uses an SQLite FTS5 index (the Search_Index table). Triggers on the entity
+tables keep the index in sync on every INSERT, UPDATE and DELETE, so a search
+never scans the tables themselves. Results are ranked with bm25 (a match in a
+name counts more than one in an address, and that more than one in the other
+columns) and every word is also matched as a prefix, so "memo" finds "memorial".
+
+Each indexed record gets a fixed rowid (record ID * 8 + a code for its table),
+which lets the triggers update or remove its entry with a direct rowid lookup.
+"""
+
+import re
+import sqlite3 as db
+
+from start.tables import get_connection
+
+# Searchable columns of the index, in order
+SEARCH_COLUMNS = ("Name", "Address", "Email", "Type", "Notes")
+
+# Table -> (code used in the rowid, ID column, SQL for Name, Address, Email, Type and Notes)
+# The SQL expressions use the placeholder {row}, replaced by NEW or OLD in the triggers.
+INDEXED_TABLES = {
+    "Donation": (1, "Donation_ID", "''", "''", "''", "''", "{row}.Notes"),
+    "Donor": (2, "Donor_ID", "{row}.First_Name || ' ' || {row}.Last_Name", "{row}.Address", "{row}.Email", "''", "''"),
+    "Volunteer": (3, "Volunteer_ID", "{row}.First_Name || ' ' || {row}.Last_Name", "{row}.Address", "''", "''", "''"),
+    "Business": (4, "Business_ID", "{row}.Name", "{row}.Address", "{row}.Email", "''", "''"),
+    "Beneficiary": (5, "Beneficiary_ID", "{row}.Name", "{row}.Address", "''", "{row}.Type", "''"),
+}
+
+ROWID_FACTOR = 8
+
+# Weights of the Kind, Record_ID, Name, Address, Email, Type and Notes columns in the bm25 ranking
+RANK_WEIGHTS = "0, 0, 10.0, 4.0, 2.0, 2.0, 1.0"
+
+# Fields of each search_text() result
+RESULT_COLUMNS = ("Kind", "Record_ID") + SEARCH_COLUMNS + ("Score",)
+
+_INSERT_COLUMNS = ", ".join(("rowid", "Kind", "Record_ID") + SEARCH_COLUMNS)
+
+SEARCH_INDEX_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS Search_Index USING fts5(
+        Kind UNINDEXED,
+        Record_ID UNINDEXED,
+        Name,
+        Address,
+        Email,
+        Type,
+        Notes,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );
+"""
+
+
+def fts5_available(conn):
+    """True if this SQLite library was built with FTS5"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_check USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_check")
+        return True
+    except db.OperationalError:
+        return False
+
+
+def _values(table, row):
+    code, key, *expressions = INDEXED_TABLES[table]
+    filled = ", ".join(f"COALESCE({expression.format(row=row)}, '')" for expression in expressions)
+    return f"{row}.{key} * {ROWID_FACTOR} + {code}, '{table}', {row}.{key}, {filled}"
+
+
+def trigger_sql(table):
+    """Returns the SQL of the three triggers that keep Search_Index in sync with one table"""
+    code, key, *expressions = INDEXED_TABLES[table]
+    name = table.lower()
+    # Only changes to the indexed columns need to touch the index
+    columns = sorted(set(re.findall(r"\{row\}\.(\w+)", " ".join(expressions))))
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS {name}_search_insert AFTER INSERT ON {table}
+    BEGIN
+        INSERT INTO Search_Index ({_INSERT_COLUMNS}) VALUES ({_values(table, "NEW")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS {name}_search_update AFTER UPDATE OF {', '.join(columns)} ON {table}
+    BEGIN
+        DELETE FROM Search_Index WHERE rowid = OLD.{key} * {ROWID_FACTOR} + {code};
+        INSERT INTO Search_Index ({_INSERT_COLUMNS}) VALUES ({_values(table, "NEW")});
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS {name}_search_delete AFTER DELETE ON {table}
+    BEGIN
+        DELETE FROM Search_Index WHERE rowid = OLD.{key} * {ROWID_FACTOR} + {code};
+    END;
+"""
+
+
+def drop_triggers_sql(table):
+    """Returns the SQL that removes the triggers made by trigger_sql()"""
+    name = table.lower()
+    return "".join(f"DROP TRIGGER IF EXISTS {name}_search_{event};\n" for event in ("insert", "update", "delete"))
+
+
+def populate_sql(table):
+    """Returns the SQL that adds every existing record of a table to the index"""
+    values = _values(table, table)
+    return f"""
+    INSERT INTO Search_Index ({_INSERT_COLUMNS})
+    SELECT {values} FROM {table};
+"""
+
+
+def build_match_query(text):
+    """
+    Turns what the user typed into an FTS5 query: every word must match,
+    and every word also matches longer words that start with it.
+    Quotes are escaped, so the text cannot inject FTS5 syntax.
+    Returns None if the text has no words.
+    """
+    words = [w for w in text.replace('"', " ").split() if w]
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_text(text, kinds=None, limit=20):
+    """
+    Full-text search across names, addresses, e-mail addresses, beneficiary types and donation notes.
+    Parameters:
+        text (str): Words to look for (prefixes allowed)
+        kinds (list/None): Only return these record types, e.g. ["Donation"]; all types if None
+        limit (int): Maximum number of results
+    Returns:
+        list: (Kind, Record_ID, Name, Address, Email, Type, Notes, score) tuples (RESULT_COLUMNS), best match first
+    Raises:
+        sqlite3.OperationalError: If the search index is not available
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    query = f"""
+        SELECT Kind, Record_ID, {', '.join(SEARCH_COLUMNS)}, bm25(Search_Index, {RANK_WEIGHTS}) AS score
+        FROM Search_Index
+        WHERE Search_Index MATCH ?"""
+    params = [match]
+    if kinds:
+        query += f" AND Kind IN ({', '.join('?' * len(kinds))})"
+        params += list(kinds)
+    query += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    conn = get_connection()
+    try:
+        return conn.execute(query, params).fetchall()
+    except db.OperationalError as e:
+        if "no such table" in str(e):
+            raise db.OperationalError("Full-text search is not available (this SQLite library has no FTS5 support)") from e
+        raise
+    finally:
+        conn.release()
@@ -0,0 +1,187 @@
+# validation.py
+"""
+This module holds the validation rules for every record type.
+The interactive input functions in body/* and the bulk importer both use
+these rules, so a record is accepted or rejected the same way no matter
+how it enters the database.
+
+The validate_<entity>() functions take a dict of column name -> value and
+return the cleaned values as a tuple in table column order (without the ID),
+ready to be used as INSERT parameters.
+They raise ValueError with a readable message when a value is not valid.
+"""
+
+import math
+import re
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def is_valid_date(text):
+    """True if the text uses the YYYY-MM-DD format"""
+    return bool(DATE_PATTERN.match(text))
+
+
+def is_letters(text):
+    """True if the text contains only letters (spaces are allowed between words)"""
+    return text.replace(" ", "").isalpha()
+
+
+def is_valid_email(text):
+    """Simple email check: must contain an @ and a dot"""
+    return "@" in text and "." in text
+
+
+def parse_positive_amount(text):
+    """Converts the text to a float and checks it is above zero (and finite). Raises ValueError otherwise."""
+    amount = float(text)
+    if not math.isfinite(amount):  # float() accepts "nan", "inf" and "1e999"
+        raise ValueError("Amount must be a finite number")
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    return amount
+
+
+def parse_ids(text):
+    """
+    Converts a comma-separated list of IDs (e.g. "1, 4,7") to a list of ints, without duplicates.
+    Raises ValueError if the list is empty or an ID is not a number.
+    """
+    ids = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part.isdigit():
+            raise ValueError("IDs must be numbers separated by commas")
+        if int(part) not in ids:
+            ids.append(int(part))
+    return ids
+
+
+def _text(record, column):
+    # Read a value from the record as stripped text (missing and None become "")
+    value = record.get(column)
+    return "" if value is None else str(value).strip()
+
+
+def _letters(record, column, label):
+    value = _text(record, column)
+    if not is_letters(value):
+        raise ValueError(f"{label} must contain only letters.")
+    return value.capitalize()
+
+
+def _date(record, column, label="Date"):
+    value = _text(record, column)
+    if not is_valid_date(value):
+        raise ValueError(f"{label} must be in format YYYY-MM-DD.")
+    return value
+
+
+def _digits(record, column, label):
+    value = _text(record, column)
+    if not value.isdigit():
+        raise ValueError(f"{label} must contain only digits.")
+    return value
+
+
+def _email(record, column="Email"):
+    value = _text(record, column)
+    if not is_valid_email(value):
+        raise ValueError("Please enter a valid email address.")
+    return value
+
+
+def _optional_id(record, column, label):
+    value = _text(record, column)
+    if value and not value.isdigit():
+        raise ValueError(f"{label} must be numeric if provided.")
+    return value or None
+
+
+def validate_donor(record):
+    return (
+        _letters(record, "First_Name", "First name"),
+        _letters(record, "Last_Name", "Last name"),
+        _email(record),
+        _digits(record, "Phone_Number", "Phone number"),
+        _text(record, "Address"),
+        _date(record, "Date_of_Birth"),
+    )
+
+
+def validate_business(record):
+    return (
+        _letters(record, "Name", "Business name"),
+        _email(record),
+        _digits(record, "Phone_Number", "Phone number"),
+        _text(record, "Address"),
+        _date(record, "Registration_Date"),
+    )
+
+
+def validate_beneficiary(record):
+    name = _letters(record, "Name", "Name")
+    btype = _text(record, "Type")
+    if not is_letters(btype):
+        raise ValueError("Type must contain only letters.")
+    priority = _text(record, "Funding_priority").capitalize()
+    if not priority.isalpha():
+        raise ValueError("Priority must contain only letters.")
+    return (name, btype, _text(record, "Address"), _text(record, "Support_Duration"), priority)
+
+
+def validate_event(record):
+    name = _text(record, "Name")
+    if not name:
+        raise ValueError("Event name cannot be empty.")
+    date = _date(record, "Date")
+    location = _text(record, "Location")
+    if not location:
+        raise ValueError("Location cannot be empty.")
+    try:
+        goal = parse_positive_amount(_text(record, "Fundraising_Goal"))
+    except ValueError:
+        raise ValueError("Invalid amount. Please enter a positive number.") from None
+    return (name, date, location, goal, _text(record, "Description"))
+
+
+def validate_volunteer(record):
+    event_id = _text(record, "Event_ID")
+    if not event_id.isdigit():
+        raise ValueError("Event ID must be numeric.")
+    return (
+        event_id,
+        _letters(record, "First_Name", "First name"),
+        _letters(record, "Last_Name", "Last name"),
+        _text(record, "Address"),
+        _date(record, "Date_of_Birth"),
+        _digits(record, "Contact_Number", "Contact number"),
+    )
+
+
+def validate_donation(record):
+    beneficiary_id = _text(record, "Beneficiary_ID")
+    if not beneficiary_id.isdigit():
+        raise ValueError("Beneficiary ID must be a number.")
+    donor_id = _optional_id(record, "Donor_ID", "Donor ID")
+    event_id = _optional_id(record, "Event_ID", "Event ID")
+    business_id = _optional_id(record, "Business_ID", "Business ID")
+    if [donor_id, event_id, business_id].count(None) != 2:
+        raise ValueError("Choose exactly one sender ID (Donor, Event, or Business).")
+    try:
+        amount = parse_positive_amount(_text(record, "Amount"))
+    except ValueError:
+        raise ValueError("Invalid amount. Must be a positive number.") from None
+    date = _date(record, "Date")
+    return (amount, date, _text(record, "Notes"), donor_id, event_id, business_id, beneficiary_id)
+
+
+# Table name -> (column names in INSERT order, validation function)
+VALIDATORS = {
+    "Donor": (("First_Name", "Last_Name", "Email", "Phone_Number", "Address", "Date_of_Birth"), validate_donor),
+    "Business": (("Name", "Email", "Phone_Number", "Address", "Registration_Date"), validate_business),
+    "Beneficiary": (("Name", "Type", "Address", "Support_Duration", "Funding_priority"), validate_beneficiary),
+    "Event": (("Name", "Date", "Location", "Fundraising_Goal", "Description"), validate_event),
+    "Volunteer": (("Event_ID", "First_Name", "Last_Name", "Address", "Date_of_Birth", "Contact_Number"), validate_volunteer),
+    "Donation": (("Amount", "Date", "Notes", "Donor_ID", "Event_ID", "Business_ID", "Beneficiary_ID"), validate_donation),
+}
@@ -1,19 +1,29 @@
 # values.py
-from start.tables import get_connection
+import argparse
+import bisect
+import itertools
+import random
+import time
+from datetime import date, timedelta
+
+from start import cache
+from start.tables import get_connection, run_script, set_profile, PROFILES, ACTIVE_PROFILE
+from start.summaries import SUMMARY_SOURCES, rebuild_sql
+from start.textsearch import populate_sql
 
 """
 This module provides sample data for the donation management system.
-It contains a single function that inserts values in all database tables that can be used for testing and demonstration.
+insert_sample_data() inserts a small fixed set of records in all database tables that can be used for testing and demonstration.
 Clears all existing data and inserts fresh sample records into all tables.
 The data represents a typical set of records for a charity organization.
 
+generate_data() builds a synthetic dataset of any size for benchmarks and capacity planning
+(python -m start.values --donations 1000000). The same seed always produces the same data.
+
 UPDATED: With correct Business columns, Volunteer table, and correct Donation relationships.
 """
 
-def insert_sample_data():
-    conn = get_connection()
-    cursor = conn.cursor()
-
+def _clear_tables(cursor):
     # Clear tables
     cursor.execute("DELETE FROM Donation")
     cursor.execute("DELETE FROM Volunteer")  # Clear Volunteer records (new subtable)
@@ -21,6 +31,14 @@ def insert_sample_data():
     cursor.execute("DELETE FROM Event")
     cursor.execute("DELETE FROM Beneficiary")
     cursor.execute("DELETE FROM Donor")
+    # Restart the ID counters so the records inserted next get IDs 1, 2, 3...
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name IN ('Donation', 'Volunteer', 'Business', 'Event', 'Beneficiary', 'Donor')")
+
+def insert_sample_data():
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    _clear_tables(cursor)
 
     # Insert Donors
     cursor.execute("INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth) VALUES ('John', 'Doe', 'john@example.com', '123456789', '123 Main St', '1980-01-01')")
@@ -64,4 +82,241 @@ def insert_sample_data():
     cursor.execute("INSERT INTO Donation (Amount, Date, Notes, Donor_ID, Event_ID, Business_ID, Beneficiary_ID) VALUES (600.0, '2025-11-18', 'GreenEnergy donation to Environmental Fund', NULL, NULL, 2, 4)")
 
     conn.commit()
-    conn.close()
+    conn.release()
+    cache.invalidate()
+
+
+# Building blocks for the synthetic records
+FIRST_NAMES = ["Oliver", "Amelia", "George", "Isla", "Harry", "Ava", "Jack", "Mia", "Noah", "Grace",
+               "Arslan", "Fatima", "Mohammed", "Priya", "Liam", "Chloe", "Leo", "Ella", "Oscar", "Zara"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Khan", "Patel", "Evans", "Thomas",
+              "Roberts", "Walker", "Wright", "Hughes", "Ali", "Green", "Hall", "Wood", "Clarke", "Hussain"]
+STREETS = ["High Street", "Station Road", "Church Lane", "Park Avenue", "Victoria Road", "Mill Lane", "Queens Road"]
+TOWNS = ["Leeds", "Bristol", "Manchester", "Leicester", "Glasgow", "Cardiff", "Norwich", "York"]
+BUSINESS_WORDS = ["Tech", "Green", "Foodies", "Edu", "Blue", "Bright", "North", "Harbour", "Summit", "Oak"]
+BUSINESS_SUFFIXES = ["Corp", "Energy", "Hub", "World", "Labs", "Partners", "Trading", "Group"]
+BENEFICIARY_CAUSES = ["Children", "Elderly", "Animal", "Environmental", "Hospice", "Food Bank", "Refugee", "Mental Health"]
+BENEFICIARY_KINDS = ["Foundation", "Support", "Shelter", "Fund", "Trust", "Network"]
+BENEFICIARY_TYPES = ["Charity", "Non-Profit", "Community Group"]
+EVENT_KINDS = ["Gala Dinner", "Marathon Run", "Bake Sale", "Art Auction", "Quiz Night", "Fun Run", "Concert"]
+NOTES = ["Monthly gift", "Gift Aid declared", "In memory of a loved one", "Christmas appeal",
+         "Sponsored challenge", "Matched by employer", "Online donation", "Collection box"]
+
+# Relative weights of each month (January first): giving peaks before Christmas
+MONTH_WEIGHTS = [6, 5, 6, 6, 6, 6, 5, 5, 7, 9, 13, 20]
+# Share of donations from each kind of source (every donation has exactly one source)
+SOURCE_WEIGHTS = {"Donor": 75, "Business": 10, "Event": 15}
+PRIORITY_WEIGHTS = {"High": 2, "Medium": 5, "Low": 3}
+NOTE_SHARE = 0.3  # Share of donations that have notes
+POPULARITY = 1.1  # How unevenly gifts are spread between donors (0 = evenly, higher = a few give most)
+
+
+def _popularity_weights(count):
+    # Cumulative weights where record 1 is the most popular, record 2 the second... (Zipf-like)
+    return list(itertools.accumulate(1 / (rank ** POPULARITY) for rank in range(1, count + 1)))
+
+
+def _seasonal_dates(first_year, last_year):
+    # Every day of the period and the cumulative weight of each day (its month's weight)
+    days = []
+    day = date(first_year, 1, 1)
+    while day.year <= last_year:
+        days.append(day)
+        day += timedelta(days=1)
+    return [d.isoformat() for d in days], list(itertools.accumulate(MONTH_WEIGHTS[d.month - 1] for d in days))
+
+
+def _random_date(rng, first_year, last_year):
+    return f"{rng.randint(first_year, last_year)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def _insert_batches(cursor, query, rows, batch_size):
+    # executemany() in slices, so a huge generator is never turned into one list
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.executemany(query, batch)
+
+
+def _donation_rows(rng, count, donors, businesses, events, beneficiaries, years, batch_size):
+    dates, date_weights = _seasonal_dates(*years)
+    donor_weights = _popularity_weights(donors)
+    beneficiary_weights = _popularity_weights(beneficiaries)
+    sources = list(SOURCE_WEIGHTS)
+    source_weights = list(SOURCE_WEIGHTS.values())
+    choices = rng.choices
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        # Whole columns are drawn at once; choices() with k is much faster than one call per row
+        batch_dates = choices(dates, cum_weights=date_weights, k=size)
+        batch_sources = choices(sources, weights=source_weights, k=size)
+        batch_beneficiaries = [bisect.bisect_left(beneficiary_weights, rng.random() * beneficiary_weights[-1]) + 1
+                               for _ in range(size)]
+        for i in range(size):
+            source = batch_sources[i]
+            if source == "Donor":
+                sender = bisect.bisect_left(donor_weights, rng.random() * donor_weights[-1]) + 1
+                # Individual gifts are small and skewed: most are £5-£50, a few are thousands
+                amount = round(min(rng.lognormvariate(3.2, 1.0), 50000), 2)
+            elif source == "Business":
+                sender = rng.randint(1, businesses)
+                amount = round(min(rng.lognormvariate(6.0, 1.1), 250000), 2)
+            else:
+                sender = rng.randint(1, events)
+                amount = round(min(rng.lognormvariate(5.0, 1.3), 100000), 2)
+            notes = rng.choice(NOTES) if rng.random() < NOTE_SHARE else None
+            yield (max(amount, 1.0), batch_dates[i], notes,
+                   sender if source == "Donor" else None,
+                   sender if source == "Event" else None,
+                   sender if source == "Business" else None,
+                   batch_beneficiaries[i])
+
+
+def _bulk_insert_donations(conn, cursor, rows, batch_size):
+    # The Donation triggers (summaries, search index) and secondary indexes cost more than the
+    # insert itself. For a bulk load they are dropped, the derived tables and indexes are rebuilt
+    # once with set-based statements and the triggers are created again, all in one transaction.
+    conn.execute("BEGIN")
+    try:
+        triggers = cursor.execute("""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('trigger', 'index') AND tbl_name = 'Donation' AND sql IS NOT NULL
+        """).fetchall()
+        for kind, name, _ in triggers:
+            cursor.execute(f"DROP {kind.upper()} {name}")
+
+        _insert_batches(cursor, "INSERT INTO Donation (Amount, Date, Notes, Donor_ID, Event_ID, Business_ID, Beneficiary_ID) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows, batch_size)
+
+        for kind, _, sql in triggers:
+            if kind == "index":
+                cursor.execute(sql)
+        cursor.execute("ANALYZE Donation")  # Dropping the indexes dropped their statistics too
+        for entity in SUMMARY_SOURCES:
+            run_script(conn, rebuild_sql(entity))
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'Search_Index'").fetchone():
+            cursor.execute("DELETE FROM Search_Index WHERE Kind = 'Donation'")
+            run_script(conn, populate_sql("Donation"))
+        for kind, _, sql in triggers:
+            if kind == "trigger":
+                cursor.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def generate_data(donations=10000, donors=None, businesses=None, beneficiaries=None, events=None,
+                  volunteers=None, seed=0, years=(2020, 2025), batch_size=50000, replace=True, progress=None):
+    """
+    Inserts a synthetic dataset with realistic distributions:
+    skewed gift amounts (log-normal, larger for businesses and events), more gifts in
+    November and December, a few donors giving most of the gifts, and exactly one source
+    (donor, business or event) per donation.
+    Rows are inserted with executemany() in batches, in one transaction per table; the
+    donation summaries and search index are rebuilt once at the end instead of by the triggers.
+    Parameters:
+        donations (int): Number of donations
+        donors, businesses, beneficiaries, events, volunteers (int/None): Number of records,
+            scaled from the number of donations if None
+        seed (int): Random seed; the same seed and sizes always give identical data
+        years (tuple): First and last year of the donation dates
+        batch_size (int): Rows per executemany() call
+        replace (bool): Delete all records first (needed for identical IDs)
+        progress (function/None): Called with (table, rows inserted) after each table
+    Returns:
+        dict: Number of rows inserted per table
+    """
+    donors = donors or max(10, donations // 20)
+    businesses = businesses or max(5, donations // 500)
+    beneficiaries = beneficiaries or max(5, min(2000, donations // 1000))
+    events = events or max(5, donations // 2000)
+    volunteers = volunteers or events * 10
+    rng = random.Random(seed)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    counts = {}
+
+    def insert(table, query, rows, count):
+        conn.execute("BEGIN")
+        try:
+            _insert_batches(cursor, query, rows, batch_size)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        counts[table] = count
+        if progress:
+            progress(table, count)
+
+    try:
+        if replace:
+            conn.execute("BEGIN")
+            _clear_tables(cursor)
+            conn.commit()
+
+        insert("Donor", "INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth) VALUES (?, ?, ?, ?, ?, ?)",
+               ((first, last, f"{first}.{last}{i}@example.org".lower(), 7000000000 + i,
+                 f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}", _random_date(rng, 1940, 2005))
+                for i, first, last in ((i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) for i in range(1, donors + 1))),
+               donors)
+        insert("Business", "INSERT INTO Business (Name, Email, Phone_Number, Address, Registration_Date) VALUES (?, ?, ?, ?, ?)",
+               ((f"{rng.choice(BUSINESS_WORDS)}{rng.choice(BUSINESS_SUFFIXES)} {i}", f"contact{i}@business.example.org",
+                 8000000000 + i, f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}",
+                 _random_date(rng, 1990, years[1])) for i in range(1, businesses + 1)),
+               businesses)
+        priorities = list(PRIORITY_WEIGHTS)
+        insert("Beneficiary", "INSERT INTO Beneficiary (Name, Type, Address, Support_Duration, Funding_priority) VALUES (?, ?, ?, ?, ?)",
+               ((f"{rng.choice(BENEFICIARY_CAUSES)} {rng.choice(BENEFICIARY_KINDS)} {i}", rng.choice(BENEFICIARY_TYPES),
+                 f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}",
+                 rng.choice(["1 year", "3 years", "5 years", "Ongoing", "Permanent"]),
+                 rng.choices(priorities, weights=list(PRIORITY_WEIGHTS.values()))[0]) for i in range(1, beneficiaries + 1)),
+               beneficiaries)
+        insert("Event", "INSERT INTO Event (Name, Date, Location, Fundraising_Goal, Description) VALUES (?, ?, ?, ?, ?)",
+               ((f"{rng.choice(EVENT_KINDS)} {i}", _random_date(rng, *years), rng.choice(TOWNS),
+                 float(rng.choice([1000, 5000, 10000, 20000, 50000])), "Fundraising event") for i in range(1, events + 1)),
+               events)
+        insert("Volunteer", "INSERT INTO Volunteer (Event_ID, First_Name, Last_Name, Address, Date_of_Birth, Contact_Number) VALUES (?, ?, ?, ?, ?, ?)",
+               ((rng.randint(1, events), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                 f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(TOWNS)}", _random_date(rng, 1950, 2007),
+                 f"07{rng.randint(100000000, 999999999)}") for _ in range(volunteers)),
+               volunteers)
+        _bulk_insert_donations(conn, cursor, _donation_rows(rng, donations, donors, businesses, events,
+                                                           beneficiaries, years, batch_size), batch_size)
+        counts["Donation"] = donations
+        if progress:
+            progress("Donation", donations)
+    finally:
+        conn.release()
+        cache.invalidate()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replace all records with a synthetic dataset")
+    parser.add_argument("--donations", type=int, default=10000, help="number of donations")
+    parser.add_argument("--donors", type=int, help="number of donors (default: donations / 20)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (same seed, same data)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="rows per executemany() call")
+    parser.add_argument("--profile", choices=list(PROFILES), default=ACTIVE_PROFILE,
+                        help=f"database performance profile used while generating (default {ACTIVE_PROFILE}); "
+                             "bulk-load is faster but a power loss can corrupt the database, so only use it "
+                             "on a new database or one with a backup")
+    args = parser.parse_args(argv)
+
+    set_profile(args.profile)
+
+    from start.migrations import migrate
+    migrate()
+    started = time.perf_counter()
+    generate_data(args.donations, donors=args.donors, seed=args.seed, batch_size=args.batch_size,
+                  progress=lambda table, count: print(f"\033[92m{table}:\033[0m {count:,} rows "
+                                                      f"({time.perf_counter() - started:.1f} s)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# conftest.py
+"""
+Shared fixtures. Run the tests from the project folder with: python -m pytest
+"""
+
+import pytest
+
+from start import tables, cache
+from start.migrations import migrate
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Points the connection pool at a new, fully migrated database file; yields this thread's connection"""
+    tables.close_all_connections()
+    monkeypatch.setattr(tables, "DB_FILE", str(tmp_path / "test.db"))
+    migrate()
+    cache.clear()
+    yield tables.get_connection()
+    tables.close_all_connections()
+    cache.clear()
@@ -0,0 +1,34 @@
+"""Tests for start.crud.bulk_delete"""
+
+from start.crud import bulk_delete
+
+INSERT_DONOR = ("INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth) "
+                "VALUES ('Test', ?, ?, ?, '1 Memorial Road', '1980-01-01')")
+
+
+def add_donors(conn, count):
+    ids = [conn.execute(INSERT_DONOR, (f"Donor{n}", f"donor{n}@example.com", 7100000000 + n)).lastrowid
+           for n in range(count)]
+    conn.execute("INSERT INTO Beneficiary (Name, Type, Address) VALUES ('Shelter', 'Charity', '2 Mill Lane')")
+    conn.commit()
+    return ids
+
+
+def test_missing_blocked_and_deleted_in_one_call(database):
+    first, second, third = add_donors(database, 3)
+    database.execute("INSERT INTO Donation (Amount, Date, Donor_ID, Beneficiary_ID) VALUES (25, '2025-01-01', ?, 1)",
+                     (second,))
+    database.commit()
+
+    deleted, blocked, missing = bulk_delete("Donor", [third, 999, second, first, first])
+
+    assert (deleted, blocked, missing) == ([first, third], [second], [999])
+    remaining = [row[0] for row in database.execute("SELECT Donor_ID FROM Donor")]
+    assert remaining == [second]
+
+
+def test_where_condition(database):
+    first, second, _ = add_donors(database, 3)
+    deleted, blocked, missing = bulk_delete("Donor", where="Last_Name IN (?, ?)", params=("Donor0", "Donor1"))
+    assert (deleted, blocked, missing) == ([first, second], [], [])
+    assert database.execute("SELECT COUNT(*) FROM Donor").fetchone()[0] == 1
@@ -0,0 +1,71 @@
+"""Tests for start.migrations: upgrading a database made before migrations existed"""
+
+import pytest
+
+from start import tables, cache
+from start.migrations import migrate, current_version, LATEST_VERSION
+from start.summaries import SUMMARY_SOURCES, SUMMARY_COLUMNS, summary_table
+from start.tables import run_script, TABLES_SQL
+from start.textsearch import search_text
+
+
+@pytest.fixture
+def old_database(tmp_path, monkeypatch):
+    """A database with the version 1 tables (as the app made them before migrations), not migrated yet"""
+    tables.close_all_connections()
+    monkeypatch.setattr(tables, "DB_FILE", str(tmp_path / "old.db"))
+    cache.clear()
+    conn = tables.get_connection()
+    run_script(conn, TABLES_SQL)
+    conn.commit()
+    yield conn
+    tables.close_all_connections()
+    cache.clear()
+
+
+def summaries(conn, entity):
+    key = SUMMARY_SOURCES[entity]
+    return conn.execute(f"SELECT {key}, {SUMMARY_COLUMNS} FROM {summary_table(entity)} ORDER BY {key}").fetchall()
+
+
+def recomputed(conn, entity):
+    key = SUMMARY_SOURCES[entity]
+    return conn.execute(f"""
+        SELECT {key}, COUNT(*), SUM(Amount), MIN(Amount), MAX(Amount), MAX(Date)
+        FROM Donation WHERE {key} IS NOT NULL GROUP BY {key} ORDER BY {key}
+    """).fetchall()
+
+
+def test_two_source_donation_is_quarantined(old_database):
+    conn = old_database
+    conn.execute("INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth) "
+                 "VALUES ('Ada', 'Lovelace', 'ada@example.com', 7100000001, '1 Memorial Road', '1980-01-01')")
+    conn.execute("INSERT INTO Event (Name, Date, Location, Fundraising_Goal) VALUES ('Gala', '2025-05-01', 'Hall', 1000)")
+    conn.execute("INSERT INTO Beneficiary (Name, Type, Address) VALUES ('Shelter', 'Charity', '2 Mill Lane')")
+    donation = "INSERT INTO Donation (Amount, Date, Notes, Donor_ID, Event_ID, Beneficiary_ID) VALUES (?, ?, ?, ?, ?, 1)"
+    conn.execute(donation, (100, "2025-05-01", "from ada", 1, None))
+    conn.execute(donation, (250, "2025-05-02", "raffle", None, 1))
+    conn.execute(donation, (999, "2025-05-03", "doubled up", 1, 1))  # Two sources: breaks the version 7 rule
+    conn.commit()
+
+    assert current_version(conn) == 0
+    migrate(conn)
+    assert current_version(conn) == LATEST_VERSION
+
+    assert conn.execute("SELECT Donation_ID, Amount, Donor_ID, Event_ID FROM Donation_Quarantine").fetchall() \
+        == [(3, 999, 1, 1)]
+    assert [row[0] for row in conn.execute("SELECT Donation_ID FROM Donation ORDER BY Donation_ID")] == [1, 2]
+    for entity in SUMMARY_SOURCES:
+        assert summaries(conn, entity) == recomputed(conn, entity), entity
+    assert summaries(conn, "Donor") == [(1, 1, 100, 100, 100, "2025-05-01")]
+    assert summaries(conn, "Beneficiary") == [(1, 2, 350, 100, 250, "2025-05-02")]
+    assert search_text("doubled") == []
+    # The quarantined donation's ID is not given to a new donation
+    new_id = conn.execute("INSERT INTO Donation (Amount, Date, Donor_ID, Beneficiary_ID) "
+                          "VALUES (5, '2025-06-01', 1, 1)").lastrowid
+    assert new_id == 4
+
+
+def test_existing_tables_count_as_version_1(old_database):
+    assert migrate(old_database) == list(range(2, LATEST_VERSION + 1))
+    assert migrate(old_database) == []
@@ -0,0 +1,38 @@
+"""Tests for start.summaries.pending_milestones"""
+
+from start.crud import Transaction
+from start.summaries import pending_milestones
+
+
+def add_event(conn, goal=1000):
+    cursor = conn.execute("INSERT INTO Event (Name, Date, Location, Fundraising_Goal) VALUES ('Fun Run', '2025-05-01', 'Park', ?)",
+                          (goal,))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def give(conn, event_id, amount):
+    conn.execute("INSERT INTO Beneficiary (Name, Type, Address) VALUES ('Shelter', 'Charity', '2 Mill Lane')")
+    conn.execute("INSERT INTO Donation (Event_ID, Beneficiary_ID, Amount, Date) VALUES (?, last_insert_rowid(), ?, '2025-05-02')",
+                 (event_id, amount))
+    conn.commit()
+
+
+def test_each_milestone_is_reported_once(database):
+    event_id = add_event(database)
+    give(database, event_id, 500)
+    assert [row[2] for row in pending_milestones()] == [50]
+    assert pending_milestones() == []
+
+    give(database, event_id, 500)
+    assert [row[2] for row in pending_milestones()] == [75, 100]
+
+
+def test_passed_connection_is_not_committed(database):
+    event_id = add_event(database)
+    give(database, event_id, 1000)
+    unit = Transaction().begin()
+    assert len(pending_milestones(unit.conn)) == 3
+    unit.rollback()
+    # The caller rolled back, so the milestones are still waiting
+    assert len(pending_milestones()) == 3
@@ -0,0 +1,33 @@
+"""Tests for start.textsearch: what is indexed in which column, and the triggers that keep it in sync"""
+
+from start.textsearch import search_text, RESULT_COLUMNS
+
+
+def find(text):
+    return [dict(zip(RESULT_COLUMNS, row)) for row in search_text(text)]
+
+
+def test_fields_are_indexed_under_their_own_names(database):
+    database.execute("INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth) "
+                     "VALUES ('Ada', 'Lovelace', 'ada@example.com', 7100000001, '1 Memorial Road', '1980-01-01')")
+    database.execute("INSERT INTO Beneficiary (Name, Type, Address) VALUES ('Shelter', 'Charity', '2 Mill Lane')")
+    database.commit()
+
+    [donor] = find("ada@example")
+    assert (donor["Kind"], donor["Email"], donor["Type"], donor["Notes"]) == ("Donor", "ada@example.com", "", "")
+    [beneficiary] = find("charity")
+    assert (beneficiary["Kind"], beneficiary["Type"], beneficiary["Email"]) == ("Beneficiary", "Charity", "")
+
+
+def test_index_follows_updates_and_deletes(database):
+    database.execute("INSERT INTO Business (Name, Email, Phone_Number, Address, Registration_Date) "
+                     "VALUES ('Acme', 'info@acme.test', 7100000002, '3 Dock Street', '2001-02-03')")
+    database.commit()
+    database.execute("UPDATE Business SET Email = 'hello@widgets.test'")
+    database.commit()
+    assert find("acme.test") == []
+    assert [row["Email"] for row in find("widgets")] == ["hello@widgets.test"]
+
+    database.execute("DELETE FROM Business")
+    database.commit()
+    assert find("widgets") == []
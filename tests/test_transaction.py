@@ -0,0 +1,80 @@
+# test_transaction.py
+"""Tests for start.crud.Transaction"""
+
+import sqlite3
+
+import pytest
+
+from start import tables
+from start.crud import Transaction, add_entry, get_entry, view_all
+from start.summaries import get_summary
+from start.textsearch import search_text
+
+INSERT_DONOR = """INSERT INTO Donor (First_Name, Last_Name, Email, Phone_Number, Address, Date_of_Birth)
+                  VALUES (?, ?, ?, ?, ?, ?)"""
+
+
+def donor(n):
+    return ("Test", f"Donor{n}", f"donor{n}@example.org", 7100000000 + n, "1 Memorial Road", "1980-01-01")
+
+
+def donor_count():
+    return len(view_all("Donor"))
+
+
+def test_commit_saves_every_write(database):
+    with Transaction():
+        first = add_entry(INSERT_DONOR, donor(1))
+        second = add_entry(INSERT_DONOR, donor(2))
+    assert get_entry("Donor", first) is not None
+    assert get_entry("Donor", second) is not None
+
+
+def test_exception_rolls_back_everything(database):
+    with pytest.raises(RuntimeError):
+        with Transaction():
+            add_entry(INSERT_DONOR, donor(1))
+            raise RuntimeError("stop")
+    assert donor_count() == 0
+    assert not tables.get_connection().in_transaction
+
+
+def test_nested_savepoint_rollback_keeps_outer_work(database):
+    with Transaction():
+        kept = add_entry(INSERT_DONOR, donor(1))
+        with pytest.raises(sqlite3.IntegrityError):
+            with Transaction():
+                add_entry(INSERT_DONOR, donor(2))
+                add_entry(INSERT_DONOR, donor(1))  # Same email and phone: rejected, undoes the savepoint
+        later = add_entry(INSERT_DONOR, donor(3))
+    assert [row[0] for row in view_all("Donor")] == [kept, later]
+
+
+def test_helpers_inside_a_transaction_do_not_end_it(database):
+    # search_text() and get_summary() release the pooled connection; inside a unit of work
+    # that must leave the transaction open so the commit still saves the insert
+    with Transaction():
+        donor_id = add_entry(INSERT_DONOR, donor(1))
+        search_text("memorial")
+        get_summary("Donor", donor_id)
+    assert donor_count() == 1
+
+
+def test_commit_fails_if_the_transaction_was_ended_elsewhere(database):
+    with pytest.raises(sqlite3.OperationalError):
+        with Transaction():
+            add_entry(INSERT_DONOR, donor(1))
+            tables.get_connection().rollback()
+    assert donor_count() == 0
+    assert tables.get_connection().owner is None
+
+
+def test_writes_are_invisible_to_other_connections_until_commit(database):
+    other = sqlite3.connect(tables.DB_FILE)
+    try:
+        with Transaction():
+            add_entry(INSERT_DONOR, donor(1))
+            assert other.execute("SELECT COUNT(*) FROM Donor").fetchone()[0] == 0
+        assert other.execute("SELECT COUNT(*) FROM Donor").fetchone()[0] == 1
+    finally:
+        other.close()